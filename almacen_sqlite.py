@@ -0,0 +1,231 @@
+"""
+Almacén de Productos en SQLite
+Guarda los product_data de todas las ejecuciones en una base SQLite con
+índices por URL, SKU, categoría y fecha, más un historial de precios
+"""
+
+import json
+import sqlite3
+
+from precios import DEFAULT_PARSER
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS products (
+    url TEXT PRIMARY KEY,
+    sku TEXT,
+    title TEXT,
+    category TEXT,
+    price_text TEXT,
+    price REAL,
+    currency TEXT,
+    availability TEXT,
+    extracted_at TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category);
+CREATE INDEX IF NOT EXISTS idx_products_extracted_at ON products (extracted_at);
+
+CREATE TABLE IF NOT EXISTS price_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    sku TEXT,
+    old_price_text TEXT,
+    new_price_text TEXT,
+    old_price REAL,
+    new_price REAL,
+    changed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_url ON price_history (url);
+CREATE INDEX IF NOT EXISTS idx_price_history_changed_at ON price_history (changed_at);
+'''
+
+# Un SKU identifica un solo producto aunque cambie su URL (parámetros, slug...)
+SKU_INDEX = 'CREATE UNIQUE INDEX IF NOT EXISTS idx_products_sku_unique ON products (sku) WHERE sku IS NOT NULL'
+
+UPSERT_SQL = '''
+INSERT INTO products (url, sku, title, category, price_text, price, currency, availability, extracted_at, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(url) DO UPDATE SET
+    sku = excluded.sku,
+    title = excluded.title,
+    category = excluded.category,
+    price_text = excluded.price_text,
+    price = excluded.price,
+    currency = excluded.currency,
+    availability = excluded.availability,
+    extracted_at = excluded.extracted_at,
+    data = excluded.data
+'''
+
+
+def product_record(product_data, price=None):
+    """Convierte un product_data en la fila de la tabla products
+
+    price: el Price ya normalizado del producto (si se omite, con el convertidor por defecto)
+    """
+    if price is None:
+        price = DEFAULT_PARSER.parse(product_data.get('Precio'), product_data.get('Moneda'))
+    attributes = product_data.get('Atributos') or {}
+    categories = attributes.get('Categorías') or []
+    return (
+        product_data.get('URL'),
+        attributes.get('SKU'),
+        product_data.get('Título'),
+        # La última categoría de la ruta de navegación es la más específica
+        categories[-1] if categories else None,
+        product_data.get('Precio'),
+        float(price.amount) if price else None,
+        price.currency if price else None,
+        attributes.get('Disponibilidad'),
+        product_data.get('Fecha de extracción'),
+        json.dumps(product_data, ensure_ascii=False),
+    )
+
+
+def _price_changed(old, new):
+    """Compara (texto, importe): por importe si ambos lo tienen, así '$ 349.900' y '349900.00' son el mismo precio"""
+    if old[1] is not None and new[1] is not None:
+        return old[1] != new[1]
+    return old[0] != new[0]
+
+
+class ProductStore:
+    """Base SQLite de productos con upserts por URL o SKU e historial de cambios de precio
+
+    Un producto con SKU se actualiza aunque llegue desde otra URL; sin SKU, la
+    URL es la clave.
+    """
+
+    def __init__(self, path='productos.db', batch_size=500, prices=None):
+        self.path = path
+        self.batch_size = batch_size
+        # Convertidor de precios (PriceParser) con la configuración regional de la tienda
+        self.prices = prices or DEFAULT_PARSER
+        self.count = 0
+        self._pending = []
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+        # Bases creadas antes de que se guardara la moneda
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(products)')}
+        if 'currency' not in columns:
+            self._db.execute('ALTER TABLE products ADD COLUMN currency TEXT')
+        # Bases con el índice de SKU no único: se conserva la extracción más reciente de cada SKU
+        self._db.execute('DROP INDEX IF EXISTS idx_products_sku')
+        self._db.execute('''
+            DELETE FROM products WHERE sku IS NOT NULL AND rowid NOT IN (
+                SELECT rowid FROM (
+                    SELECT rowid, ROW_NUMBER() OVER (PARTITION BY sku ORDER BY extracted_at DESC) AS n
+                    FROM products WHERE sku IS NOT NULL
+                ) WHERE n = 1
+            )
+        ''')
+        self._db.execute(SKU_INDEX)
+        self._db.commit()
+
+    def write(self, product_data):
+        """Añade un producto; se guardan por lotes en una transacción"""
+        self._pending.append(product_data)
+        self.count += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, products):
+        for product_data in products:
+            self.write(product_data)
+        self.flush()
+
+    def flush(self):
+        """Guarda los productos pendientes en una sola transacción"""
+        if not self._pending:
+            return
+        # Los precios del lote se normalizan juntos: cada texto distinto una sola vez
+        prices = self.prices.parse_many([p.get('Precio') for p in self._pending],
+                                       [p.get('Moneda') for p in self._pending])
+        records = [product_record(p, price) for p, price in zip(self._pending, prices)]
+        self._pending = []
+
+        with self._db:
+            previous, skus = self._previous(records)
+            owners = {sku: url for url, sku in skus.items()}
+
+            changes = []
+            for record in records:
+                url, sku, _, _, price_text, price, _, _, extracted_at, _ = record
+                owner = owners.get(sku) if sku else None
+                if owner is not None and owner != url:
+                    # El SKU ya está guardado con otra URL: la fila pasa a la URL nueva,
+                    # que sustituye a cualquier otro producto guardado con ella
+                    self._db.execute('DELETE FROM products WHERE url = ?', (url,))
+                    self._db.execute('UPDATE products SET url = ? WHERE url = ?', (url, owner))
+                    owners.pop(skus.pop(url, None), None)
+                    skus[url] = skus.pop(owner)
+                    previous[url] = previous.pop(owner)
+                if url in previous and _price_changed(previous[url], (price_text, price)):
+                    old_text, old_price = previous[url]
+                    changes.append((url, sku, old_text, price_text, old_price, price, extracted_at))
+                previous[url] = (price_text, price)
+                # El upsert sustituye el SKU anterior de la URL
+                owners.pop(skus.pop(url, None), None)
+                if sku:
+                    owners[sku] = url
+                    skus[url] = sku
+                self._db.execute(UPSERT_SQL, record)
+
+            self._db.executemany(
+                'INSERT INTO price_history (url, sku, old_price_text, new_price_text, old_price, new_price, changed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                changes
+            )
+
+    def _previous(self, records):
+        """Precios guardados de las URLs y los SKU del lote, y el SKU guardado de cada URL"""
+        previous, skus = {}, {}
+        for column, keys in (('url', [r[0] for r in records]), ('sku', [r[1] for r in records if r[1]])):
+            # Consultar en bloques (límite de parámetros de SQLite)
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for url, sku, price_text, price in self._db.execute(
+                    f'SELECT url, sku, price_text, price FROM products WHERE {column} IN ({placeholders})', chunk
+                ):
+                    previous[url] = (price_text, price)
+                    if sku:
+                        skus[url] = sku
+        return previous, skus
+
+    def iter_products(self, where=None, params=()):
+        """Generador de product_data que cumplen una condición SQL sobre products"""
+        self.flush()
+        sql = 'SELECT data FROM products'
+        if where:
+            sql += f' WHERE {where}'
+        sql += ' ORDER BY category, title'
+        for (data,) in self._db.execute(sql, params):
+            yield json.loads(data)
+
+    def changed_since(self, since):
+        """Productos extraídos desde una fecha ('YYYY-MM-DD' o 'YYYY-MM-DD HH:MM:SS')"""
+        return self.iter_products('extracted_at >= ?', (since,))
+
+    def price_changes_since(self, since):
+        """Cambios de precio registrados desde una fecha"""
+        self.flush()
+        cursor = self._db.execute(
+            'SELECT url, sku, old_price_text, new_price_text, old_price, new_price, changed_at '
+            'FROM price_history WHERE changed_at >= ? ORDER BY changed_at', (since,)
+        )
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
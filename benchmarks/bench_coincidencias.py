@@ -0,0 +1,107 @@
+"""
+Microbenchmark de Coincidencias
+Compara las búsquedas que hacían los extract_* en cada elemento (lower() y
+any() por nodo, re.sub por precio, lambdas de clase, get_text repetido) con
+las de coincidencias.py, sobre una página grande del benchmark
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from bs4 import BeautifulSoup
+
+from coincidencias import PRICE_CHARS_RE, KeywordSet, NodeTexts
+from servidor_tienda import CORPUS_DIR, load_corpus, pathological_pages
+
+
+KEYWORDS = ['cookie', 'privacy', 'términos', 'copyright']
+CLASS_KEYWORDS = ['description', 'detail', 'info']
+ITEM_KEYWORDS = ['material', 'batería', 'compatibilidad', 'uso', 'instalación']
+
+
+def best_of(func, repeat):
+    """Mejor tiempo (ms) de func() y su resultado"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def cases(soup):
+    """Pares (nombre, antes, ahora) que deben devolver lo mismo"""
+    texts = [elem.get_text(strip=True) for elem in soup.find_all(['p', 'a', 'li', 'span'])]
+    lowered = [text.lower() for text in texts]
+    keywords = KeywordSet(KEYWORDS)
+    alternation = re.compile('|'.join(re.escape(k) for k in KEYWORDS))
+    class_keywords = KeywordSet(CLASS_KEYWORDS)
+    item_keywords = KeywordSet(ITEM_KEYWORDS)
+
+    def lists_before():
+        found = []
+        for ul in soup.find_all(['ul', 'ol']):
+            item_texts = [li.get_text(strip=True) for li in ul.find_all('li')]
+            found.append(any(k in ' '.join(item_texts).lower() for k in ITEM_KEYWORDS))
+        return found
+
+    def lists_after():
+        node_texts = NodeTexts()
+        found = []
+        for ul in soup.find_all(['ul', 'ol']):
+            item_texts = [node_texts.text(li) for li in ul.find_all('li')]
+            found.append(item_keywords.in_lower(' '.join(item_texts).lower()))
+        node_texts.clear()
+        return found
+
+    return [
+        ('palabras clave: any() por texto',
+         lambda: [any(k in t.lower() for k in KEYWORDS) for t in texts],
+         lambda: [keywords(t) for t in texts]),
+        # Alternativa descartada para KeywordSet: una única alternancia compilada
+        ('palabras clave: alternancia re',
+         lambda: [alternation.search(t) is not None for t in lowered],
+         lambda: [keywords.in_lower(t) for t in lowered]),
+        ('precio: re.sub por texto',
+         lambda: [bool(re.sub(r'[^\d.,€$]', '', t)) for t in texts],
+         lambda: [PRICE_CHARS_RE.search(t) is not None for t in texts]),
+        ('clase: lambda en find_all',
+         lambda: len(soup.find_all('div', class_=lambda x: x and any(k in x.lower() for k in CLASS_KEYWORDS))),
+         lambda: len(soup.find_all('div', class_=class_keywords))),
+        ('listas: get_text repetido', lists_before, lists_after),
+    ]
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Compara las búsquedas por elemento con coincidencias.py')
+    parser.add_argument('--pagina', default='odoo_megamenu', help='Página del corpus o patológica a usar')
+    parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por caso')
+    args = parser.parse_args()
+
+    pages = load_corpus(CORPUS_DIR)
+    pages.update(pathological_pages(pages))
+    if args.pagina not in pages:
+        print(f"Página desconocida: {args.pagina}. Opciones: {', '.join(pages)}")
+        return
+    soup = BeautifulSoup(pages[args.pagina], 'html.parser')
+
+    print(f"Página {args.pagina} ({len(pages[args.pagina]) / 1024:.0f} KB), mejor de {args.repeticiones}")
+    print(f"{'Caso':<36} {'Antes':>11} {'Ahora':>11} {'Mejora':>8}")
+    print("-" * 70)
+    for name, before_func, after_func in cases(soup):
+        before, expected = best_of(before_func, args.repeticiones)
+        after, result = best_of(after_func, args.repeticiones)
+        status = '' if expected == result else '  [DIFERENTE]'
+        print(f"{name:<36} {before:>9.2f}ms {after:>9.2f}ms {before / after:>7.2f}x{status}")
+
+
+if __name__ == "__main__":
+    main()
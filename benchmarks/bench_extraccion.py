@@ -0,0 +1,262 @@
+"""
+Benchmark de Extremo a Extremo
+Extrae las páginas del corpus (pequeñas, típicas y patológicas) sin red y
+servidas por la tienda local con latencia y jitter; informa páginas/s,
+latencias p50/p95/p99, tiempo por etapa (parseo y cada extract_*) y memoria
+pico, y guarda el informe en JSON para comparar entre commits
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from bench_vista import peak_rss_mb
+from extractor import PARSERS, ProductExtractor
+from metricas import ExtractionMetrics
+from servidor_tienda import CORPUS_DIR, ShopServer, load_corpus, pathological_pages
+from sesion_http import create_session
+
+
+BENCH_URL = 'https://tienda.example.com/shop/producto-benchmark'
+
+
+def percentile(values, q):
+    """Percentil q (0-100) con interpolación lineal"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def git_revision():
+    """Commit actual del repositorio, o None fuera de git"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_page(html_content, options, repeat):
+    """Tiempos de extract_from_html sobre una página ya descargada
+
+    options: argumentos de ProductExtractor (parser, structured, prune...).
+    """
+    raw = html_content
+    # fetch_page entrega texto: se decodifica fuera de la medición de tiempos
+    html_content = raw.decode('utf-8')
+    page = ProductExtractor(BENCH_URL, **options)
+    times = []
+    stages = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        page.extract_from_html(html_content)
+        times.append(time.perf_counter() - start)
+        for stage, seconds in page.stage_times.items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    # Memoria en una pasada aparte (tracemalloc ralentiza la extracción), desde los
+    # bytes como en una descarga: así cuenta también el HTML que la poda libera
+    del html_content
+    tracemalloc.start()
+    page.extract_from_html(raw.decode('utf-8'))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'bytes': len(raw),
+        'ms_mejor': min(times) * 1000,
+        'ms_mediana': percentile(times, 50) * 1000,
+        'etapas_ms': {stage: round(seconds / repeat * 1000, 3) for stage, seconds in stages.items()},
+        'memoria_pico_mb': round(peak / (1024 * 1024), 2),
+    }
+
+
+def bench_offline(pages, options, repeat):
+    results = {}
+    for name, html_content in pages.items():
+        results[name] = bench_page(html_content, options, repeat)
+        r = results[name]
+        print(f"   {name:<28} {r['bytes'] / 1024:>9.0f} KB {r['ms_mediana']:>10.2f} ms {r['memoria_pico_mb']:>9.1f} MB")
+    return results
+
+
+def bench_network(shop, options, concurrency, max_bytes=None):
+    """Descarga y extrae todas las URLs de la tienda local con concurrency hilos"""
+    session = create_session(pool_connections=1, pool_maxsize=concurrency)
+    metrics = ExtractionMetrics()
+    latencies = []
+    failed = []
+
+    def run(url):
+        start = time.perf_counter()
+        data = ProductExtractor(url, session=session, metrics=metrics, max_bytes=max_bytes,
+                                **options).extract_all_data()
+        if data is None:
+            failed.append(url)
+        else:
+            latencies.append(time.perf_counter() - start)
+
+    urls = shop.urls()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, urls))
+    elapsed = time.perf_counter() - start
+    session.close()
+
+    return {
+        'paginas': len(latencies),
+        'fallidas': len(failed),
+        'segundos': round(elapsed, 3),
+        'paginas_por_segundo': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'latencia_ms': {
+            name: round(percentile(latencies, q) * 1000, 2) if latencies else None
+            for name, q in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+        },
+        'bytes_descargados': metrics.bytes_downloaded,
+        'truncadas': metrics.truncated,
+        'etapas': metrics.as_dict()['etapas'],
+    }
+
+
+def comparable_metrics(report):
+    """Métricas del informe: {nombre: (valor, mayor es mejor)}"""
+    metrics = {}
+    network = report.get('red')
+    if network:
+        metrics['red: páginas/s'] = (network['paginas_por_segundo'], True)
+        for name, value in network['latencia_ms'].items():
+            metrics[f"red: latencia {name} (ms)"] = (value, False)
+    for name, page in report.get('paginas', {}).items():
+        metrics[f"{name}: mediana (ms)"] = (page['ms_mediana'], False)
+        metrics[f"{name}: memoria pico (MB)"] = (page['memoria_pico_mb'], False)
+    return metrics
+
+
+def compare(report, baseline, tolerance):
+    """Imprime la comparación con un informe anterior; devuelve el número de regresiones"""
+    current = comparable_metrics(report)
+    previous = comparable_metrics(baseline)
+    print(f"\nComparación con {baseline.get('commit') or 'informe base'} (tolerancia {tolerance:.0f}%)")
+    for key in ('parser', 'datos_estructurados', 'poda', 'sin_navegacion', 'max_kb'):
+        if baseline.get(key) != report.get(key):
+            print(f"   Aviso: el informe base usa {key}={baseline.get(key)} y este {key}={report.get(key)}")
+    print(f"{'Métrica':<44} {'Antes':>10} {'Ahora':>10} {'Cambio':>9}")
+    print("-" * 76)
+    regressions = 0
+    for name, (value, higher_is_better) in current.items():
+        if name not in previous or value is None or not previous[name][0]:
+            continue
+        before = previous[name][0]
+        change = (value - before) / before * 100
+        worse = -change if higher_is_better else change
+        status = ''
+        if worse > tolerance:
+            status = '  [REGRESIÓN]'
+            regressions += 1
+        print(f"{name:<44} {before:>10.2f} {value:>10.2f} {change:>+8.1f}%{status}")
+    return regressions
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Benchmark del extractor con el corpus y una tienda local')
+    parser.add_argument('paginas', nargs='*', help='Archivos HTML (por defecto benchmarks/corpus/*.html)')
+    parser.add_argument('--sin-patologicas', action='store_true',
+                        help='No generar las páginas patológicas (enorme, anidada, texto enorme)')
+    parser.add_argument('--parser', choices=PARSERS, default='html.parser', help='Motor de parseo')
+    parser.add_argument('--datos-estructurados', action='store_true',
+                        help='Leer primero JSON-LD, microdatos y OpenGraph')
+    parser.add_argument('--podar', action='store_true', help='Quitar scripts, estilos y comentarios antes de parsear')
+    parser.add_argument('--sin-navegacion', action='store_true', help='Quitar nav/header/footer sin datos del producto')
+    parser.add_argument('--max-kb', type=int, help='Límite de KB por página en la descarga')
+    parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por página sin red')
+    parser.add_argument('--sin-red', action='store_true', help='Medir solo la extracción sin red')
+    parser.add_argument('--copias', type=int, default=5, help='URLs de la tienda local por cada página')
+    parser.add_argument('--concurrencia', type=int, default=8, help='Descargas simultáneas')
+    parser.add_argument('--latencia', type=float, default=50, help='Latencia media del servidor en ms')
+    parser.add_argument('--jitter', type=float, default=20, help='Variación máxima de la latencia en ms')
+    parser.add_argument('--salida', metavar='ARCHIVO_JSON', help='Guardar el informe en JSON')
+    parser.add_argument('--comparar', metavar='ARCHIVO_JSON', help='Informe anterior con el que comparar')
+    parser.add_argument('--tolerancia', type=float, default=10,
+                        help='Empeoramiento en %% a partir del cual se marca una regresión')
+    args = parser.parse_args()
+
+    if args.paginas:
+        pages = {}
+        for path in args.paginas:
+            with open(path, 'rb') as f:
+                pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    else:
+        pages = load_corpus(CORPUS_DIR)
+    if not args.sin_patologicas:
+        pages.update(pathological_pages(pages))
+    if not pages:
+        print("No se encontraron páginas HTML para el benchmark.")
+        return
+    structured = args.datos_estructurados
+    options = {'parser': args.parser, 'structured': structured, 'prune': args.podar,
+               'drop_navigation': args.sin_navegacion}
+
+    report = {
+        'commit': git_revision(),
+        'fecha': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'parser': args.parser,
+        'datos_estructurados': structured,
+        'poda': args.podar,
+        'sin_navegacion': args.sin_navegacion,
+        'max_kb': args.max_kb,
+    }
+
+    print(f"Extracción sin red ({args.repeticiones} repeticiones, parser {args.parser})")
+    print(f"   {'Página':<28} {'Tamaño':>12} {'Mediana':>13} {'Memoria':>12}")
+    report['paginas'] = bench_offline(pages, options, args.repeticiones)
+
+    if not args.sin_red:
+        shop = ShopServer(pages, latency=args.latencia / 1000, jitter=args.jitter / 1000, copies=args.copias)
+        with shop:
+            print(f"\nTienda local {shop.base_url}: {len(shop.urls())} URLs, "
+                  f"latencia {args.latencia:.0f}±{args.jitter:.0f} ms, {args.concurrencia} hilos")
+            network = bench_network(shop, options, args.concurrencia,
+                                    args.max_kb * 1024 if args.max_kb else None)
+        network.update({'latencia_servidor_ms': args.latencia, 'jitter_ms': args.jitter,
+                        'concurrencia': args.concurrencia})
+        report['red'] = network
+        latency = network['latencia_ms']
+        print(f"   {network['paginas']} páginas en {network['segundos']:.1f}s "
+              f"({network['paginas_por_segundo']} páginas/s), {network['fallidas']} fallidas")
+        print(f"   Latencia por página: p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms")
+
+    report['memoria_rss_pico_mb'] = peak_rss_mb()
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nInforme guardado en: {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerancia)
+        if regressions:
+            print(f"\n{regressions} regresión(es) por encima de la tolerancia")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
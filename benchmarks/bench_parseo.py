@@ -0,0 +1,61 @@
+"""
+Benchmark de Parseo y Extracción
+Mide el tiempo por página de BeautifulSoup + extract_* con y sin el índice
+del documento, sobre las páginas guardadas en benchmarks/corpus/
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor import ProductExtractor
+
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+BENCH_URL = 'https://tienda.example.com/shop/producto-benchmark'
+
+
+def time_extraction(html_content, use_index, repeat):
+    """Devuelve el mejor tiempo (ms) de extract_from_html y los datos extraídos"""
+    extractor = ProductExtractor(BENCH_URL, use_index=use_index)
+    best = float('inf')
+    data = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = extractor.extract_from_html(html_content)
+        best = min(best, time.perf_counter() - start)
+    data = dict(data)
+    data.pop('Fecha de extracción', None)
+    return best * 1000, data
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Compara el tiempo de extracción con y sin índice del documento')
+    parser.add_argument('paginas', nargs='*', help='Archivos HTML (por defecto benchmarks/corpus/*.html)')
+    parser.add_argument('--repeticiones', type=int, default=20, help='Repeticiones por página')
+    args = parser.parse_args()
+
+    pages = args.paginas or sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html')))
+    if not pages:
+        print("No se encontraron páginas HTML para el benchmark.")
+        return
+
+    print(f"{'Página':<40} {'Sin índice':>12} {'Con índice':>12} {'Mejora':>8}")
+    print("-" * 76)
+    for path in pages:
+        with open(path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+
+        before, data_before = time_extraction(html_content, False, args.repeticiones)
+        after, data_after = time_extraction(html_content, True, args.repeticiones)
+        status = '' if data_before == data_after else '  [DIFERENTE]'
+        print(f"{os.path.basename(path):<40} {before:>10.2f}ms {after:>10.2f}ms {before / after:>7.2f}x{status}")
+
+
+if __name__ == "__main__":
+    main()
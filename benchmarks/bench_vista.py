@@ -0,0 +1,103 @@
+"""
+Benchmark de Generación de la Vista HTML
+Compara la generación en memoria (lista de productos + un único string)
+con la escritura en streaming desde un generador: tiempo y memoria pico
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+MODES = ('memoria', 'streaming')
+
+
+def synthetic_product(i):
+    """Producto sintético con el tamaño típico de una página Odoo"""
+    return {
+        'URL': f'https://tienda.example.com/shop/producto-{i}',
+        'Título': f'Producto de prueba número {i}',
+        'Precio': f'{10000 + i}.0',
+        'Descripción': 'Descripción del producto con varios párrafos de texto.\n' * 8,
+        'Imágenes': [f'https://tienda.example.com/web/image/product.image/{i}{j}/image_1024' for j in range(5)],
+        'Atributos': {
+            'Categorías': ['Productos', f'Categoría {i % 50}'],
+            'SKU': f'SKU-{i:06d}',
+            'Especificaciones': {
+                'Especificaciones': ['Material: plástico ABS', 'Batería: 1200 mAh', 'Compatibilidad: universal'],
+                'Modo de uso': 'Presione el botón superior para iniciar el flujo de agua.',
+            },
+        },
+        'Fecha de extracción': '2024-01-15 10:30:00',
+    }
+
+
+def peak_rss_mb():
+    """Memoria residente pico del proceso actual en MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(mode, count, output_file):
+    """Genera la vista en este proceso e imprime tiempo y memoria en JSON"""
+    from generar_vista import generate_html, write_html
+
+    products = (synthetic_product(i) for i in range(count))
+    start = time.perf_counter()
+    if mode == 'memoria':
+        products = list(products)
+        html_content = generate_html(products)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            write_html(products, f)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Mide tiempo y memoria pico al generar la vista HTML')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Número de productos de cada prueba')
+    parser.add_argument('--hijo', nargs=2, metavar=('MODO', 'N'), help=argparse.SUPPRESS)
+    parser.add_argument('--salida', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        run_child(args.hijo[0], int(args.hijo[1]), args.salida)
+        return
+
+    print(f"{'Productos':>10} {'Modo':>10} {'Tiempo':>10} {'RSS pico':>12}")
+    print("-" * 46)
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, 'vista.html')
+        for count in args.tamanos:
+            for mode in MODES:
+                # Cada medición en un proceso nuevo para que el pico de memoria sea independiente
+                result = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--hijo', mode, str(count), '--salida', output_file],
+                    capture_output=True, text=True, check=True
+                )
+                data = json.loads(result.stdout.strip().splitlines()[-1])
+                rss = f"{data['peak_rss_mb']:.1f} MB" if data['peak_rss_mb'] is not None else 'n/d'
+                print(f"{count:>10} {mode:>10} {data['seconds']:>9.2f}s {rss:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Tienda Local de Pruebas
+Servidor HTTP que sirve las páginas del corpus como si fueran productos de
+una tienda Odoo, con latencia y jitter configurables, para medir el extractor
+sin depender de una tienda real
+"""
+
+import argparse
+import glob
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+
+def load_corpus(directory=CORPUS_DIR):
+    """Páginas del corpus: {nombre sin extensión: bytes}"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'rb') as f:
+            pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return pages
+
+
+def _related_card(i):
+    return (f'<div class="col-md-3 oe_product_cart" data-publish="on">'
+            f'<div class="oe_product_image"><a href="/shop/relacionado-{i}">'
+            f'<img src="/web/image/product.template/{i}/image_256" alt="Relacionado {i}" loading="lazy"/></a></div>'
+            f'<div class="o_wsale_product_information"><h6 class="o_wsale_products_item_title">'
+            f'<a href="/shop/relacionado-{i}">Relacionado {i}</a></h6>'
+            f'<div class="product_price"><span class="oe_currency_value">{i % 900 + 100}.000,00</span></div></div>'
+            f'</div>\n')
+
+
+def _menu_entry(i):
+    items = ''.join(f'<li><a class="dropdown-item" href="/shop/category/cat-{i}-{j}">Subcategoría {i}.{j}</a></li>'
+                    for j in range(30))
+    return (f'<li class="nav-item dropdown"><a class="nav-link dropdown-toggle" href="/shop/category/cat-{i}">'
+            f'Categoría {i}</a><ul class="dropdown-menu">{items}</ul></li>\n')
+
+
+def pathological_pages(pages, scale=1):
+    """Páginas patológicas generadas a partir del corpus (no se guardan en el repositorio)
+
+    - odoo_enorme: la página de Odoo con miles de productos relacionados y un
+      script en línea de varios MB, como las tiendas con catálogos embebidos
+    - odoo_megamenu: la página de Odoo con un megamenú de miles de enlaces y
+      cientos de bloques <script> y <style> en línea
+    - anidada: la página mínima dentro de miles de niveles de <div>
+    - texto_enorme: una descripción de varios MB en un único párrafo
+    """
+    generated = {}
+    odoo = pages.get('odoo_producto')
+    if odoo:
+        html_content = odoo.decode('utf-8')
+        cards = ''.join(_related_card(i) for i in range(5000 * scale))
+        script = '<script>var catalogo = [' + ','.join(
+            f'{{"id": {i}, "nombre": "Producto {i}"}}' for i in range(60000 * scale)) + '];</script>'
+        # Los relacionados van, como en Odoo, en la sección de alternativos tras el producto
+        row = html_content.index('<div class="row">', html_content.index('Productos alternativos'))
+        html_content = html_content[:row] + '<div class="row">' + cards + html_content[row + len('<div class="row">'):]
+        html_content = html_content.replace('</body>', script + '</body>', 1)
+        generated['odoo_enorme'] = html_content.encode('utf-8')
+
+        html_content = odoo.decode('utf-8')
+        menu = ''.join(_menu_entry(i) for i in range(400 * scale))
+        widgets = ''.join(f'<style>.w{i} {{ margin: {i % 10}px; color: #{i:06x}; }}</style>'
+                          f'<script>window.widget{i} = {{"id": {i}, "datos": "{"x" * 2000}"}};</script>\n'
+                          for i in range(500 * scale))
+        html_content = html_content.replace('id="top_menu">', 'id="top_menu">' + menu, 1)
+        html_content = html_content.replace('</body>', widgets + '</body>', 1)
+        generated['odoo_megamenu'] = html_content.encode('utf-8')
+    minimal = pages.get('pagina_minima')
+    if minimal:
+        html_content = minimal.decode('utf-8')
+        depth = 3000 * scale
+        html_content = html_content.replace('<body>', '<body>' + '<div class="capa">' * depth, 1)
+        html_content = html_content.replace('</body>', '</div>' * depth + '</body>', 1)
+        generated['anidada'] = html_content.encode('utf-8')
+        paragraph = 'Texto de relleno de una descripción desmesurada. ' * (40000 * scale)
+        html_content = minimal.decode('utf-8').replace('<section class="product-box">',
+                                                        f'<section class="product-box"><p>{paragraph}</p>', 1)
+        generated['texto_enorme'] = html_content.encode('utf-8')
+    return generated
+
+
+def _slug(name):
+    return name.replace('_', '-')
+
+
+class ShopServer:
+    """Tienda de pruebas en un hilo propio
+
+    Cada página del corpus se publica como /shop/<nombre>-<n> para n en
+    0..copies-1, y hay un /sitemap.xml con todas ellas. Cada respuesta espera
+    latency ± jitter segundos antes de enviarse.
+    """
+
+    def __init__(self, pages, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, copies=1):
+        self.pages = {_slug(name): body for name, body in pages.items()}
+        self.latency = latency
+        self.jitter = jitter
+        self.copies = copies
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self):
+        """URLs de producto publicadas, intercalando las páginas del corpus"""
+        return [f"{self.base_url}/shop/{name}-{n}" for n in range(self.copies) for name in self.pages]
+
+    def page_for(self, path):
+        """Cuerpo de la página para una ruta /shop/<nombre>-<n>, o None"""
+        if not path.startswith('/shop/'):
+            return None
+        name, _, number = path[len('/shop/'):].rpartition('-')
+        if not number.isdigit() or int(number) >= self.copies:
+            return None
+        return self.pages.get(name)
+
+    def sitemap(self):
+        entries = ''.join(f"<url><loc>{url}</loc></url>" for url in self.urls())
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"{entries}</urlset>").encode('utf-8')
+
+    def delay(self):
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def _handler(self):
+        shop = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with shop._lock:
+                    shop.requests += 1
+                path = urlparse(self.path).path
+                if path == '/robots.txt':
+                    body, content_type = f"User-agent: *\nSitemap: {shop.base_url}/sitemap.xml\n".encode(), 'text/plain'
+                elif path == '/sitemap.xml':
+                    body, content_type = shop.sitemap(), 'application/xml'
+                else:
+                    body, content_type = shop.page_for(path), 'text/html; charset=utf-8'
+                time.sleep(shop.delay())
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente cortó la descarga (límite de bytes)
+                    pass
+
+        return Handler
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        """Atiende peticiones en segundo plano"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread:
+            self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Sirve el corpus de benchmarks como una tienda local')
+    parser.add_argument('--puerto', type=int, default=8800, help='Puerto de escucha')
+    parser.add_argument('--latencia', type=float, default=50, help='Latencia media por respuesta en ms')
+    parser.add_argument('--jitter', type=float, default=20, help='Variación máxima de la latencia en ms')
+    parser.add_argument('--copias', type=int, default=10, help='URLs publicadas por cada página del corpus')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Directorio con las páginas HTML')
+    parser.add_argument('--sin-patologicas', action='store_true',
+                        help='No publicar las páginas patológicas generadas (enorme, anidada...)')
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not args.sin_patologicas:
+        pages.update(pathological_pages(pages))
+    shop = ShopServer(pages, port=args.puerto, latency=args.latencia / 1000,
+                      jitter=args.jitter / 1000, copies=args.copias)
+    print(f"Tienda de pruebas en {shop.base_url} ({len(shop.urls())} productos, sitemap en /sitemap.xml)")
+    print("Ctrl+C para detener")
+    try:
+        shop.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shop.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Caché HTTP en Disco
+Guarda el HTML descargado junto con ETag/Last-Modified para hacer peticiones
+condicionales y servir las respuestas 304 desde disco
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class HttpCache:
+    """Caché persistente de páginas con revalidación condicional y expulsión LRU
+
+    Cada consulta termina en un acierto, una revalidación (304) o un fallo:
+    hits + revalidated + misses es el número de páginas pedidas a la caché.
+    """
+
+    def __init__(self, directory='.cache_http', ttl=0, max_bytes=500 * 1024 * 1024):
+        # ttl: segundos durante los que una entrada se sirve sin consultar al servidor
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                accessed_at REAL,
+                size INTEGER
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)')
+        self._db.commit()
+        self._total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def _body_path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], key)
+
+    def _read_body(self, url):
+        try:
+            with open(self._body_path(url), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def lookup(self, url):
+        """Devuelve (cuerpo, cabeceras condicionales, fresca) o None si no está en caché
+
+        Sin entrada utilizable cuenta como fallo; con entrada, quien consulta
+        anota el resultado con record_hit o record_miss.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, stored_at FROM entries WHERE url = ?', (url,)
+            ).fetchone()
+        if not row:
+            self.record_miss(url)
+            return None
+
+        body = self._read_body(url)
+        if body is None:
+            self._delete(url)
+            self.record_miss(url)
+            return None
+
+        etag, last_modified, stored_at = row
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        fresh = self.ttl > 0 and time.time() - stored_at < self.ttl
+        return body, headers, fresh
+
+    def record_hit(self, url, revalidated=False):
+        """Marca un acierto: actualiza el acceso (LRU) y, si hubo 304, la frescura"""
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self.stats['revalidated'] += 1
+                self._db.execute('UPDATE entries SET stored_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+            else:
+                self.stats['hits'] += 1
+                self._db.execute('UPDATE entries SET accessed_at = ? WHERE url = ?', (now, url))
+            self._db.commit()
+
+    def record_miss(self, url):
+        """Marca un fallo: la página no se sirvió desde la caché"""
+        with self._lock:
+            self.stats['misses'] += 1
+
+    def store(self, url, body, headers):
+        """Guarda una respuesta 200 con sus validadores"""
+        path = self._body_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = body.encode('utf-8')
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute('SELECT size FROM entries WHERE url = ?', (url,)).fetchone()
+            if previous:
+                self._total_bytes -= previous[0]
+            self._total_bytes += len(data)
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries (url, etag, last_modified, stored_at, accessed_at, size) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, headers.get('ETag'), headers.get('Last-Modified'), now, now, len(data))
+            )
+            self._db.commit()
+            self._evict()
+
+    def _delete(self, url):
+        with self._lock:
+            row = self._db.execute('SELECT size FROM entries WHERE url = ?', (url,)).fetchone()
+            if row:
+                self._total_bytes -= row[0]
+            self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+            self._db.commit()
+        try:
+            os.remove(self._body_path(url))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta quedar bajo max_bytes (con el lock tomado)"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for url, size in self._db.execute('SELECT url, size FROM entries ORDER BY accessed_at').fetchall():
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+            try:
+                os.remove(self._body_path(url))
+            except OSError:
+                pass
+            self._total_bytes -= size
+            self.stats['evictions'] += 1
+        self._db.commit()
+
+    def summary(self):
+        """Resumen legible de los contadores de la caché"""
+        s = self.stats
+        return (f"Caché HTTP: {s['hits']} aciertos, {s['revalidated']} revalidados (304), "
+                f"{s['misses']} fallos, {s['evictions']} expulsados")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
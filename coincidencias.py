@@ -0,0 +1,81 @@
+"""
+Coincidencias Precompiladas
+Palabras clave, expresiones regulares y textos de nodos preparados una sola
+vez, para que los extract_* no rehagan en cada elemento las mismas
+búsquedas (lower(), re.sub, lambdas de clase)
+"""
+
+import re
+
+
+# Caracteres de un precio: si el texto no tiene ninguno no es un precio
+PRICE_CHARS_RE = re.compile(r'[\d.,€$]')
+
+
+class KeywordSet:
+    """Conjunto de palabras clave que se buscan como subcadenas, sin distinguir mayúsculas
+
+    Se prueban con `in` en un bucle: con pocas palabras la búsqueda de
+    subcadenas de str es más rápida que una alternancia compilada con re
+    (ver benchmarks/bench_coincidencias.py). Llamado directamente sirve como
+    filtro de class_ o string en find_all.
+    """
+
+    __slots__ = ('keywords',)
+
+    def __init__(self, keywords):
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+
+    def in_lower(self, lowered):
+        """¿Alguna palabra aparece en un texto que ya está en minúsculas?"""
+        for keyword in self.keywords:
+            if keyword in lowered:
+                return True
+        return False
+
+    def __call__(self, text):
+        return bool(text) and self.in_lower(text.lower())
+
+    def __iter__(self):
+        return iter(self.keywords)
+
+
+class NodeTexts:
+    """Textos de los nodos de un documento calculados una sola vez
+
+    Guarda get_text(strip=True), su versión en minúsculas y el .string en
+    minúsculas de cada nodo. Se indexa por id() y retiene el nodo, así un id
+    no se reutiliza mientras la caché exista; hay que vaciarla (clear) al
+    terminar con el documento para no retener el árbol.
+    """
+
+    def __init__(self):
+        self._text = {}
+        self._lower = {}
+        self._string = {}
+
+    def text(self, elem):
+        """elem.get_text(strip=True)"""
+        cached = self._text.get(id(elem))
+        if cached is None:
+            cached = self._text[id(elem)] = (elem, elem.get_text(strip=True))
+        return cached[1]
+
+    def lower(self, elem):
+        """elem.get_text(strip=True).lower()"""
+        cached = self._lower.get(id(elem))
+        if cached is None:
+            cached = self._lower[id(elem)] = (elem, self.text(elem).lower())
+        return cached[1]
+
+    def string_lower(self, elem):
+        """elem.string en minúsculas ('' si el nodo no tiene un único texto)"""
+        cached = self._string.get(id(elem))
+        if cached is None:
+            cached = self._string[id(elem)] = (elem, (elem.string or '').lower())
+        return cached[1]
+
+    def clear(self):
+        self._text.clear()
+        self._lower.clear()
+        self._string.clear()
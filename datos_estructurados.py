@@ -0,0 +1,307 @@
+"""
+Datos Estructurados de Productos
+Lee los datos que la propia página declara (JSON-LD, microdatos schema.org y
+metaetiquetas OpenGraph) antes de recurrir a las heurísticas de selectores
+"""
+
+import json
+import re
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from html import unescape
+from urllib.parse import urljoin
+
+from motor_lxml import LxmlNode
+
+
+JSON_LD = 'json-ld'
+MICRODATA = 'microdata'
+OPENGRAPH = 'opengraph'
+HEURISTIC = 'heurística'
+MISSING = 'sin dato'
+
+PRODUCT_TYPES = ('Product', 'ProductGroup', 'IndividualProduct', 'ProductModel')
+# Etiquetas legibles para los valores de https://schema.org/ItemAvailability
+AVAILABILITY_LABELS = {
+    'instock': 'En stock',
+    'instoreonly': 'Solo en tienda',
+    'onlineonly': 'Solo en línea',
+    'limitedavailability': 'Disponibilidad limitada',
+    'outofstock': 'Agotado',
+    'soldout': 'Agotado',
+    'discontinued': 'Descontinuado',
+    'preorder': 'Preventa',
+    'presale': 'Preventa',
+    'backorder': 'Bajo pedido',
+}
+# Misma longitud mínima que exige extract_description a una descripción
+MIN_DESCRIPTION_LENGTH = 20
+
+
+def _text(value):
+    """Texto plano de un valor declarado (las descripciones a veces traen HTML)"""
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    text = re.sub(r'<br\s*/?>|</(?:p|li|div|h\d)>', '\n', str(value), flags=re.IGNORECASE)
+    text = unescape(re.sub(r'<[^>]+>', ' ', text))
+    text = re.sub(r'[ \t\r\f\v]+', ' ', text)
+    text = re.sub(r' *\n\s*', '\n', text).strip()
+    return text or None
+
+
+def _availability(value):
+    value = _text(value)
+    if not value:
+        return None
+    key = value.rstrip('/').rsplit('/', 1)[-1].replace('_', '').replace(' ', '').lower()
+    return AVAILABILITY_LABELS.get(key, value)
+
+
+def _price(value):
+    """Precio declarado como texto con punto decimal y sin ambigüedad ('13000.0', '45.9')
+
+    schema.org usa punto decimal y ningún separador de miles: "45.900" es 45,9.
+    Un punto seguido de exactamente tres dígitos sería miles para precios.py con
+    una región de coma decimal (es_CO), así que esos decimales se escriben sin
+    ceros finales o, si no los tienen, con un cero más ('1.125' → '1.1250').
+    Los valores que no siguen el formato (p. ej. '$ 45.900') se dejan tal cual.
+    """
+    if value is None or isinstance(value, (dict, list, bool)):
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        return text
+    if not amount.is_finite():
+        return None
+    integer, _, decimals = f"{amount:f}".partition('.')
+    if len(decimals) == 3:
+        decimals = decimals.rstrip('0')
+        if len(decimals) == 3:
+            decimals += '0'
+    return f"{integer}.{decimals}" if decimals else integer
+
+
+def _currency(value):
+    """Código ISO 4217 declarado (priceCurrency, product:price:currency)"""
+    value = _text(value)
+    return value.upper() if value and re.fullmatch(r'[A-Za-z]{3}', value) else None
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _has_type(node, types):
+    return any(str(t).rsplit('/', 1)[-1] in types for t in _as_list(node.get('@type')))
+
+
+def _json_ld_nodes(soup):
+    """Todos los objetos de los bloques application/ld+json, incluidos los de @graph"""
+    for script in soup.select('script[type="application/ld+json"]'):
+        raw = script.string or script.get_text()
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            continue
+        stack = _as_list(data)
+        while stack:
+            node = stack.pop(0)
+            if isinstance(node, dict):
+                yield node
+                stack.extend(_as_list(node.get('@graph')))
+
+
+def _from_json_ld(soup, url):
+    fields = {}
+    product = None
+    breadcrumb = None
+    for node in _json_ld_nodes(soup):
+        if product is None and _has_type(node, PRODUCT_TYPES):
+            product = node
+        elif breadcrumb is None and _has_type(node, ('BreadcrumbList',)):
+            breadcrumb = node
+    if product is None:
+        return fields
+
+    fields['Título'] = _text(product.get('name'))
+    description = _text(product.get('description'))
+    if description and len(description) > MIN_DESCRIPTION_LENGTH:
+        fields['Descripción'] = description
+    fields['SKU'] = _text(product.get('sku'))
+
+    offers = [o for o in _as_list(product.get('offers')) if isinstance(o, dict)]
+    if offers:
+        offer = offers[0]
+        specification = offer.get('priceSpecification')
+        if isinstance(specification, list):
+            specification = specification[0] if specification else None
+        price = offer.get('price', offer.get('lowPrice'))
+        if price is None and isinstance(specification, dict):
+            price = specification.get('price')
+        currency = offer.get('priceCurrency')
+        if currency is None and isinstance(specification, dict):
+            currency = specification.get('priceCurrency')
+        fields['Precio'] = _price(price)
+        fields['Moneda'] = _currency(currency)
+        fields['Disponibilidad'] = _availability(offer.get('availability'))
+
+    images = []
+    for image in _as_list(product.get('image')):
+        src = (image.get('url') or image.get('contentUrl')) if isinstance(image, dict) else image
+        if isinstance(src, str) and src.strip():
+            full_url = urljoin(url, src.strip())
+            if full_url not in images:
+                images.append(full_url)
+    if images:
+        fields['Imágenes'] = images[:10]
+
+    categories = []
+    if breadcrumb:
+        items = [i for i in _as_list(breadcrumb.get('itemListElement')) if isinstance(i, dict)]
+        items.sort(key=lambda i: i.get('position') if isinstance(i.get('position'), int) else 0)
+        for item in items:
+            target = item.get('item')
+            name = item.get('name') or (target.get('name') if isinstance(target, dict) else None)
+            target_url = target.get('@id') if isinstance(target, dict) else target
+            name = _text(name)
+            # La última miga suele ser el propio producto
+            if name and name != fields.get('Título') and target_url != url:
+                categories.append(name)
+    elif isinstance(product.get('category'), str):
+        categories = [c.strip() for c in re.split(r'\s*[>/|]\s*', product['category']) if c.strip()]
+    if categories:
+        fields['Categorías'] = categories
+
+    return {key: value for key, value in fields.items() if value}
+
+
+def _same(a, b):
+    # Los nodos del motor lxml son envoltorios nuevos en cada acceso. Sin getattr:
+    # en un Tag de BeautifulSoup, tag.element equivale a tag.find('element')
+    if isinstance(a, LxmlNode) and isinstance(b, LxmlNode):
+        return a.element is b.element
+    return a is b
+
+
+def _nearest_scope(elem):
+    for parent in elem.parents:
+        if parent.get('itemscope') is not None:
+            return parent
+    return None
+
+
+def _microdata_value(elem):
+    """Valor de una propiedad según las reglas de microdatos de HTML"""
+    if elem.get('content') is not None:
+        return elem.get('content')
+    if elem.name in ('img', 'source', 'video', 'audio'):
+        return elem.get('src')
+    if elem.name in ('a', 'link', 'area'):
+        return elem.get('href')
+    if elem.name in ('data', 'meter'):
+        return elem.get('value')
+    if elem.name == 'time':
+        return elem.get('datetime') or elem.get_text(strip=True)
+    return elem.get_text(separator='\n', strip=True)
+
+
+def _from_microdata(soup, url):
+    fields = {}
+    product = None
+    for scope in soup.select('[itemscope]'):
+        if any(t in (scope.get('itemtype') or '') for t in PRODUCT_TYPES):
+            product = scope
+            break
+    if product is None:
+        return fields
+
+    for elem in soup.select('[itemprop]'):
+        prop = elem.get('itemprop')
+        scope = _nearest_scope(elem)
+        if scope is None:
+            continue
+        # Propiedades del producto o de su oferta; las de otros ítems anidados (marca, reseñas) no
+        in_offer = 'Offer' in (scope.get('itemtype') or '') and _same(_nearest_scope(scope), product)
+        if not (_same(scope, product) or in_offer):
+            continue
+        for name in prop.split():
+            if in_offer and name == 'price':
+                fields.setdefault('Precio', _price(_microdata_value(elem)))
+            elif in_offer and name == 'priceCurrency':
+                fields.setdefault('Moneda', _currency(_microdata_value(elem)))
+            elif in_offer and name == 'availability':
+                fields.setdefault('Disponibilidad', _availability(_microdata_value(elem)))
+            elif not in_offer and name == 'name':
+                fields.setdefault('Título', _text(_microdata_value(elem)))
+            elif not in_offer and name == 'description':
+                description = _text(_microdata_value(elem))
+                if description and len(description) > MIN_DESCRIPTION_LENGTH:
+                    fields.setdefault('Descripción', description)
+            elif not in_offer and name == 'sku':
+                fields.setdefault('SKU', _text(_microdata_value(elem)))
+
+    return {key: value for key, value in fields.items() if value}
+
+
+def _from_opengraph(soup, url):
+    properties = {}
+    for meta in soup.select('meta[property]'):
+        properties.setdefault(meta.get('property'), meta.get('content'))
+    # og:title de páginas que no son de producto suele ser el nombre del sitio
+    if not (properties.get('og:type') or '').startswith('product'):
+        return {}
+    description = _text(properties.get('og:description'))
+    fields = {
+        'Título': _text(properties.get('og:title')),
+        'Precio': _price(properties.get('product:price:amount') or properties.get('og:price:amount')),
+        'Moneda': _currency(properties.get('product:price:currency') or properties.get('og:price:currency')),
+        'Disponibilidad': _availability(properties.get('product:availability') or properties.get('og:availability')),
+        'Descripción': description if description and len(description) > MIN_DESCRIPTION_LENGTH else None,
+    }
+    return {key: value for key, value in fields.items() if value}
+
+
+def extract_structured(soup, url):
+    """Campos declarados por la página como {campo: (valor, origen)}
+
+    Prioridad: JSON-LD, microdatos y OpenGraph. Las imágenes solo se toman de
+    JSON-LD: los microdatos y OpenGraph suelen declarar solo la imagen
+    principal y la galería completa la da la heurística.
+    """
+    fields = {}
+    for source, reader in ((JSON_LD, _from_json_ld), (MICRODATA, _from_microdata), (OPENGRAPH, _from_opengraph)):
+        for key, value in reader(soup, url).items():
+            fields.setdefault(key, (value, source))
+    return fields
+
+
+class FieldSourceStats:
+    """Cuenta, por campo, de qué vía salió el valor en cada página"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, field_sources):
+        for field, source in field_sources.items():
+            self.counts[(field, source)] += 1
+
+    def as_dict(self):
+        result = {}
+        for (field, source), count in sorted(self.counts.items()):
+            result.setdefault(field, {})[source] = count
+        return result
+
+    def summary(self):
+        """Resumen legible por campo"""
+        lines = ['Origen de los campos:']
+        for field, sources in self.as_dict().items():
+            detail = ', '.join(f"{source} {count}" for source, count in
+                               sorted(sources.items(), key=lambda item: -item[1]))
+            lines.append(f"   {field}: {detail}")
+        return '\n'.join(lines)
@@ -0,0 +1,130 @@
+"""
+Exportación Columnar a Parquet / Arrow
+Escribe lotes de product_data con un esquema estable para análisis con
+dataframes (requiere el paquete opcional pyarrow)
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from precios import DEFAULT_PARSER
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("La exportación Parquet/Arrow requiere el paquete 'pyarrow' (pip install pyarrow)")
+
+
+def product_schema():
+    """Esquema estable de las columnas exportadas"""
+    _require_pyarrow()
+    return pa.schema([
+        ('url', pa.string()),
+        ('titulo', pa.string()),
+        ('precio', pa.float64()),
+        ('precio_texto', pa.string()),
+        ('moneda', pa.string()),
+        ('descripcion', pa.string()),
+        ('imagenes', pa.list_(pa.string())),
+        ('sku', pa.string()),
+        ('categorias', pa.list_(pa.string())),
+        ('disponibilidad', pa.string()),
+        ('atributos_json', pa.string()),
+        ('fecha_extraccion', pa.timestamp('s')),
+    ])
+
+
+def product_row(product_data, prices=DEFAULT_PARSER):
+    """Aplana un product_data en una fila con las columnas del esquema
+
+    prices: convertidor de precios (PriceParser) para las columnas precio y moneda
+    """
+    attributes = product_data.get('Atributos') or {}
+    price = prices.parse(product_data.get('Precio'), product_data.get('Moneda'))
+    fecha = product_data.get('Fecha de extracción')
+    try:
+        fecha = datetime.strptime(fecha, '%Y-%m-%d %H:%M:%S') if fecha else None
+    except ValueError:
+        fecha = None
+    return {
+        'url': product_data.get('URL'),
+        'titulo': product_data.get('Título'),
+        'precio': float(price.amount) if price else None,
+        'precio_texto': product_data.get('Precio'),
+        'moneda': price.currency if price else None,
+        'descripcion': product_data.get('Descripción'),
+        'imagenes': product_data.get('Imágenes') or [],
+        'sku': attributes.get('SKU'),
+        'categorias': attributes.get('Categorías') or [],
+        'disponibilidad': attributes.get('Disponibilidad'),
+        'atributos_json': json.dumps(attributes, ensure_ascii=False),
+        'fecha_extraccion': fecha,
+    }
+
+
+class ParquetExporter:
+    """Exporta product_data por lotes: cada lote es un row group (o record batch en Arrow)
+
+    - ruta terminada en .parquet: un archivo Parquet
+    - ruta terminada en .arrow: un archivo Arrow IPC
+    - cualquier otra ruta: directorio de dataset Parquet; cada ejecución añade
+      un archivo part-*.parquet nuevo, por lo que las exportaciones se acumulan
+    """
+
+    def __init__(self, path, batch_size=10000, compression='zstd', prices=None):
+        _require_pyarrow()
+        self.path = path
+        self.batch_size = batch_size
+        self.prices = prices or DEFAULT_PARSER
+        self.schema = product_schema()
+        self.count = 0
+        self._rows = []
+
+        if path.endswith('.arrow'):
+            self._sink = pa.OSFile(path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+        else:
+            if not path.endswith('.parquet'):
+                os.makedirs(path, exist_ok=True)
+                path = os.path.join(path, f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.parquet")
+            self._sink = None
+            self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        self.output_file = path
+
+    def write(self, product_data):
+        """Añade un producto; el lote se escribe al llegar a batch_size"""
+        self._rows.append(product_row(product_data, self.prices))
+        self.count += 1
+        if len(self._rows) >= self.batch_size:
+            self._write_batch()
+
+    def _write_batch(self):
+        if not self._rows:
+            return
+        batch = pa.RecordBatch.from_pylist(self._rows, schema=self.schema)
+        if self._sink is not None:
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        self._rows = []
+
+    def close(self):
+        self._write_batch()
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -9,29 +9,226 @@ import json
 import re
 from urllib.parse import urljoin, urlparse
 import os
+import time
 from datetime import datetime
 
+from coincidencias import PRICE_CHARS_RE, KeywordSet, NodeTexts
+from datos_estructurados import HEURISTIC, MISSING, extract_structured
+from indice_dom import DocumentIndex
+from motor_lxml import LxmlDocument
+from huella_contenido import content_fingerprint
+from metricas import FETCH, PARSE, PRUNE, SCHEDULER_WAIT, STRUCTURED, response_bytes
+from reintentos import PROBE, error_class
+from poda_html import drop_boilerplate, prune_html
+from sesion_http import create_session, read_body
+
+
+# Motores de parseo disponibles: los dos primeros son tree builders de
+# BeautifulSoup; 'lxml-native' construye el árbol con lxml sin BeautifulSoup
+PARSERS = ('html.parser', 'lxml', 'lxml-native')
+# Valores que los extract_* devuelven cuando no encuentran el dato
+NOT_FOUND = ('Título no encontrado', 'Descripción no encontrada')
+# Búsquedas alternativas de extract_description, por nombre de estrategia para los perfiles
+DESCRIPTION_FALLBACKS = {
+    'párrafos': '_description_from_paragraphs',
+    'divs': '_description_from_divs',
+    'secciones': '_description_from_sections',
+    'meta': '_description_from_meta',
+    'cerca del título': '_description_near_title',
+}
+# Estrategia de extract_images que recorre todas las <img> de la página
+ALL_IMAGES = 'todas las img'
+# Palabras clave de los extract_*, preparadas una vez por proceso
+IMAGE_SRC_KEYWORDS = KeywordSet(['product', 'item', 'image'])
+NOT_DESCRIPTION_KEYWORDS = KeywordSet(['cookie', 'privacy', 'términos', 'copyright'])
+DESCRIPTION_CLASSES = KeywordSet(['description', 'detail', 'info'])
+PRODUCT_CLASSES = KeywordSet(['product'])
+SPEC_KEYWORDS = KeywordSet(['especificaciones', 'especificación', 'características', 'detalles', 'modo de uso'])
+SPEC_HEADING_TAGS = ('h2', 'h3', 'h4', 'strong', 'b', 'span')
+SPEC_ITEM_KEYWORDS = KeywordSet(['material', 'batería', 'compatibilidad', 'uso', 'instalación'])
+TITLE_UNSAFE_RE = re.compile(r'[^\w\s-]')
+TITLE_SEPARATORS_RE = re.compile(r'[-\s]+')
+
+
+def product_filename(product_data):
+    """Genera el nombre de archivo JSON basado en el título del producto"""
+    safe_title = TITLE_UNSAFE_RE.sub('', product_data['Título'])[:50]
+    safe_title = TITLE_SEPARATORS_RE.sub('-', safe_title)
+    return f"producto_{safe_title}.json"
+
+
+def extraction_timestamp():
+    """Fecha de extracción con el formato usado en product_data"""
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
 
 class ProductExtractor:
     """Clase para extraer datos de productos de páginas web"""
     
-    def __init__(self, url):
+    def __init__(self, url, use_index=True, parser='html.parser', cache=None, fingerprints=None, session=None,
+                 structured=False, profile=None, scheduler=None, retries=None, breaker=None, failures=None,
+                 timeout=10, metrics=None, max_bytes=None, prune=False, drop_navigation=False):
+        if parser not in PARSERS:
+            raise ValueError(f"Parser desconocido: {parser}. Opciones: {', '.join(PARSERS)}")
         self.url = url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        # Con use_index los extract_* consultan un índice del documento en vez del soup
+        # (el motor 'lxml-native' siempre usa el índice)
+        self.use_index = use_index
+        self.parser = parser
+        # Caché HTTP opcional (HttpCache) para peticiones condicionales
+        self.cache = cache
+        # Almacén opcional (FingerprintStore) para no reparsear páginas sin cambios
+        self.fingerprints = fingerprints
+        # Una sesión compartida (SessionManager.session) reutiliza conexiones entre productos
+        self.session = session or create_session()
+        # Planificador opcional (HostScheduler) que marca el ritmo de peticiones por host
+        self.scheduler = scheduler
+        # Política de reintentos (RetryPolicy), cortacircuitos por host (CircuitBreaker)
+        # e informe de fallos (FailureReport), todos opcionales
+        self.retries = retries
+        self.breaker = breaker
+        self.failures = failures
+        self.timeout = timeout
+        # Métricas opcionales (ExtractionMetrics); stage_times guarda siempre los
+        # tiempos de la última extracción por etapa, en segundos
+        self.metrics = metrics
+        self.stage_times = {}
+        # Memoria acotada: max_bytes corta la descarga, prune quita scripts, estilos y
+        # comentarios antes de parsear (misma salida) y drop_navigation quita además
+        # nav/header/footer sin datos del producto (puede cambiar la descripción heurística)
+        self.max_bytes = max_bytes
+        self.prune = prune
+        self.drop_navigation = drop_navigation
+        self.truncated = False
+        # Con structured se leen primero JSON-LD, microdatos y OpenGraph; los
+        # extract_* solo se ejecutan para los campos que la página no declara.
+        # Desactivado por defecto: cambia Precio al valor declarado ('349900.00'
+        # en vez del texto visible '$ 349.900') y añade SKU, Disponibilidad y Moneda
+        self.structured = structured
+        # Origen de cada campo en la última extracción (json-ld, microdata, heurística...)
+        self.field_sources = {}
+        # Perfil del host (SelectorProfiles.profile): estrategia a probar primero por campo
+        self.profile = profile or {}
+        # Estrategia que dio cada campo en la última extracción, para actualizar el perfil
+        self.selector_winners = {}
+        # Textos de nodos ya calculados en la extracción en curso
+        self.texts = NodeTexts()
         self.product_data = {}
     
     def fetch_page(self):
-        """Obtiene el contenido HTML de la página"""
-        try:
-            response = self.session.get(self.url, timeout=10)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            print(f"Error al obtener la página: {e}")
+        """Obtiene el contenido HTML de la página (podado si prune)"""
+        html_content = self._download()
+        if html_content and self.prune:
+            # Se poda aquí para no retener el HTML completo mientras se parsea
+            start = time.perf_counter()
+            html_content = prune_html(html_content)
+            if self.metrics:
+                self.metrics.observe(self.url, PRUNE, time.perf_counter() - start)
+        return html_content
+
+    def _download(self):
+        """HTML de la caché o de la red, con reintentos y cortacircuitos si los hay"""
+        cached = self.cache.lookup(self.url) if self.cache else None
+        headers = {}
+        if cached:
+            body, headers, fresh = cached
+            if fresh:
+                self.cache.record_hit(self.url)
+                return body
+
+        permit = self.breaker.allow(self.url) if self.breaker else True
+        if not permit:
+            if cached:
+                self.cache.record_miss(self.url)
+            print(f"Error al obtener la página: circuito abierto para {urlparse(self.url).netloc}")
+            if self.failures:
+                self.failures.add(self.url, 'circuito abierto')
             return None
+
+        max_retries = self.retries.max_retries if self.retries else 0
+        probe = permit is PROBE
+        try:
+            return self._download_attempts(cached, headers, max_retries, probe)
+        finally:
+            # La petición de prueba que acaba sin veredicto (p. ej. una excepción
+            # que no es de red) no puede dejar el circuito semiabierto para siempre
+            if probe:
+                self.breaker.release_probe(self.url)
+
+    def _download_attempts(self, cached, headers, max_retries, probe=False):
+        for attempt in range(max_retries + 1):
+            try:
+                response, body = self._request(headers)
+                if cached and response.status_code == 304:
+                    if self.breaker:
+                        self.breaker.record_success(self.url, probe)
+                    self.cache.record_hit(self.url, revalidated=True)
+                    return cached[0]
+                response.raise_for_status()
+                if self.breaker:
+                    self.breaker.record_success(self.url, probe)
+                # La entrada caducada no sirvió: la página cambió (sin entrada, lookup ya contó el fallo)
+                if cached:
+                    self.cache.record_miss(self.url)
+                # Una página truncada no se guarda: otra ejecución sin límite la leería incompleta
+                if self.cache and not self.truncated:
+                    self.cache.store(self.url, body, response.headers)
+                return body
+            except requests.RequestException as e:
+                retriable = self.retries is not None and self.retries.is_retriable(e)
+                if retriable and attempt < max_retries:
+                    response = getattr(e, 'response', None)
+                    retry_after = response.headers.get('Retry-After') if response is not None else None
+                    if self.failures:
+                        self.failures.add_retry()
+                    time.sleep(self.retries.delay(attempt, retry_after))
+                    continue
+                print(f"Error al obtener la página: {e}")
+                if cached:
+                    self.cache.record_miss(self.url)
+                status = e.response.status_code if getattr(e, 'response', None) is not None else None
+                if self.breaker:
+                    # Red, 429 y 5xx cuentan contra el host; el resto de 4xx es un problema
+                    # de la URL y demuestra que el host responde
+                    if status is None or status == 429 or status >= 500:
+                        self.breaker.record_failure(self.url, probe)
+                    else:
+                        self.breaker.record_success(self.url, probe)
+                if self.failures:
+                    self.failures.add(self.url, error_class(e), e)
+                return None
+    
+    def _request(self, headers):
+        """Un intento de descarga, con turno del planificador si lo hay; devuelve (respuesta, texto)"""
+        if self.scheduler:
+            waiting = time.perf_counter()
+            self.scheduler.acquire(self.url)
+            if self.metrics:
+                self.metrics.observe(self.url, SCHEDULER_WAIT, time.perf_counter() - waiting)
+        start = time.perf_counter()
+        response = None
+        body = None
+        try:
+            response = self.session.get(self.url, timeout=self.timeout, headers=headers,
+                                        stream=bool(self.max_bytes))
+            body, self.truncated = read_body(response, self.max_bytes)
+            if self.metrics:
+                self.metrics.record_download(self.url, response_bytes(response), response.status_code,
+                                             truncated=self.truncated)
+            return response, body
+        finally:
+            latency = time.perf_counter() - start
+            if self.metrics:
+                self.metrics.observe(self.url, FETCH, latency)
+            if self.scheduler:
+                self.scheduler.release(
+                    self.url,
+                    status=response.status_code if response is not None else None,
+                    latency=latency,
+                    retry_after=response.headers.get('Retry-After') if response is not None else None,
+                    # Sin cuerpo (conexión cortada a mitad de la lectura) también es un error
+                    error=body is None,
+                )
     
     def extract_title(self, soup):
         """Extrae el título del producto"""
@@ -45,9 +242,10 @@ class ProductExtractor:
             '[data-product-title]'
         ]
         
-        for selector in selectors:
+        for selector in self._ordered('Título', selectors):
             title_elem = soup.select_one(selector)
             if title_elem:
+                self.selector_winners['Título'] = selector
                 return title_elem.get_text(strip=True)
         
         return "Título no encontrado"
@@ -63,19 +261,18 @@ class ProductExtractor:
             '[data-price]'
         ]
         
-        for selector in selectors:
+        for selector in self._ordered('Precio', selectors):
             price_elem = soup.select_one(selector)
             if price_elem:
+                self.selector_winners['Precio'] = selector
                 price_text = price_elem.get_text(strip=True)
-                # Extraer números y símbolos de moneda
-                price_clean = re.sub(r'[^\d.,€$]', '', price_text)
-                return price_text if price_clean else None
+                # Solo es un precio si tiene números o símbolos de moneda
+                return price_text if PRICE_CHARS_RE.search(price_text) else None
         
         return None
     
     def extract_images(self, soup):
         """Extrae todas las imágenes del producto"""
-        images = []
         base_url = f"{urlparse(self.url).scheme}://{urlparse(self.url).netloc}"
         
         # Buscar imágenes en galerías de productos
@@ -88,9 +285,25 @@ class ProductExtractor:
             'img[itemprop="image"]'
         ]
         
-        for selector in image_selectors:
+        # Con perfil, probar solo los selectores que dieron imágenes en este host
+        known = [s for s in self.profile.get('Imágenes') or [] if s in image_selectors or s == ALL_IMAGES]
+        images = self._images_from(soup, known, base_url) if known else []
+        if not images:
+            images = self._images_from(soup, image_selectors + [ALL_IMAGES], base_url)
+        
+        return images[:10]  # Limitar a 10 imágenes
+    
+    def _images_from(self, soup, strategies, base_url):
+        """Recoge las imágenes de los selectores dados y anota cuáles aportaron alguna"""
+        images = []
+        winners = []
+        
+        for selector in strategies:
+            if selector == ALL_IMAGES:
+                continue
             img_elements = soup.select(selector)
             if img_elements:
+                found = len(images)
                 for img in img_elements:
                     src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
                     if src:
@@ -98,18 +311,24 @@ class ProductExtractor:
                         full_url = urljoin(base_url, src)
                         if full_url not in images:
                             images.append(full_url)
+                if len(images) > found:
+                    winners.append(selector)
         
         # Si no se encontraron imágenes específicas, buscar todas las imágenes grandes
-        if not images:
+        if not images and ALL_IMAGES in strategies:
             all_imgs = soup.find_all('img')
             for img in all_imgs:
                 src = img.get('src') or img.get('data-src')
-                if src and any(keyword in src.lower() for keyword in ['product', 'item', 'image']):
+                if src and IMAGE_SRC_KEYWORDS(src):
                     full_url = urljoin(base_url, src)
                     if full_url not in images:
                         images.append(full_url)
+            if images:
+                winners.append(ALL_IMAGES)
         
-        return images[:10]  # Limitar a 10 imágenes
+        if winners:
+            self.selector_winners['Imágenes'] = winners
+        return images
     
     def extract_description(self, soup):
         """Extrae la descripción del producto"""
@@ -133,51 +352,70 @@ class ProductExtractor:
             'p.description'
         ]
         
-        for selector in selectors:
-            desc_elem = soup.select_one(selector)
-            if desc_elem:
-                text = desc_elem.get_text(separator='\n', strip=True)
-                if text and len(text) > 20:  # Asegurar que hay contenido significativo
-                    return text
+        # Después de los selectores, las búsquedas alternativas en el mismo orden
+        for strategy in self._ordered('Descripción', selectors + list(DESCRIPTION_FALLBACKS)):
+            if strategy in DESCRIPTION_FALLBACKS:
+                # Cada alternativa se mide aparte: son las que recorren todo el documento
+                text = self._timed(f"extract_description: {strategy}",
+                                   getattr(self, DESCRIPTION_FALLBACKS[strategy]), soup)
+            else:
+                desc_elem = soup.select_one(strategy)
+                text = desc_elem.get_text(separator='\n', strip=True) if desc_elem else None
+                if text and len(text) <= 20:  # Asegurar que hay contenido significativo
+                    text = None
+            if text:
+                self.selector_winners['Descripción'] = strategy
+                return text
         
-        # Buscar párrafos con texto descriptivo largo (común en Odoo)
+        return "Descripción no encontrada"
+    
+    def _description_from_paragraphs(self, soup):
+        """Buscar párrafos con texto descriptivo largo (común en Odoo)"""
         paragraphs = soup.find_all('p')
         description_parts = []
         for p in paragraphs:
-            text = p.get_text(strip=True)
+            text = self.texts.text(p)
             # Filtrar párrafos que parecen descripciones (más de 50 caracteres)
-            if len(text) > 50 and not any(keyword in text.lower() for keyword in ['cookie', 'privacy', 'términos', 'copyright']):
+            if len(text) > 50 and not NOT_DESCRIPTION_KEYWORDS.in_lower(self.texts.lower(p)):
                 description_parts.append(text)
         
         if description_parts:
             return '\n\n'.join(description_parts)
-        
-        # Buscar divs con contenido de texto descriptivo
-        divs = soup.find_all('div', class_=lambda x: x and ('description' in x.lower() or 'detail' in x.lower() or 'info' in x.lower()))
+        return None
+    
+    def _description_from_divs(self, soup):
+        """Buscar divs con contenido de texto descriptivo"""
+        divs = soup.find_all('div', class_=DESCRIPTION_CLASSES)
         for div in divs:
             text = div.get_text(separator='\n', strip=True)
             if text and len(text) > 50:
                 return text
-        
-        # Buscar en secciones y artículos
+        return None
+    
+    def _description_from_sections(self, soup):
+        """Buscar en secciones y artículos"""
         for tag in ['section', 'article', 'div']:
-            elements = soup.find_all(tag, class_=lambda x: x and 'product' in x.lower())
+            elements = soup.find_all(tag, class_=PRODUCT_CLASSES)
             for elem in elements:
                 # Buscar párrafos dentro de estos elementos
                 inner_ps = elem.find_all('p')
                 if inner_ps:
-                    texts = [p.get_text(strip=True) for p in inner_ps if len(p.get_text(strip=True)) > 30]
+                    texts = [self.texts.text(p) for p in inner_ps if len(self.texts.text(p)) > 30]
                     if texts:
                         return '\n\n'.join(texts)
-        
-        # Buscar meta description como alternativa
+        return None
+    
+    def _description_from_meta(self, soup):
+        """Buscar meta description como alternativa"""
         meta_desc = soup.find('meta', {'name': 'description'})
         if meta_desc:
             content = meta_desc.get('content', '')
             if content and len(content) > 20:
                 return content
-        
-        # Último recurso: buscar cualquier párrafo largo cerca del título
+        return None
+    
+    def _description_near_title(self, soup):
+        """Último recurso: buscar cualquier párrafo largo cerca del título"""
         h1 = soup.find('h1')
         if h1:
             parent = h1.find_parent()
@@ -195,21 +433,22 @@ class ProductExtractor:
                 
                 if desc_lines:
                     return '\n\n'.join(desc_lines[:5])  # Limitar a primeros 5 párrafos
-        
-        return "Descripción no encontrada"
+        return None
     
     def extract_specifications(self, soup):
         """Extrae especificaciones y detalles adicionales del producto"""
         specs = {}
         
-        # Buscar secciones de especificaciones
-        spec_keywords = ['especificaciones', 'especificación', 'características', 'detalles', 'modo de uso']
+        # Encabezados (h2, h3, h4, strong, b, span) que contienen alguna palabra
+        # clave, buscados una vez por tag en lugar de una vez por palabra y tag
+        headings = {tag: [(elem, self.texts.string_lower(elem))
+                          for elem in soup.find_all(tag, string=SPEC_KEYWORDS)]
+                    for tag in SPEC_HEADING_TAGS}
         
         # Buscar por títulos/encabezados que contengan estas palabras
-        for keyword in spec_keywords:
-            # Buscar en h2, h3, h4, strong, b
-            for tag in ['h2', 'h3', 'h4', 'strong', 'b', 'span']:
-                elements = soup.find_all(tag, string=lambda text: text and keyword.lower() in text.lower())
+        for keyword in SPEC_KEYWORDS:
+            for tag in SPEC_HEADING_TAGS:
+                elements = [elem for elem, lowered in headings[tag] if keyword in lowered]
                 for elem in elements:
                     # Buscar el siguiente elemento hermano o padre que contenga la información
                     parent = elem.find_parent()
@@ -220,7 +459,7 @@ class ProductExtractor:
                             for ul in lists:
                                 items = ul.find_all('li')
                                 if items:
-                                    spec_list = [li.get_text(strip=True) for li in items if li.get_text(strip=True)]
+                                    spec_list = [self.texts.text(li) for li in items if self.texts.text(li)]
                                     if spec_list:
                                         specs[keyword.capitalize()] = spec_list
                         
@@ -228,29 +467,33 @@ class ProductExtractor:
                         next_siblings = elem.find_next_siblings(['p', 'div'])
                         spec_texts = []
                         for sibling in next_siblings[:5]:  # Limitar a 5 elementos
-                            text = sibling.get_text(strip=True)
+                            text = self.texts.text(sibling)
                             if text and len(text) > 20:
                                 spec_texts.append(text)
                         if spec_texts:
                             specs[keyword.capitalize()] = '\n'.join(spec_texts)
         
-        # Buscar listas con viñetas que puedan ser especificaciones
-        all_lists = soup.find_all(['ul', 'ol'])
+        # Buscar listas con viñetas que puedan ser especificaciones (solo la
+        # primera cuenta: si ya hay 'Especificaciones' no se recorren)
+        all_lists = soup.find_all(['ul', 'ol']) if 'Especificaciones' not in specs else []
         for ul in all_lists:
             items = ul.find_all('li')
             if items and len(items) >= 2:  # Al menos 2 items para considerar como especificaciones
                 # Verificar si los items parecen especificaciones (contienen palabras clave)
-                spec_keywords_in_items = ['material', 'batería', 'compatibilidad', 'uso', 'instalación']
-                item_texts = [li.get_text(strip=True) for li in items]
-                if any(keyword in ' '.join(item_texts).lower() for keyword in spec_keywords_in_items):
-                    if 'Especificaciones' not in specs:
-                        specs['Especificaciones'] = item_texts
+                item_texts = [self.texts.text(li) for li in items]
+                if SPEC_ITEM_KEYWORDS.in_lower(' '.join(item_texts).lower()):
+                    specs['Especificaciones'] = item_texts
+                    break
         
         return specs
     
-    def extract_attributes(self, soup):
-        """Extrae atributos adicionales del producto (SKU, categoría, etc.)"""
+    def extract_attributes(self, soup, structured=None):
+        """Extrae atributos adicionales del producto (SKU, categoría, etc.)
+
+        structured: campos ya leídos de los datos estructurados, que no se buscan de nuevo
+        """
         attributes = {}
+        structured = structured or {}
         
         # SKU
         sku_selectors = [
@@ -258,11 +501,16 @@ class ProductExtractor:
             '.product-sku',
             '[data-sku]'
         ]
-        for selector in sku_selectors:
-            sku_elem = soup.select_one(selector)
-            if sku_elem:
-                attributes['SKU'] = sku_elem.get_text(strip=True)
-                break
+        if 'SKU' in structured:
+            attributes['SKU'] = self._structured_value('SKU', structured)
+        else:
+            for selector in self._ordered('SKU', sku_selectors):
+                sku_elem = soup.select_one(selector)
+                if sku_elem:
+                    self.selector_winners['SKU'] = selector
+                    attributes['SKU'] = sku_elem.get_text(strip=True)
+                    break
+            self._record_source('SKU', attributes.get('SKU'))
         
         # Categoría
         category_selectors = [
@@ -271,13 +519,18 @@ class ProductExtractor:
             '.breadcrumb a'
         ]
         categories = []
-        for selector in category_selectors:
-            cat_elems = soup.select(selector)
-            if cat_elems:
-                categories = [cat.get_text(strip=True) for cat in cat_elems if cat.get_text(strip=True)]
-                if categories:
-                    attributes['Categorías'] = categories
-                    break
+        if 'Categorías' in structured:
+            attributes['Categorías'] = self._structured_value('Categorías', structured)
+        else:
+            for selector in self._ordered('Categorías', category_selectors):
+                cat_elems = soup.select(selector)
+                if cat_elems:
+                    categories = [self.texts.text(cat) for cat in cat_elems if self.texts.text(cat)]
+                    if categories:
+                        self.selector_winners['Categorías'] = selector
+                        attributes['Categorías'] = categories
+                        break
+            self._record_source('Categorías', attributes.get('Categorías'))
         
         # Disponibilidad
         availability_selectors = [
@@ -285,39 +538,133 @@ class ProductExtractor:
             '.product-availability',
             '.stock-status'
         ]
-        for selector in availability_selectors:
-            avail_elem = soup.select_one(selector)
-            if avail_elem:
-                attributes['Disponibilidad'] = avail_elem.get_text(strip=True)
-                break
+        if 'Disponibilidad' in structured:
+            attributes['Disponibilidad'] = self._structured_value('Disponibilidad', structured)
+        else:
+            for selector in self._ordered('Disponibilidad', availability_selectors):
+                avail_elem = soup.select_one(selector)
+                if avail_elem:
+                    self.selector_winners['Disponibilidad'] = selector
+                    attributes['Disponibilidad'] = avail_elem.get_text(strip=True)
+                    break
+            self._record_source('Disponibilidad', attributes.get('Disponibilidad'))
         
         # Agregar especificaciones a los atributos
-        specs = self.extract_specifications(soup)
+        specs = self._timed('extract_specifications', self.extract_specifications, soup)
         if specs:
             attributes['Especificaciones'] = specs
         
         return attributes
     
+    def _ordered(self, field, strategies):
+        """Pone primero la estrategia que dio el campo en páginas anteriores del mismo host
+
+        Si falla, el resto de la cadena se prueba en su orden original.
+        """
+        winner = self.profile.get(field)
+        if winner in strategies:
+            return [winner] + [s for s in strategies if s != winner]
+        return strategies
+
+    def _record_source(self, field, value):
+        """Anota si un campo buscado con las heurísticas obtuvo valor"""
+        self.field_sources[field] = HEURISTIC if value and value not in NOT_FOUND else MISSING
+
+    def _structured_value(self, field, structured):
+        value, source = structured[field]
+        self.field_sources[field] = source
+        return value
+
+    def _declared_field(self, field, structured):
+        """Valor que solo puede venir de los datos estructurados (no hay heurística)"""
+        if field in structured:
+            return self._structured_value(field, structured)
+        if self.structured:
+            self.field_sources[field] = MISSING
+        return None
+
+    def _extract_field(self, field, structured, method, soup):
+        """Valor declarado por la página o, si no lo hay, el del método heurístico"""
+        if field in structured:
+            return self._structured_value(field, structured)
+        value = self._timed(method.__name__, method, soup)
+        self._record_source(field, value)
+        return value
+
+    def _timed(self, stage, func, *args):
+        """Ejecuta func(*args) y suma su duración a stage_times[stage]"""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + time.perf_counter() - start
+
     def extract_all_data(self):
         """Extrae todos los datos del producto"""
         html_content = self.fetch_page()
         if not html_content:
             return None
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
+
+        return self.extract_from_html(html_content, pruned=True)
+
+    def extract_from_html(self, html_content, pruned=False):
+        """Extrae todos los datos del producto a partir de HTML ya descargado
+
+        pruned: el HTML ya viene podado por fetch_page y no se vuelve a podar.
+        """
+        fingerprint = None
+        if self.fingerprints:
+            fingerprint = content_fingerprint(html_content)
+            previous = self.fingerprints.get(self.url, fingerprint)
+            if previous:
+                previous['Fecha de extracción'] = extraction_timestamp()
+                self.product_data = previous
+                return self.product_data
+
+        self.stage_times = {}
+        if self.prune and not pruned:
+            html_content = self._timed(PRUNE, prune_html, html_content)
+        soup = self._timed(PARSE, self._parse, html_content)
+        structured = self._timed(STRUCTURED, extract_structured, soup, self.url) if self.structured else {}
+        self.field_sources = {}
+        self.selector_winners = {}
         self.product_data = {
             'URL': self.url,
-            'Título': self.extract_title(soup),
-            'Precio': self.extract_price(soup),
-            'Descripción': self.extract_description(soup),
-            'Imágenes': self.extract_images(soup),
-            'Atributos': self.extract_attributes(soup),
-            'Fecha de extracción': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'Título': self._extract_field('Título', structured, self.extract_title, soup),
+            'Precio': self._extract_field('Precio', structured, self.extract_price, soup),
+            'Moneda': self._declared_field('Moneda', structured),
+            'Descripción': self._extract_field('Descripción', structured, self.extract_description, soup),
+            'Imágenes': self._extract_field('Imágenes', structured, self.extract_images, soup),
+            'Atributos': self._timed('extract_attributes', self.extract_attributes, soup, structured),
+            'Fecha de extracción': extraction_timestamp()
         }
+        # Como SKU o Disponibilidad, la moneda solo aparece si la página la declara
+        if self.product_data['Moneda'] is None:
+            del self.product_data['Moneda']
+        # Los textos en caché retienen el árbol del documento
+        self.texts.clear()
+
+        if self.metrics:
+            self.metrics.record_extraction(self.url, self.stage_times, self.field_sources, self.selector_winners)
+
+        if self.fingerprints:
+            self.fingerprints.put(self.url, fingerprint, self.product_data)
         
         return self.product_data
     
+    def _parse(self, html_content):
+        """Construye el árbol con el motor elegido y, si procede, su índice"""
+        if self.parser == 'lxml-native':
+            document = LxmlDocument(html_content)
+        else:
+            document = BeautifulSoup(html_content, self.parser)
+        # Antes del índice, para que los bloques quitados no se indexen
+        if self.drop_navigation:
+            drop_boilerplate(document)
+        if self.parser == 'lxml-native' or self.use_index:
+            return DocumentIndex(document)
+        return document
+    
     def save_to_json(self, filename=None):
         """Guarda los datos extraídos en un archivo JSON"""
         if not self.product_data:
@@ -325,11 +672,8 @@ class ProductExtractor:
             return
         
         if not filename:
-            # Generar nombre de archivo basado en el título
-            safe_title = re.sub(r'[^\w\s-]', '', self.product_data['Título'])[:50]
-            safe_title = re.sub(r'[-\s]+', '-', safe_title)
-            filename = f"producto_{safe_title}.json"
-        
+            filename = product_filename(self.product_data)
+
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(self.product_data, f, ensure_ascii=False, indent=2)
         
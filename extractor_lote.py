@@ -0,0 +1,408 @@
+"""
+Extractor de Productos en Lote
+Extrae datos de muchas URLs de productos de forma concurrente con asyncio
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from cache_http import HttpCache
+from datos_estructurados import FieldSourceStats
+from extractor import PARSERS, ProductExtractor, extraction_timestamp, product_filename
+from frontera import Frontier, path_matcher, product_pattern
+from huella_contenido import FingerprintStore, content_fingerprint
+from imagenes_locales import ImageMirror
+from metricas import ExtractionMetrics
+from perfiles_selectores import SelectorProfiles
+from planificador_hosts import HostScheduler
+from precios import LOCALES, PriceParser
+from reintentos import CircuitBreaker, FailureReport, RetryPolicy
+from almacen_sqlite import ProductStore
+from exportar_parquet import ParquetExporter
+from salida_jsonl import JsonlWriter
+from sesion_http import SessionManager
+
+
+def parse_product(url, html_content, parser='html.parser', structured=False, profile=None, drop_navigation=False):
+    """Parsea el HTML de un producto (usable en otro proceso)
+
+    Devuelve (product_data, origen de cada campo, estrategia ganadora de cada
+    campo, segundos por etapa), todos dicts simples.
+    """
+    extractor = ProductExtractor(url, parser=parser, structured=structured, profile=profile,
+                                 drop_navigation=drop_navigation)
+    data = extractor.extract_from_html(html_content)
+    return data, extractor.field_sources, extractor.selector_winners, extractor.stage_times
+
+
+class BatchExtractor:
+    """Clase para extraer datos de múltiples productos en paralelo"""
+
+    def __init__(self, max_concurrency=32, max_per_host=4, parse_workers=0, parse_queue_size=100,
+                 parser='html.parser', cache=None, fingerprints=None, sessions=None, structured=False,
+                 profiles=None, scheduler=None, retries=None, breaker=None, failures=None, timeout=10,
+                 metrics=None, max_bytes=None, prune=False, drop_navigation=False):
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        # Con parse_workers > 0 el parseo se hace en un pool de procesos
+        self.parse_workers = parse_workers
+        self.parse_queue_size = parse_queue_size
+        self.parser = parser
+        # Leer primero los datos estructurados de la página (JSON-LD, microdatos, OpenGraph)
+        self.structured = structured
+        self.field_sources = FieldSourceStats()
+        # Perfiles de selectores por host (SelectorProfiles): se leen y actualizan en este proceso
+        self.profiles = profiles
+        self.cache = cache
+        # El almacén de huellas se consulta aquí y no en los procesos de parseo
+        self.fingerprints = fingerprints
+        # Todas las descargas comparten el pool de conexiones
+        self.sessions = sessions or SessionManager(connections_per_host=max_per_host)
+        # Planificador opcional (HostScheduler): ritmo adaptativo por host dentro de max_per_host
+        self.scheduler = scheduler
+        # Reintentos (RetryPolicy) y cortacircuitos por host (CircuitBreaker) opcionales
+        self.retries = retries
+        self.breaker = breaker
+        # Informe de fallos por clase de error, acumulado entre lotes
+        self.failures = failures or FailureReport()
+        self.timeout = timeout
+        # Métricas opcionales (ExtractionMetrics): la descarga se mide en los hilos y
+        # los tiempos de parseo vuelven de los procesos con el resultado
+        self.metrics = metrics
+        # Memoria acotada: fetch_page poda en el hilo de descarga, así la cola de
+        # parseo y los procesos solo reciben el HTML ya podado
+        self.max_bytes = max_bytes
+        self.prune = prune
+        self.drop_navigation = drop_navigation
+        self.failed_urls = []
+
+    async def extract_many_async(self, urls):
+        """Generador asíncrono que produce los product_data a medida que se completan"""
+        loop = asyncio.get_running_loop()
+        # Las descargas con requests son bloqueantes: se ejecutan en hilos
+        fetch_executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        feed_executor = ThreadPoolExecutor(max_workers=1)
+        if self.parse_workers > 0:
+            parse_executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+            parser_count = self.parse_workers * 2
+        else:
+            parse_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+            parser_count = os.cpu_count() or 1
+
+        in_flight = asyncio.Semaphore(self.max_concurrency)
+        # Limita las tareas creadas para no cargar miles de URLs en memoria a la vez
+        pending = asyncio.Semaphore(self.max_concurrency * 4)
+        host_slots = {}
+        # Cola acotada entre descarga y parseo: si el parseo va lento, las descargas esperan
+        fetched = asyncio.Queue(maxsize=self.parse_queue_size)
+        # También acotada: si el consumidor va lento (imágenes, SQLite), el parseo espera
+        results = asyncio.Queue(maxsize=self.parse_queue_size)
+        tasks = set()
+        self.failed_urls = []
+
+        async def fetch(url):
+            try:
+                host = urlparse(url).netloc
+                if host not in host_slots:
+                    host_slots[host] = asyncio.Semaphore(self.max_per_host)
+
+                extractor = ProductExtractor(url, cache=self.cache, session=self.sessions.session,
+                                             scheduler=self.scheduler, retries=self.retries,
+                                             breaker=self.breaker, failures=self.failures,
+                                             timeout=self.timeout, metrics=self.metrics,
+                                             max_bytes=self.max_bytes, prune=self.prune)
+                async with host_slots[host]:
+                    async with in_flight:
+                        html_content = await loop.run_in_executor(fetch_executor, extractor.fetch_page)
+
+                if not html_content:
+                    await results.put((url, None))
+                    return
+
+                fingerprint = None
+                if self.fingerprints:
+                    fingerprint = await loop.run_in_executor(fetch_executor, content_fingerprint, html_content)
+                    previous = self.fingerprints.get(url, fingerprint)
+                    if previous:
+                        previous['Fecha de extracción'] = extraction_timestamp()
+                        await results.put((url, previous))
+                        return
+                await fetched.put((url, html_content, fingerprint))
+            except Exception as e:
+                print(f"Error al descargar {url}: {e}")
+                self.failures.add(url, type(e).__name__, e)
+                await results.put((url, None))
+            finally:
+                pending.release()
+
+        async def parse():
+            while True:
+                item = await fetched.get()
+                if item is None:
+                    break
+                url, html_content, fingerprint = item
+                try:
+                    profile = self.profiles.profile(url) if self.profiles else None
+                    data, field_sources, winners, stage_times = await loop.run_in_executor(
+                        parse_executor, parse_product, url, html_content, self.parser, self.structured, profile,
+                        self.drop_navigation
+                    )
+                    self.field_sources.add(field_sources)
+                    if self.metrics:
+                        self.metrics.record_extraction(url, stage_times, field_sources, winners)
+                    if self.profiles:
+                        self.profiles.record(url, winners, profile)
+                except Exception as e:
+                    print(f"Error al parsear {url}: {e}")
+                    self.failures.add(url, 'parseo', e)
+                    data = None
+                # Un error al guardar la huella no pierde el producto ni detiene este parser:
+                # si la tarea muriera, feed() quedaría esperando en la cola acotada
+                if data and self.fingerprints:
+                    try:
+                        self.fingerprints.put(url, fingerprint, data)
+                    except Exception as e:
+                        print(f"Error al guardar la huella de {url}: {e}")
+                        self.failures.add(url, 'huella', e)
+                await results.put((url, data))
+
+        async def feed():
+            # Las URLs pueden venir de un generador que descarga (Frontier): se
+            # avanza en un hilo propio para no bloquear el bucle de eventos
+            error = None
+            try:
+                url_iter = iter(urls)
+                while True:
+                    url = await loop.run_in_executor(feed_executor, next, url_iter, None)
+                    if url is None:
+                        break
+                    await pending.acquire()
+                    task = asyncio.create_task(fetch(url))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            except Exception as e:
+                # Si las URLs fallan (archivo ilegible, sitemap roto...) se terminan las
+                # descargas en curso y se avisa igualmente a los parsers y al consumidor,
+                # que recibe la excepción al esperar esta tarea
+                error = e
+            while tasks:
+                await asyncio.wait(set(tasks))
+            for _ in parsers:
+                await fetched.put(None)
+            await asyncio.gather(*parsers)
+            await results.put(None)
+            if error is not None:
+                raise error
+
+        parsers = [asyncio.create_task(parse()) for _ in range(parser_count)]
+        feeder = asyncio.create_task(feed())
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                url, data = item
+                if data is None:
+                    self.failed_urls.append(url)
+                    continue
+                yield data
+            await feeder
+        finally:
+            pending_tasks = [feeder] + list(tasks) + parsers
+            for task in pending_tasks:
+                task.cancel()
+            await asyncio.gather(*pending_tasks, return_exceptions=True)
+            fetch_executor.shutdown(wait=False, cancel_futures=True)
+            feed_executor.shutdown(wait=False, cancel_futures=True)
+            # Esperar a los procesos evita errores al cerrar el intérprete
+            parse_executor.shutdown(wait=True, cancel_futures=True)
+
+    def extract_many(self, urls):
+        """Extrae los productos de todas las URLs y los produce a medida que se completan"""
+        loop = asyncio.new_event_loop()
+        agen = self.extract_many_async(urls)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(agen.aclose())
+            loop.close()
+
+
+def read_urls(path):
+    """Lee las URLs de un archivo de texto (una por línea)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith('#'):
+                yield url
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Extrae datos de productos en lote desde un archivo de URLs')
+    parser.add_argument('archivo', nargs='?', help='Archivo de texto con una URL de producto por línea')
+    parser.add_argument('--rastrear', metavar='URL_TIENDA',
+                        help='Descubrir las URLs desde el sitemap y la paginación /shop de la tienda '
+                             'en lugar de leerlas de un archivo')
+    parser.add_argument('--patron-producto', type=product_pattern, metavar='REGEX',
+                        help='Con --rastrear, expresión regular de las rutas de producto (por defecto las de Odoo)')
+    parser.add_argument('--directorio', default='.', help='Directorio donde guardar los producto_*.json')
+    parser.add_argument('--jsonl', help='Añadir los productos a este archivo JSONL (.gz/.zst para comprimir) '
+                                        'en lugar de un JSON por producto')
+    parser.add_argument('--parquet', help='Exportar también a Parquet (.parquet, .arrow o directorio de dataset)')
+    parser.add_argument('--sqlite', help='Guardar también en una base SQLite de productos con historial de precios')
+    parser.add_argument('--region', choices=LOCALES,
+                        help="Región de los precios de --parquet y --sqlite (separadores y moneda de '$')")
+    parser.add_argument('--concurrencia', type=int, default=32, help='Máximo de descargas simultáneas')
+    parser.add_argument('--por-host', type=int, default=4, help='Máximo de descargas simultáneas por host')
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1,
+                        help='Procesos para el parseo de HTML (0 = parsear en hilos)')
+    parser.add_argument('--cola-parseo', type=int, default=100,
+                        help='Máximo de páginas descargadas esperando a ser parseadas')
+    parser.add_argument('--parser', choices=PARSERS, default='html.parser', help='Motor de parseo de HTML')
+    parser.add_argument('--cache', help='Directorio de la caché HTTP (desactivada si se omite)')
+    parser.add_argument('--cache-ttl', type=int, default=0,
+                        help='Segundos en que una página se sirve de caché sin revalidar')
+    parser.add_argument('--cache-max-mb', type=int, default=500, help='Tamaño máximo de la caché en MB')
+    parser.add_argument('--incremental', metavar='ARCHIVO_DB',
+                        help='Base de huellas: las páginas sin cambios reutilizan el resultado anterior')
+    parser.add_argument('--datos-estructurados', action='store_true',
+                        help='Leer primero JSON-LD, microdatos y OpenGraph (Precio pasa a ser el valor declarado '
+                             'y se añaden SKU, Disponibilidad y Moneda)')
+    parser.add_argument('--ritmo-max', type=float, metavar='PET_S',
+                        help='Activar el planificador por host con este máximo de peticiones por segundo '
+                             '(respeta Crawl-delay y Retry-After y se adapta a latencia y errores)')
+    parser.add_argument('--ritmo-inicial', type=float, default=2.0,
+                        help='Peticiones por segundo iniciales por host con --ritmo-max')
+    parser.add_argument('--reintentos', type=int, default=3,
+                        help='Reintentos por URL ante timeouts, errores de conexión y 429/5xx (0 = ninguno)')
+    parser.add_argument('--espera-base', type=float, default=0.5,
+                        help='Segundos base de la espera exponencial entre reintentos (con jitter)')
+    parser.add_argument('--timeout', type=float, default=10, help='Segundos de espera por petición')
+    parser.add_argument('--fallos-corte', type=int, default=5,
+                        help='Fallos seguidos de un host que abren su cortacircuitos (0 = desactivado)')
+    parser.add_argument('--corte-segundos', type=float, default=60,
+                        help='Segundos que un host con el circuito abierto falla al instante')
+    parser.add_argument('--informe-fallos', metavar='ARCHIVO_JSON',
+                        help='Guardar el informe de fallos por clase de error en JSON')
+    parser.add_argument('--max-kb', type=int, help='Leer como mucho estos KB de cada página (corta las enormes)')
+    parser.add_argument('--podar', action='store_true',
+                        help='Quitar scripts, estilos y comentarios antes de parsear (misma salida, menos memoria)')
+    parser.add_argument('--sin-navegacion', action='store_true',
+                        help='Quitar además nav/header/footer sin datos del producto (puede cambiar la descripción)')
+    parser.add_argument('--metricas', metavar='ARCHIVO',
+                        help='Medir cada etapa y guardar las métricas (.prom para Prometheus, si no JSON)')
+    parser.add_argument('--perfiles', metavar='ARCHIVO_JSON',
+                        help='Perfiles de selectores por dominio: se prueban primero los que ya funcionaron')
+    parser.add_argument('--imagenes', metavar='DIRECTORIO',
+                        help='Descargar las imágenes a este directorio y guardar rutas locales en Imágenes')
+    args = parser.parse_args()
+    if not args.archivo and not args.rastrear:
+        parser.error('indica un archivo de URLs o --rastrear URL_TIENDA')
+    if args.archivo and not args.rastrear and not os.access(args.archivo, os.R_OK):
+        parser.error(f'no se puede leer el archivo de URLs: {args.archivo}')
+
+    print("="*60)
+    print("EXTRACTOR DE PRODUCTOS EN LOTE")
+    print("="*60)
+
+    os.makedirs(args.directorio, exist_ok=True)
+    cache = None
+    if args.cache:
+        cache = HttpCache(args.cache, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024)
+    fingerprints = FingerprintStore(args.incremental) if args.incremental else None
+    profiles = SelectorProfiles(args.perfiles) if args.perfiles else None
+    sessions = SessionManager(connections_per_host=args.por_host)
+    scheduler = None
+    if args.ritmo_max:
+        scheduler = HostScheduler(initial_rate=min(args.ritmo_inicial, args.ritmo_max), max_rate=args.ritmo_max,
+                                  max_concurrency=args.por_host, session=sessions.session)
+    batch = BatchExtractor(max_concurrency=args.concurrencia, max_per_host=args.por_host,
+                           parse_workers=args.procesos, parse_queue_size=args.cola_parseo,
+                           parser=args.parser, cache=cache, fingerprints=fingerprints,
+                           structured=args.datos_estructurados, profiles=profiles,
+                           sessions=sessions, scheduler=scheduler,
+                           retries=RetryPolicy(args.reintentos, args.espera_base) if args.reintentos else None,
+                           breaker=CircuitBreaker(args.fallos_corte, args.corte_segundos) if args.fallos_corte else None,
+                           timeout=args.timeout, metrics=ExtractionMetrics() if args.metricas else None,
+                           max_bytes=args.max_kb * 1024 if args.max_kb else None, prune=args.podar,
+                           drop_navigation=args.sin_navegacion)
+    frontier = None
+    if args.rastrear:
+        is_product = path_matcher(args.patron_producto) if args.patron_producto else None
+        frontier = Frontier(args.rastrear, session=batch.sessions.session, is_product=is_product)
+    sinks = []
+    if args.jsonl:
+        sinks.append(JsonlWriter(args.jsonl))
+    prices = PriceParser(args.region) if args.region else None
+    if args.parquet:
+        sinks.append(ParquetExporter(args.parquet, prices=prices))
+    if args.sqlite:
+        sinks.append(ProductStore(args.sqlite, prices=prices))
+    mirror = ImageMirror(args.imagenes) if args.imagenes else None
+    start = time.perf_counter()
+    total = 0
+
+    try:
+        products = batch.extract_many(frontier if frontier else read_urls(args.archivo))
+        if mirror:
+            products = mirror.mirror_products(products)
+        for data in products:
+            for sink in sinks:
+                sink.write(data)
+            if not args.jsonl:
+                filename = os.path.join(args.directorio, product_filename(data))
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+            total += 1
+            print(f"   [OK] {data['URL']} - {data['Título']}")
+    finally:
+        for sink in sinks:
+            sink.close()
+        if mirror:
+            mirror.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nProductos extraídos: {total}")
+    print(f"Fallidos: {len(batch.failed_urls)}")
+    print(batch.failures.summary())
+    if batch.breaker and batch.breaker.opened:
+        print(f"Circuitos abiertos: {batch.breaker.opened} ({', '.join(batch.breaker.open_hosts()) or 'ya cerrados'})")
+    if args.informe_fallos:
+        batch.failures.save(args.informe_fallos)
+        print(f"Informe de fallos guardado en: {args.informe_fallos}")
+    print(f"Tiempo total: {elapsed:.1f}s")
+    print(batch.sessions.summary())
+    if scheduler:
+        print(scheduler.summary())
+    if frontier:
+        print(frontier.summary())
+    print(batch.field_sources.summary())
+    if cache:
+        print(cache.summary())
+        cache.close()
+    if mirror:
+        print(mirror.summary())
+    if profiles:
+        print(profiles.summary())
+        profiles.close()
+    if fingerprints:
+        print(fingerprints.summary())
+        fingerprints.close()
+    if batch.metrics:
+        print(batch.metrics.summary())
+        batch.metrics.save(args.metricas)
+        print(f"Métricas guardadas en: {args.metricas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Frontera de Rastreo de la Tienda
+Descubre las URLs de producto de una tienda a partir de sitemap.xml
+(incluidos índices y sitemaps comprimidos) y de la paginación /shop de Odoo,
+sin duplicados y priorizando por lastmod, y las entrega a medida que aparecen
+"""
+
+import argparse
+import gzip
+import hashlib
+import heapq
+import re
+import xml.etree.ElementTree as ET
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import urldefrag, urljoin, urlparse, urlunparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from sesion_http import DEFAULT_HEADERS, create_session, load_robots
+
+
+# Rutas de Odoo: /shop, /shop/page/2, /shop/category/hogar-3/page/2
+SHOP_LISTING_RE = re.compile(r'^/shop(?:/category/[\w-]+)?(?:/page/\d+)?/?$')
+# Producto de Odoo: /shop/dispensador-de-agua-60 o /shop/product/dispensador-de-agua-60
+SHOP_PRODUCT_RE = re.compile(r'^/shop/(?:product/)?(?!page/|category/|cart|checkout|payment|address|confirm)[\w-]+-\d+/?$')
+
+SITEMAP, LISTING, PRODUCT = 'sitemap', 'listing', 'product'
+# Sin lastmod se procesa después de todo lo fechado
+UNDATED = float('inf')
+
+
+def normalize_url(url):
+    """URL canónica para deduplicar: sin fragmento, esquema y host en minúsculas"""
+    url = urldefrag(url.strip())[0]
+    parts = urlparse(url)
+    return urlunparse(parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower(), path=parts.path or '/'))
+
+
+def is_product_url(url):
+    """¿Es la URL la de un producto de Odoo (/shop/<nombre>-<id>)?"""
+    return bool(SHOP_PRODUCT_RE.match(urlparse(url).path))
+
+
+def path_matcher(pattern):
+    """Predicado is_product que busca la expresión regular (texto o compilada) en la ruta de la URL"""
+    pattern = re.compile(pattern)
+    return lambda url: bool(pattern.search(urlparse(url).path))
+
+
+def product_pattern(value):
+    """Tipo de argparse para --patron-producto: la expresión regular compilada"""
+    try:
+        return re.compile(value)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"expresión regular no válida: {e}")
+
+
+def parse_lastmod(value):
+    """Convierte un lastmod W3C ('2024-01-15' o '2024-01-15T10:30:00+00:00') en timestamp"""
+    if not value:
+        return None
+    value = value.strip().replace('Z', '+00:00')
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class SeenSet:
+    """Conjunto compacto de URLs vistas: guarda un hash de 8 bytes por URL
+
+    Un entero de 64 bits ocupa mucho menos que la cadena de la URL; la
+    probabilidad de colisión es despreciable para catálogos de millones de URLs.
+    """
+
+    def __init__(self):
+        self._hashes = set()
+
+    @staticmethod
+    def _key(url):
+        return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def add(self, url):
+        """Añade la URL; devuelve False si ya estaba"""
+        key = self._key(url)
+        if key in self._hashes:
+            return False
+        self._hashes.add(key)
+        return True
+
+    def __contains__(self, url):
+        return self._key(url) in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+class Frontier:
+    """Cola de prioridad de sitemaps, listados /shop y productos de una tienda
+
+    Los elementos más recientes (mayor lastmod) salen primero. Un sitemap se
+    expande antes que los productos más antiguos que él, así las URLs se
+    producen mientras se sigue descubriendo el resto de la tienda.
+
+    is_product: predicado que decide qué URLs de los sitemaps y listados son
+    de producto (por defecto, las rutas de producto de Odoo); el resto de las
+    páginas de los sitemaps (blog, contacto...) se descartan.
+    """
+
+    def __init__(self, base_url, session=None, sitemaps=None, shop=True, max_listing_pages=1000,
+                 respect_robots=True, is_product=None):
+        parts = urlparse(base_url)
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
+        self.host = parts.netloc.lower()
+        self.session = session or create_session()
+        self.shop = shop
+        self.max_listing_pages = max_listing_pages
+        self.is_product = is_product or is_product_url
+        self.seen = SeenSet()
+        self.stats = {'sitemaps': 0, 'listings': 0, 'products': 0, 'duplicates': 0, 'errors': 0, 'disallowed': 0,
+                      'skipped': 0}
+        self._heap = []
+        self._counter = 0
+
+        self.robots = None
+        robots_sitemaps = []
+        if respect_robots:
+            self.robots, robots_sitemaps = load_robots(self.session, self.base_url)
+
+        for sitemap in sitemaps or robots_sitemaps or [urljoin(self.base_url, '/sitemap.xml')]:
+            self._push(SITEMAP, sitemap)
+        if shop:
+            self._push(LISTING, urljoin(self.base_url, '/shop'))
+
+    def allowed(self, url):
+        if self.robots is None:
+            return True
+        return self.robots.can_fetch(DEFAULT_HEADERS['User-Agent'], url)
+
+    def _push(self, kind, url, lastmod=None):
+        url = normalize_url(urljoin(self.base_url, url))
+        if urlparse(url).netloc != self.host:
+            return
+        if not self.seen.add(url):
+            self.stats['duplicates'] += 1
+            return
+        if not self.allowed(url):
+            self.stats['disallowed'] += 1
+            return
+        timestamp = parse_lastmod(lastmod)
+        self._counter += 1
+        heapq.heappush(self._heap, (-timestamp if timestamp is not None else UNDATED, self._counter, kind, url))
+
+    def _fetch(self, url):
+        try:
+            response = self.session.get(url, timeout=30)
+            response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            print(f"   [ERROR] No se pudo descargar {url}: {e}")
+            self.stats['errors'] += 1
+            return None
+
+    def _expand_sitemap(self, url):
+        response = self._fetch(url)
+        if response is None:
+            return
+        self.stats['sitemaps'] += 1
+        content = response.content
+        # sitemap.xml.gz servido como archivo (requests solo descomprime Content-Encoding)
+        try:
+            if content[:2] == b'\x1f\x8b':
+                content = gzip.decompress(content)
+            root = ET.fromstring(content)
+        except (ET.ParseError, gzip.BadGzipFile, EOFError, zlib.error) as e:
+            print(f"   [ERROR] Sitemap no válido {url}: {e}")
+            self.stats['errors'] += 1
+            return
+
+        is_index = root.tag.endswith('sitemapindex')
+        for entry in root:
+            loc = lastmod = None
+            for child in entry:
+                if child.tag.endswith('loc') and child.text:
+                    loc = child.text.strip()
+                elif child.tag.endswith('lastmod'):
+                    lastmod = child.text
+            if not loc:
+                continue
+            if is_index:
+                self._push(SITEMAP, loc, lastmod)
+            elif self._is_listing(loc):
+                self._push(LISTING, loc, lastmod)
+            elif self.is_product(loc):
+                self._push(PRODUCT, loc, lastmod)
+            else:
+                self.stats['skipped'] += 1
+
+    @staticmethod
+    def _is_listing(url):
+        return bool(SHOP_LISTING_RE.match(urlparse(url).path))
+
+    def _expand_listing(self, url):
+        if self.stats['listings'] >= self.max_listing_pages:
+            return
+        response = self._fetch(url)
+        if response is None:
+            return
+        self.stats['listings'] += 1
+        soup = BeautifulSoup(response.text, 'html.parser')
+        for link in soup.find_all('a', href=True):
+            href = urljoin(url, link['href'])
+            parts = urlparse(href)
+            if parts.netloc.lower() != self.host:
+                continue
+            # Los listados de Odoo añaden ?category=... o ?order=... a los enlaces de producto
+            product_url = urlunparse(parts._replace(query='', fragment=''))
+            if self.is_product(product_url):
+                self._push(PRODUCT, product_url)
+            elif SHOP_LISTING_RE.match(parts.path) and not parts.query:
+                self._push(LISTING, href)
+
+    def __iter__(self):
+        """Produce las URLs de producto en orden de prioridad a medida que se descubren"""
+        while self._heap:
+            _, _, kind, url = heapq.heappop(self._heap)
+            if kind == SITEMAP:
+                self._expand_sitemap(url)
+            elif kind == LISTING:
+                if self.shop:
+                    self._expand_listing(url)
+            else:
+                self.stats['products'] += 1
+                yield url
+
+    def summary(self):
+        """Resumen legible del rastreo"""
+        s = self.stats
+        return (f"Frontera: {s['products']} producto(s) de {s['sitemaps']} sitemap(s) y {s['listings']} "
+                f"listado(s), {s['duplicates']} duplicada(s), {s['disallowed']} bloqueada(s) por robots.txt, "
+                f"{s['skipped']} descartada(s) por no ser de producto, {s['errors']} error(es)")
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Lista las URLs de producto de una tienda (sitemap y /shop)')
+    parser.add_argument('tienda', help='URL base de la tienda, por ejemplo https://tienda.odoo.com')
+    parser.add_argument('--sitemap', action='append', help='Sitemap inicial (por defecto los de robots.txt o /sitemap.xml)')
+    parser.add_argument('--sin-shop', action='store_true', help='No recorrer la paginación /shop de Odoo')
+    parser.add_argument('--patron-producto', type=product_pattern, metavar='REGEX',
+                        help='Expresión regular de las rutas de producto (por defecto las de Odoo)')
+    parser.add_argument('--salida', help='Guardar las URLs en este archivo (una por línea)')
+    args = parser.parse_args()
+
+    is_product = path_matcher(args.patron_producto) if args.patron_producto else None
+    frontier = Frontier(args.tienda, sitemaps=args.sitemap, shop=not args.sin_shop, is_product=is_product)
+    output = open(args.salida, 'w', encoding='utf-8') if args.salida else None
+    try:
+        for url in frontier:
+            if output:
+                output.write(url + '\n')
+            else:
+                print(url)
+    finally:
+        if output:
+            output.close()
+    print(frontier.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,35 @@ Generador de Vista HTML para Productos
 Genera automáticamente una vista HTML con todos los productos JSON encontrados
 """
 
-import json
+import argparse
+import hashlib
 import os
 import glob
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from almacen_sqlite import ProductStore
+from manifiesto_vista import CardManifest
+from precios import display_symbol, parse_price
+from salida_jsonl import JSON_DECODER, json_loads, read_jsonl
 
-def format_price(price):
-    """Formatea el precio"""
+
+def format_price(price, currency=None):
+    """Formatea el precio con el símbolo de su moneda: '$ 1.250.000' o '€ 39,90'
+
+    currency: moneda declarada por la página (la 'Moneda' del producto)
+    """
     if not price:
         return 'No disponible'
-    try:
-        num_price = float(price)
-        return f"{num_price:,.0f}".replace(',', '.')
-    except:
+    parsed = parse_price(price, currency)
+    if parsed is None:
         return str(price)
+    # Céntimos solo si los hay; miles con punto y decimales con coma
+    amount = f"{parsed.amount:,.2f}" if parsed.amount % 1 else f"{parsed.amount:,.0f}"
+    amount = amount.replace(',', ' ').replace('.', ',').replace(' ', '.')
+    return f"{display_symbol(parsed.currency)} {amount}"
 
 
 def get_main_image(images):
@@ -40,97 +54,43 @@ def get_gallery_images(images):
     return gallery if gallery else images[:4]
 
 
-def generate_attributes_html(attributes):
-    """Genera HTML para los atributos del producto"""
-    if not attributes:
-        return ''
-    
-    html = ''
-    
-    if attributes.get('Categorías'):
-        html += f'''
+# Plantillas precompiladas: cada fragmento se formatea con str.format sin
+# reconstruir el HTML de la tarjeta en cada llamada
+CATEGORIES_TEMPLATE = '''
                         <div class="product-attributes">
                             <h4>Categorías</h4>
                             <ul>
-                                {''.join([f'<li>{cat}</li>' for cat in attributes['Categorías']])}
+                                {items}
                             </ul>
                         </div>
                     '''
-    
-    if attributes.get('Especificaciones'):
-        specs = attributes['Especificaciones']
-        html += '<div class="specifications">'
-        for key, value in specs.items():
-            if isinstance(value, list):
-                html += f'''
+SPEC_LIST_TEMPLATE = '''
                                 <h5>{key}</h5>
                                 <ul>
-                                    {''.join([f'<li>{item}</li>' for item in value])}
+                                    {items}
                                 </ul>
                             '''
-            else:
-                html += f'''
+SPEC_TEXT_TEMPLATE = '''
                                 <h5>{key}</h5>
                                 <p style="color: #666; font-size: 0.9em; margin-top: 5px;">{value}</p>
                             '''
-        html += '</div>'
-    
-    if attributes.get('SKU'):
-        html += f'''
-                        <div class="product-attributes">
-                            <h4>SKU</h4>
-                            <p style="color: #666; font-size: 0.9em;">{attributes['SKU']}</p>
-                        </div>
-                    '''
-    
-    if attributes.get('Disponibilidad'):
-        html += f'''
+ATTRIBUTE_TEMPLATE = '''
                         <div class="product-attributes">
-                            <h4>Disponibilidad</h4>
-                            <p style="color: #666; font-size: 0.9em;">{attributes['Disponibilidad']}</p>
+                            <h4>{name}</h4>
+                            <p style="color: #666; font-size: 0.9em;">{value}</p>
                         </div>
                     '''
-    
-    return html
-
-
-def generate_product_card(product):
-    """Genera el HTML de una tarjeta de producto"""
-    main_image = get_main_image(product.get('Imágenes', []))
-    gallery_images = get_gallery_images(product.get('Imágenes', []))
-    title = product.get('Título', 'Sin título')
-    price = format_price(product.get('Precio'))
-    description = product.get('Descripción', '')
-    url = product.get('URL', '#')
-    fecha = product.get('Fecha de extracción', 'Fecha no disponible')
-    attributes_html = generate_attributes_html(product.get('Atributos', {}))
-    
-    # Procesar descripción
-    if description and description != 'Descripción no encontrada':
-        description_html = description.replace('\n', '<br>')
-    else:
-        description_html = '<em style="color: #999;">Descripción no disponible</em>'
-    
-    # Generar galería de imágenes
-    gallery_html = ''
-    if len(gallery_images) > 1:
-        gallery_items = []
-        for img in gallery_images:
-            onclick_attr = f"changeMainImage(this, '{main_image}')"
-            gallery_items.append(f'<img src="{img}" alt="Vista adicional" onclick="{onclick_attr}">')
-        gallery_html = f'''
+LIST_ITEM_TEMPLATE = '<li>{}</li>'
+GALLERY_ITEM_TEMPLATE = '<img src="{thumbnail}" data-full="{img}" alt="Vista adicional" loading="lazy" onclick="changeMainImage(this, \'{main_image}\')">'
+GALLERY_TEMPLATE = '''
                     <div class="product-image-gallery">
-                        {''.join(gallery_items)}
+                        {items}
                     </div>
                 '''
-    
-    # Generar imagen principal
-    main_img_html = ''
-    if main_image:
-        error_img = 'data:image/svg+xml,%3Csvg xmlns=\'http://www.w3.org/2000/svg\' width=\'400\' height=\'300\'%3E%3Crect fill=\'%23ddd\' width=\'400\' height=\'300\'/%3E%3Ctext fill=\'%23999\' font-family=\'sans-serif\' font-size=\'20\' dy=\'10.5\' font-weight=\'bold\' x=\'50%25\' y=\'50%25\' text-anchor=\'middle\'%3EImagen no disponible%3C/text%3E%3C/svg%3E'
-        main_img_html = f'<img src="{main_image}" alt="{title}" class="product-image" onerror="this.src=\'{error_img}\'">'
-    
-    return f'''
+ERROR_IMAGE = 'data:image/svg+xml,%3Csvg xmlns=\'http://www.w3.org/2000/svg\' width=\'400\' height=\'300\'%3E%3Crect fill=\'%23ddd\' width=\'400\' height=\'300\'/%3E%3Ctext fill=\'%23999\' font-family=\'sans-serif\' font-size=\'20\' dy=\'10.5\' font-weight=\'bold\' x=\'50%25\' y=\'50%25\' text-anchor=\'middle\'%3EImagen no disponible%3C/text%3E%3C/svg%3E'
+MAIN_IMAGE_TEMPLATE = '<img src="{src}" alt="{title}" class="product-image" loading="lazy" onerror="this.src=\'' + ERROR_IMAGE + '\'">'
+NO_DESCRIPTION_HTML = '<em style="color: #999;">Descripción no disponible</em>'
+CARD_TEMPLATE = '''
                 <div class="product-card">
                     <div class="product-image-container">
                         {main_img_html}
@@ -138,7 +98,7 @@ def generate_product_card(product):
                     {gallery_html}
                     <div class="product-info">
                         <h2 class="product-title">{title}</h2>
-                        <div class="product-price">${price}</div>
+                        <div class="product-price">{price}</div>
                         <div class="product-description">
                             {description_html}
                         </div>
@@ -152,63 +112,57 @@ def generate_product_card(product):
                     </div>
                 </div>
             '''
-
-
-def generate_html(products):
-    """Genera el HTML completo"""
-    products_html = ''.join([generate_product_card(product) for product in products])
-    
-    html_template = f'''<!DOCTYPE html>
+PAGE_HEAD_START = '''<!DOCTYPE html>
 <html lang="es">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Catálogo de Productos - Extractor</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
-        }}
+        }
 
-        header {{
+        header {
             text-align: center;
             color: white;
             margin-bottom: 40px;
             padding: 30px 0;
-        }}
+        }
 
-        header h1 {{
+        header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
+        }
 
-        header p {{
+        header p {
             font-size: 1.2em;
             opacity: 0.9;
-        }}
+        }
 
-        .products-grid {{
+        .products-grid {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
             gap: 30px;
             margin-bottom: 40px;
-        }}
+        }
 
-        .product-card {{
+        .product-card {
             background: white;
             border-radius: 15px;
             overflow: hidden;
@@ -216,41 +170,41 @@ def generate_html(products):
             transition: transform 0.3s ease, box-shadow 0.3s ease;
             display: flex;
             flex-direction: column;
-        }}
+        }
 
-        .product-card:hover {{
+        .product-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 15px 40px rgba(0,0,0,0.3);
-        }}
+        }
 
-        .product-image-container {{
+        .product-image-container {
             position: relative;
             width: 100%;
             height: 300px;
             overflow: hidden;
             background: #f5f5f5;
-        }}
+        }
 
-        .product-image {{
+        .product-image {
             width: 100%;
             height: 100%;
             object-fit: cover;
             transition: transform 0.3s ease;
-        }}
+        }
 
-        .product-card:hover .product-image {{
+        .product-card:hover .product-image {
             transform: scale(1.05);
-        }}
+        }
 
-        .product-image-gallery {{
+        .product-image-gallery {
             display: flex;
             gap: 5px;
             padding: 10px;
             background: #f9f9f9;
             overflow-x: auto;
-        }}
+        }
 
-        .product-image-gallery img {{
+        .product-image-gallery img {
             width: 60px;
             height: 60px;
             object-fit: cover;
@@ -258,35 +212,35 @@ def generate_html(products):
             cursor: pointer;
             border: 2px solid transparent;
             transition: border-color 0.3s ease;
-        }}
+        }
 
-        .product-image-gallery img:hover {{
+        .product-image-gallery img:hover {
             border-color: #667eea;
-        }}
+        }
 
-        .product-info {{
+        .product-info {
             padding: 25px;
             flex-grow: 1;
             display: flex;
             flex-direction: column;
-        }}
+        }
 
-        .product-title {{
+        .product-title {
             font-size: 1.5em;
             font-weight: bold;
             color: #333;
             margin-bottom: 15px;
             line-height: 1.3;
-        }}
+        }
 
-        .product-price {{
+        .product-price {
             font-size: 2em;
             font-weight: bold;
             color: #667eea;
             margin-bottom: 15px;
-        }}
+        }
 
-        .product-description {{
+        .product-description {
             color: #666;
             line-height: 1.6;
             margin-bottom: 20px;
@@ -296,40 +250,40 @@ def generate_html(products):
             display: -webkit-box;
             -webkit-line-clamp: 4;
             -webkit-box-orient: vertical;
-        }}
+        }
 
-        .product-attributes {{
+        .product-attributes {
             margin-top: 15px;
             padding-top: 15px;
             border-top: 1px solid #eee;
-        }}
+        }
 
-        .product-attributes h4 {{
+        .product-attributes h4 {
             color: #333;
             margin-bottom: 10px;
             font-size: 0.9em;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
+        }
 
-        .product-attributes ul {{
+        .product-attributes ul {
             list-style: none;
             padding-left: 0;
-        }}
+        }
 
-        .product-attributes li {{
+        .product-attributes li {
             color: #666;
             padding: 5px 0;
             font-size: 0.9em;
-        }}
+        }
 
-        .product-attributes li::before {{
+        .product-attributes li::before {
             content: "✓ ";
             color: #667eea;
             font-weight: bold;
-        }}
+        }
 
-        .product-link {{
+        .product-link {
             display: inline-block;
             margin-top: 15px;
             padding: 12px 25px;
@@ -340,131 +294,376 @@ def generate_html(products):
             text-align: center;
             transition: opacity 0.3s ease;
             font-weight: 600;
-        }}
+        }
 
-        .product-link:hover {{
+        .product-link:hover {
             opacity: 0.9;
-        }}
+        }
 
-        .product-meta {{
+        .product-meta {
             font-size: 0.85em;
             color: #999;
             margin-top: 15px;
             padding-top: 15px;
             border-top: 1px solid #eee;
-        }}
+        }
 
-        .specifications {{
+        .specifications {
             margin-top: 15px;
-        }}
+        }
 
-        .specifications h5 {{
+        .specifications h5 {
             color: #333;
             margin-bottom: 8px;
             font-size: 0.95em;
-        }}
+        }
 
-        .specifications ul {{
+        .specifications ul {
             list-style: none;
             padding-left: 0;
-        }}
+        }
 
-        .specifications li {{
+        .specifications li {
             color: #666;
             padding: 3px 0;
             font-size: 0.85em;
             padding-left: 15px;
             position: relative;
-        }}
+        }
 
-        .specifications li::before {{
+        .specifications li::before {
             content: "•";
             position: absolute;
             left: 0;
             color: #667eea;
-        }}
+        }
 
-        @media (max-width: 768px) {{
-            .products-grid {{
+        @media (max-width: 768px) {
+            .products-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
 
-            header h1 {{
+            header h1 {
                 font-size: 2em;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
     <div class="container">
         <header>
             <h1>🛍️ Catálogo de Productos</h1>
-            <p>Productos extraídos de páginas web - {len(products)} producto(s) encontrado(s)</p>
+            <p>Productos extraídos de páginas web - '''
+PAGE_HEAD_END = ''' producto(s) encontrado(s)</p>
         </header>
 
         <div class="products-grid">
-            {products_html}
+            '''
+PAGE_TAIL = '''
         </div>
     </div>
 
     <script>
-        function changeMainImage(clickedImg, originalMain) {{
+        function changeMainImage(clickedImg, originalMain) {
             const card = clickedImg.closest('.product-card');
             const mainImg = card.querySelector('.product-image');
-            if (mainImg) {{
-                mainImg.src = clickedImg.src.replace('image_128', 'image_1024').replace('image_512', 'image_1024');
-            }}
-        }}
+            if (mainImg) {
+                mainImg.src = clickedImg.dataset.full || clickedImg.src.replace('image_128', 'image_1024').replace('image_512', 'image_1024');
+            }
+        }
     </script>
 </body>
 </html>'''
+# Ancho reservado para el total de productos, que se conoce al terminar
+COUNT_WIDTH = 12
+
+
+def _list_items(values):
+    return ''.join([LIST_ITEM_TEMPLATE.format(value) for value in values])
+
+
+def generate_attributes_html(attributes):
+    """Genera HTML para los atributos del producto"""
+    if not attributes:
+        return ''
     
-    return html_template
+    parts = []
+    
+    if attributes.get('Categorías'):
+        parts.append(CATEGORIES_TEMPLATE.format(items=_list_items(attributes['Categorías'])))
+    
+    if attributes.get('Especificaciones'):
+        specs = attributes['Especificaciones']
+        parts.append('<div class="specifications">')
+        for key, value in specs.items():
+            if isinstance(value, list):
+                parts.append(SPEC_LIST_TEMPLATE.format(key=key, items=_list_items(value)))
+            else:
+                parts.append(SPEC_TEXT_TEMPLATE.format(key=key, value=value))
+        parts.append('</div>')
+    
+    if attributes.get('SKU'):
+        parts.append(ATTRIBUTE_TEMPLATE.format(name='SKU', value=attributes['SKU']))
+    
+    if attributes.get('Disponibilidad'):
+        parts.append(ATTRIBUTE_TEMPLATE.format(name='Disponibilidad', value=attributes['Disponibilidad']))
+    
+    return ''.join(parts)
+
+
+def generate_product_card(product):
+    """Genera el HTML de una tarjeta de producto"""
+    images = product.get('Imágenes', [])
+    main_image = get_main_image(images)
+    gallery_images = get_gallery_images(images)
+    title = product.get('Título', 'Sin título')
+    description = product.get('Descripción', '')
+    
+    # Procesar descripción
+    if description and description != 'Descripción no encontrada':
+        description_html = description.replace('\n', '<br>')
+    else:
+        description_html = NO_DESCRIPTION_HTML
+    
+    # Generar galería de imágenes
+    gallery_html = ''
+    if len(gallery_images) > 1:
+        # Con imágenes locales (imagenes_locales.py) la galería usa las miniaturas
+        thumbnails = dict(zip(images, product.get('Miniaturas') or images))
+        items = ''.join([GALLERY_ITEM_TEMPLATE.format(img=img, thumbnail=thumbnails.get(img, img), main_image=main_image)
+                         for img in gallery_images])
+        gallery_html = GALLERY_TEMPLATE.format(items=items)
+    
+    return CARD_TEMPLATE.format(
+        main_img_html=MAIN_IMAGE_TEMPLATE.format(src=main_image, title=title) if main_image else '',
+        gallery_html=gallery_html,
+        title=title,
+        price=format_price(product.get('Precio'), product.get('Moneda')),
+        description_html=description_html,
+        attributes_html=generate_attributes_html(product.get('Atributos', {})),
+        url=product.get('URL', '#'),
+        fecha=product.get('Fecha de extracción', 'Fecha no disponible'),
+    )
+
+
+def write_cards(cards, output):
+    """Escribe la vista a partir de tarjetas HTML ya renderizadas y devuelve el total
+
+    cards puede ser cualquier iterable (por ejemplo un generador): no se
+    mantiene en memoria ni la lista de productos ni el HTML completo.
+    """
+    output.write(PAGE_HEAD_START)
+    count_position = output.tell()
+    output.write(' ' * COUNT_WIDTH)
+    output.write(PAGE_HEAD_END)
+    
+    count = 0
+    for card in cards:
+        output.write(card)
+        count += 1
+    output.write(PAGE_TAIL)
+    
+    # Escribir el total en el espacio reservado del encabezado
+    end_position = output.tell()
+    output.seek(count_position)
+    output.write(str(count).ljust(COUNT_WIDTH))
+    output.seek(end_position)
+    return count
+
+
+def write_html(products, output):
+    """Escribe la vista tarjeta a tarjeta en un archivo abierto y devuelve el total de productos"""
+    return write_cards((generate_product_card(product) for product in products), output)
+
+
+def generate_html(products):
+    """Genera el HTML completo"""
+    cards = ''.join([generate_product_card(product) for product in products])
+    return f"{PAGE_HEAD_START}{len(products)}{PAGE_HEAD_END}{cards}{PAGE_TAIL}"
+
+
+def load_json_file(json_file):
+    """Lee y decodifica un archivo JSON de producto (se ejecuta en un hilo)"""
+    with open(json_file, 'rb') as f:
+        return json_loads(f.read())
+
+
+def _iter_parallel(func, json_files, workers):
+    """Aplica func a cada archivo en un pool de hilos y produce (archivo, future) en orden"""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        files = iter(json_files)
+        # Ventana acotada de lecturas en curso para no cargar todo el catálogo en memoria
+        for json_file in files:
+            pending.append((json_file, executor.submit(func, json_file)))
+            if len(pending) >= workers * 4:
+                break
+
+        while pending:
+            json_file, future = pending.popleft()
+            next_file = next(files, None)
+            if next_file is not None:
+                pending.append((next_file, executor.submit(func, next_file)))
+            yield json_file, future
+
+
+def iter_json_files(json_files, workers=16):
+    """Generador que lee los archivos producto_*.json en paralelo, manteniendo el orden"""
+    start = time.perf_counter()
+    loaded = 0
+    for json_file, future in _iter_parallel(load_json_file, json_files, workers):
+        try:
+            product = future.result()
+        except Exception as e:
+            print(f"   [ERROR] Error al leer {json_file}: {e}")
+            continue
+        loaded += 1
+        print(f"   [OK] {json_file} - {product.get('Título', 'Sin título')}")
+        yield product
+
+    elapsed = time.perf_counter() - start
+    print(f"\nCarga: {loaded} archivo(s) en {elapsed:.2f}s ({workers} hilos, decodificador {JSON_DECODER})")
+
+
+def template_version():
+    """Huella del código de renderizado: si cambia, las tarjetas del manifiesto se descartan"""
+    digest = hashlib.sha1()
+    # format_price depende de la normalización de precios.py
+    for path in (__file__, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'precios.py')):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def iter_manifest_cards(json_files, manifest, workers=16):
+    """Generador de tarjetas HTML que solo renderiza los archivos nuevos o modificados"""
+    start = time.perf_counter()
+    loaded = 0
+    card_for_file = lambda json_file: manifest.card_for_file(json_file, json_loads, generate_product_card)
+    for json_file, future in _iter_parallel(card_for_file, json_files, workers):
+        try:
+            title, card = future.result()
+        except Exception as e:
+            print(f"   [ERROR] Error al leer {json_file}: {e}")
+            continue
+        loaded += 1
+        print(f"   [OK] {json_file} - {title}")
+        yield card
+
+    removed = manifest.prune()
+    elapsed = time.perf_counter() - start
+    print(f"\nCarga: {loaded} archivo(s) en {elapsed:.2f}s ({workers} hilos, decodificador {JSON_DECODER})")
+    print(f"{manifest.summary()}, {removed} eliminada(s)")
+
+
+def iter_jsonl_products(path):
+    """Generador que lee los productos de un archivo JSONL (.jsonl, .jsonl.gz o .jsonl.zst)"""
+    for product in read_jsonl(path):
+        print(f"   [OK] {path} - {product.get('Título', 'Sin título')}")
+        yield product
+
+
+def iter_sqlite_products(path, since=None, category=None):
+    """Generador que lee los productos de la base SQLite, opcionalmente filtrados"""
+    conditions, params = [], []
+    if since:
+        conditions.append('extracted_at >= ?')
+        params.append(since)
+    if category:
+        conditions.append('category = ?')
+        params.append(category)
+
+    store = ProductStore(path)
+    try:
+        for product in store.iter_products(' AND '.join(conditions) or None, tuple(params)):
+            print(f"   [OK] {product.get('URL', '')} - {product.get('Título', 'Sin título')}")
+            yield product
+    finally:
+        store.close()
 
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description='Genera la vista HTML de los productos extraídos')
+    parser.add_argument('--jsonl', help='Leer los productos de un archivo JSONL en lugar de producto_*.json')
+    parser.add_argument('--sqlite', help='Leer los productos de una base SQLite (almacen_sqlite)')
+    parser.add_argument('--desde', help='Con --sqlite: solo productos extraídos desde esta fecha (YYYY-MM-DD)')
+    parser.add_argument('--categoria', help='Con --sqlite: solo productos de esta categoría')
+    parser.add_argument('--salida', default='vista_productos.html', help='Archivo HTML de salida')
+    parser.add_argument('--paginas', metavar='DIRECTORIO',
+                        help='Generar una vista paginada por categoría en este directorio')
+    parser.add_argument('--por-pagina', type=int, default=100, help='Productos por página con --paginas')
+    parser.add_argument('--hilos', type=int, default=16, help='Hilos para leer los producto_*.json')
+    parser.add_argument('--manifiesto', default='.manifiesto_vista.db',
+                        help='Manifiesto de tarjetas ya renderizadas de los producto_*.json')
+    parser.add_argument('--sin-manifiesto', action='store_true',
+                        help='Renderizar todas las tarjetas sin usar ni actualizar el manifiesto')
+    args = parser.parse_args()
+
     print("="*60)
     print("GENERADOR DE VISTA HTML DE PRODUCTOS")
     print("="*60)
     
-    # Buscar todos los archivos JSON de productos
-    json_files = glob.glob('producto_*.json')
+    json_files = None
+    if args.sqlite:
+        if not os.path.exists(args.sqlite):
+            print(f"\n❌ No existe la base {args.sqlite}")
+            return
+        print(f"\nLeyendo productos de {args.sqlite}:")
+        products = iter_sqlite_products(args.sqlite, args.desde, args.categoria)
+    elif args.jsonl:
+        if not os.path.exists(args.jsonl):
+            print(f"\n❌ No existe el archivo {args.jsonl}")
+            return
+        print(f"\nLeyendo productos de {args.jsonl}:")
+        products = iter_jsonl_products(args.jsonl)
+    else:
+        # Buscar todos los archivos JSON de productos
+        json_files = glob.glob('producto_*.json')
+        
+        if not json_files:
+            print("\n❌ No se encontraron archivos JSON de productos.")
+            print("   Asegúrate de tener archivos con el formato: producto_*.json")
+            return
+        
+        print(f"\nEncontrados {len(json_files)} archivo(s) JSON:")
+        products = iter_json_files(json_files, args.hilos)
     
-    if not json_files:
-        print("\n❌ No se encontraron archivos JSON de productos.")
-        print("   Asegúrate de tener archivos con el formato: producto_*.json")
+    if args.paginas:
+        from vista_paginada import write_paginated
+        total = write_paginated(products, args.paginas, args.por_pagina)
+        if not total:
+            print("\nNo se pudieron cargar productos.")
+            return
+        print(f"\nVista paginada generada en: {args.paginas}")
+        print(f"   Total de productos: {total}")
+        print(f"\nAbre {os.path.join(args.paginas, 'index.html')} en tu navegador para ver el catalogo.")
         return
     
-    print(f"\nEncontrados {len(json_files)} archivo(s) JSON:")
-    products = []
-    
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                product = json.load(f)
-                products.append(product)
-                print(f"   [OK] {json_file} - {product.get('Título', 'Sin título')}")
-        except Exception as e:
-            print(f"   [ERROR] Error al leer {json_file}: {e}")
+    # Generar el HTML tarjeta a tarjeta mientras se leen los productos
+    output_file = args.salida
+    manifest = None
+    if json_files and not args.sin_manifiesto:
+        manifest = CardManifest(args.manifiesto, template_version())
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            if manifest:
+                total = write_cards(iter_manifest_cards(json_files, manifest, args.hilos), f)
+            else:
+                total = write_html(products, f)
+    finally:
+        if manifest:
+            manifest.close()
     
-    if not products:
+    if not total:
+        os.remove(output_file)
         print("\nNo se pudieron cargar productos.")
         return
     
-    # Generar HTML
-    html_content = generate_html(products)
-    
-    # Guardar archivo HTML
-    output_file = 'vista_productos.html'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
     print(f"\nVista HTML generada exitosamente: {output_file}")
-    print(f"   Total de productos: {len(products)}")
+    print(f"   Total de productos: {total}")
     print(f"\nAbre {output_file} en tu navegador para ver el catalogo.")
 
 
 if __name__ == "__main__":
     main()
-
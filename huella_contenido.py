@@ -0,0 +1,84 @@
+"""
+Huella de Contenido para Extracción Incremental
+Calcula una huella del HTML normalizado y guarda el último product_data de
+cada URL para no volver a parsear páginas que no cambiaron
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+
+# Partes del HTML que cambian en cada petición sin que cambie el producto
+VOLATILE_PATTERNS = [
+    # <input type="hidden" name="csrf_token" value="...">
+    (re.compile(r'<input[^>]*name=["\']csrf_token["\'][^>]*>', re.IGNORECASE), ''),
+    # csrf_token: "...", nonce="...", _token='...'
+    (re.compile(r'(csrf_?token|nonce|_token)(["\']?\s*[:=]\s*)(["\'])[^"\']*\3', re.IGNORECASE), r'\1\2""'),
+    # Fechas y horas ISO 8601
+    (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'), ''),
+    # Marcas de tiempo en parámetros anti-caché (?_=1700000000000, &ts=...)
+    (re.compile(r'([?&](?:_|t|ts|timestamp|cb)=)\d{9,13}'), r'\1'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def content_fingerprint(html_content):
+    """Huella SHA-256 del HTML sin tokens CSRF, fechas ni espacios redundantes"""
+    for pattern, replacement in VOLATILE_PATTERNS:
+        html_content = pattern.sub(replacement, html_content)
+    return hashlib.sha256(html_content.encode('utf-8')).hexdigest()
+
+
+class FingerprintStore:
+    """Almacén local del último product_data y su huella por URL"""
+
+    def __init__(self, path='huellas.db'):
+        self.path = path
+        self.stats = {'reused': 0, 'parsed': 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT PRIMARY KEY,
+                fingerprint TEXT,
+                data TEXT,
+                updated_at REAL
+            )
+        ''')
+        self._db.commit()
+
+    def get(self, url, fingerprint):
+        """Devuelve el product_data guardado si la huella coincide, o None"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data FROM results WHERE url = ? AND fingerprint = ?', (url, fingerprint)
+            ).fetchone()
+        if not row:
+            return None
+        self.stats['reused'] += 1
+        return json.loads(row[0])
+
+    def put(self, url, fingerprint, product_data):
+        """Guarda el product_data recién extraído con su huella"""
+        with self._lock:
+            self.stats['parsed'] += 1
+            self._db.execute(
+                'INSERT OR REPLACE INTO results (url, fingerprint, data, updated_at) VALUES (?, ?, ?, ?)',
+                (url, fingerprint, json.dumps(product_data, ensure_ascii=False), time.time())
+            )
+            self._db.commit()
+
+    def summary(self):
+        """Resumen legible de los contadores del almacén"""
+        return (f"Extracción incremental: {self.stats['reused']} sin cambios (reutilizados), "
+                f"{self.stats['parsed']} parseados")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,301 @@
+"""
+Copia Local de Imágenes de Productos
+Descarga las imágenes de los productos con un pool acotado, las guarda en un
+directorio direccionado por contenido, genera miniaturas y reescribe
+'Imágenes' con las rutas locales para generar_vista
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+from salida_jsonl import JsonlWriter, read_jsonl
+from sesion_http import create_session
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_DIRECTORY = 'miniaturas'
+# Extensiones por tipo de contenido cuando la URL no la indica (las de Odoo no la llevan)
+IMAGE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/svg+xml': '.svg',
+    'image/avif': '.avif',
+}
+
+
+def image_extension(url, content_type):
+    """Extensión del archivo local según el Content-Type o, en su defecto, la URL"""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in IMAGE_EXTENSIONS:
+        return IMAGE_EXTENSIONS[content_type]
+    extension = os.path.splitext(urlparse(url).path)[1].lower()
+    if extension and mimetypes.types_map.get(extension, '').startswith('image/'):
+        return extension
+    return mimetypes.guess_extension(content_type) or '.img'
+
+
+class ImageMirror:
+    """Descarga y deduplica imágenes por hash de contenido en un directorio local
+
+    Cada imagen se guarda como <directorio>/<ab>/<sha256><ext> y su miniatura en
+    <directorio>/miniaturas/<sha256>.jpg (requiere Pillow; sin Pillow la
+    miniatura es la propia imagen). Un índice SQLite recuerda qué URL ya se
+    descargó para no repetir descargas entre ejecuciones. Las rutas se guardan
+    absolutas: la vista puede generarse desde otro directorio de trabajo.
+    """
+
+    def __init__(self, directory='imagenes', workers=8, thumbnail_size=THUMBNAIL_SIZE, session=None):
+        self.directory = os.path.abspath(directory)
+        self.workers = workers
+        self.thumbnail_size = thumbnail_size
+        self.session = session or create_session(pool_maxsize=workers)
+        self.stats = {'downloaded': 0, 'reused': 0, 'duplicates': 0, 'failed': 0, 'bytes': 0}
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        # Descargas en curso por URL, para no pedir dos veces la misma imagen
+        self._in_flight = {}
+
+        os.makedirs(os.path.join(directory, THUMBNAIL_DIRECTORY), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, 'indice.db'), check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS images (
+                url TEXT PRIMARY KEY,
+                hash TEXT,
+                path TEXT,
+                thumbnail TEXT
+            )
+        ''')
+        self._db.commit()
+
+    def _lookup(self, url):
+        with self._lock:
+            row = self._db.execute('SELECT path, thumbnail FROM images WHERE url = ?', (url,)).fetchone()
+        if row and os.path.exists(row[0]) and os.path.exists(row[1]):
+            # Los índices anteriores guardaban rutas relativas al directorio de trabajo
+            return tuple(os.path.abspath(path) for path in row)
+        return None
+
+    def _make_thumbnail(self, data, content_hash, path):
+        """Genera la miniatura JPEG; devuelve la ruta de la imagen original si no es posible"""
+        if Image is None:
+            return path
+        thumbnail = os.path.join(self.directory, THUMBNAIL_DIRECTORY, f"{content_hash}.jpg")
+        if os.path.exists(thumbnail):
+            return thumbnail
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.thumbnail(self.thumbnail_size)
+                if image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+                tmp = f"{thumbnail}.{threading.get_ident()}.tmp"
+                image.save(tmp, 'JPEG', quality=80, optimize=True)
+            os.replace(tmp, thumbnail)
+            return thumbnail
+        except Exception:
+            # SVG u otros formatos que Pillow no puede abrir
+            return path
+
+    def _download(self, url):
+        """Descarga una imagen y devuelve (ruta, miniatura), o None si falla"""
+        cached = self._lookup(url)
+        if cached:
+            with self._lock:
+                self.stats['reused'] += 1
+            return cached
+
+        try:
+            response = self.session.get(url, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"   [ERROR] No se pudo descargar la imagen {url}: {e}")
+            with self._lock:
+                self.stats['failed'] += 1
+            return None
+
+        data = response.content
+        content_hash = hashlib.sha256(data).hexdigest()
+        subdirectory = os.path.join(self.directory, content_hash[:2])
+        path = os.path.join(subdirectory, content_hash + image_extension(url, response.headers.get('Content-Type')))
+
+        # Mismo contenido desde otra URL: se reutiliza el archivo existente
+        duplicate = os.path.exists(path)
+        if not duplicate:
+            try:
+                os.makedirs(subdirectory, exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except OSError as e:
+                # Disco lleno, permisos...: la imagen cuenta como fallida y el producto conserva la URL
+                print(f"   [ERROR] No se pudo guardar la imagen {url}: {e}")
+                with self._lock:
+                    self.stats['failed'] += 1
+                return None
+        thumbnail = self._make_thumbnail(data, content_hash, path)
+
+        with self._lock:
+            self.stats['duplicates' if duplicate else 'downloaded'] += 1
+            self.stats['bytes'] += len(data)
+            self._db.execute('INSERT OR REPLACE INTO images (url, hash, path, thumbnail) VALUES (?, ?, ?, ?)',
+                             (url, content_hash, path, thumbnail))
+        return path, thumbnail
+
+    def _submit(self, url):
+        if not url.startswith(('http://', 'https://')):
+            return None
+        with self._lock:
+            future = self._in_flight.get(url)
+            if future is None:
+                future = self._executor.submit(self._download, url)
+                self._in_flight[url] = future
+                future.add_done_callback(lambda f, url=url: self._forget(url))
+        return future
+
+    def _forget(self, url):
+        with self._lock:
+            self._in_flight.pop(url, None)
+
+    def _rewrite(self, product_data, futures):
+        """Sustituye las URLs remotas por las rutas locales; las fallidas se conservan
+
+        Confirma el índice tras cada producto: una interrupción no pierde las
+        imágenes ya descargadas.
+        """
+        images, thumbnails = [], []
+        local = 0
+        # Las rutas ya locales de una ejecución anterior conservan su miniatura
+        previous = dict(zip(product_data.get('Imágenes') or [], product_data.get('Miniaturas') or []))
+        for url, future in zip(product_data.get('Imágenes') or [], futures):
+            result = future.result() if future else None
+            images.append(result[0] if result else url)
+            thumbnails.append(result[1] if result else previous.get(url, url))
+            local += result is not None
+        if futures:
+            with self._lock:
+                self._db.commit()
+        if not local:
+            return product_data
+        product_data = dict(product_data)
+        product_data['Imágenes'] = images
+        product_data['Miniaturas'] = thumbnails
+        return product_data
+
+    def mirror_product(self, product_data):
+        """Descarga las imágenes de un producto y devuelve una copia con rutas locales"""
+        futures = [self._submit(url) for url in product_data.get('Imágenes') or []]
+        return self._rewrite(product_data, futures)
+
+    def mirror_products(self, products, window=None):
+        """Generador que copia las imágenes de varios productos a la vez, manteniendo el orden
+
+        Como mucho `window` productos tienen descargas en curso simultáneamente.
+        """
+        window = window or self.workers * 4
+        pending = deque()
+        for product_data in products:
+            futures = [self._submit(url) for url in product_data.get('Imágenes') or []]
+            pending.append((product_data, futures))
+            if len(pending) >= window:
+                product_data, futures = pending.popleft()
+                yield self._rewrite(product_data, futures)
+        while pending:
+            product_data, futures = pending.popleft()
+            yield self._rewrite(product_data, futures)
+
+    def summary(self):
+        """Resumen legible de las descargas"""
+        s = self.stats
+        return (f"Imágenes: {s['downloaded']} descargada(s), {s['duplicates']} duplicada(s), "
+                f"{s['reused']} ya en local, {s['failed']} fallida(s), {s['bytes'] / 1024 / 1024:.1f} MB")
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _iter_json_files(json_files):
+    for json_file in json_files:
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                product_data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"   [ERROR] Error al leer {json_file}: {e}")
+            continue
+        product_data['_archivo'] = json_file
+        yield product_data
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Descarga las imágenes de los productos y usa rutas locales')
+    parser.add_argument('--jsonl', help='Leer los productos de un archivo JSONL en lugar de producto_*.json')
+    parser.add_argument('--salida-jsonl', help='Con --jsonl: archivo JSONL donde escribir los productos reescritos')
+    parser.add_argument('--directorio', default='imagenes', help='Directorio local de imágenes')
+    parser.add_argument('--hilos', type=int, default=8, help='Descargas simultáneas')
+    parser.add_argument('--miniatura', type=int, default=THUMBNAIL_SIZE[0],
+                        help='Lado máximo de las miniaturas en píxeles')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("COPIA LOCAL DE IMÁGENES DE PRODUCTOS")
+    print("="*60)
+
+    if args.jsonl and not args.salida_jsonl:
+        print("\n❌ Con --jsonl indica también --salida-jsonl")
+        return
+    if Image is None:
+        print("\n⚠️  Pillow no está instalado: las miniaturas serán las imágenes originales")
+
+    start = time.perf_counter()
+    total = 0
+    with ImageMirror(args.directorio, args.hilos, (args.miniatura, args.miniatura)) as mirror:
+        if args.jsonl:
+            with JsonlWriter(args.salida_jsonl) as writer:
+                for product_data in mirror.mirror_products(read_jsonl(args.jsonl)):
+                    writer.write(product_data)
+                    total += 1
+                    print(f"   [OK] {product_data.get('Título', 'Sin título')}")
+        else:
+            # Los producto_*.json se reescriben en su sitio
+            for product_data in mirror.mirror_products(_iter_json_files(glob.glob('producto_*.json'))):
+                json_file = product_data.pop('_archivo')
+                with open(json_file, 'w', encoding='utf-8') as f:
+                    json.dump(product_data, f, ensure_ascii=False, indent=2)
+                total += 1
+                print(f"   [OK] {json_file} - {product_data.get('Título', 'Sin título')}")
+        print(f"\nProductos procesados: {total} en {time.perf_counter() - start:.1f}s")
+        print(mirror.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Índice del Documento HTML
+Recorre el árbol de BeautifulSoup una sola vez y responde las consultas
+de los métodos extract_* sin volver a recorrer todo el documento
+"""
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+from motor_lxml import LxmlNode
+
+
+# Selector simple compuesto: tag.clase#id[attr] o [attr="valor"]
+SIMPLE_SELECTOR_RE = re.compile(r'^[\w-]*(?:\.[\w-]+|#[\w-]+|\[[\w-]+(?:="[^"]*")?\])*$')
+SELECTOR_PART_RE = re.compile(r'\.([\w-]+)|#([\w-]+)|\[([\w-]+)(="([^"]*)")?\]')
+
+
+def _lxml_node_key(elem):
+    # Los nodos de lxml-native son envoltorios nuevos en cada acceso: cuenta el elemento lxml
+    return id(elem.element)
+
+
+def _parse_compound(compound):
+    """Convierte 'tag.clase[attr="v"]' en (tag, clases, ids, atributos)"""
+    tag = re.match(r'[\w-]*', compound).group(0) or None
+    classes, ids, attrs = [], [], []
+    for cls, id_, attr, has_value, value in SELECTOR_PART_RE.findall(compound[len(tag or ''):]):
+        if cls:
+            classes.append(cls)
+        elif id_:
+            ids.append(id_)
+        else:
+            attrs.append((attr, value if has_value else None))
+    return tag, tuple(classes), tuple(ids), tuple(attrs)
+
+
+@lru_cache(maxsize=1024)
+def compile_selector(selector):
+    """Selector ya analizado (una tupla por compuesto), o None si el índice no lo resuelve
+
+    Los extract_* usan siempre los mismos selectores: se analizan una vez por proceso.
+    """
+    compounds = selector.split()
+    if not compounds or not all(SIMPLE_SELECTOR_RE.match(c) for c in compounds):
+        return None
+    return tuple(_parse_compound(c) for c in compounds)
+
+
+class DocumentIndex:
+    """Índice de un documento parseado: elementos por tag, clase, itemprop, id y atributo
+
+    Implementa el subconjunto de la API de BeautifulSoup que usan los métodos
+    extract_* (select, select_one, find_all, find), por lo que se puede pasar
+    en lugar del soup.
+    """
+
+    def __init__(self, soup):
+        self.soup = soup
+        self.position = {}
+        self.by_tag = defaultdict(list)
+        self.by_class = defaultdict(list)
+        self.by_id = defaultdict(list)
+        self.by_itemprop = defaultdict(list)
+        self.by_attr = defaultdict(list)
+        self.elements = soup.find_all(True)
+        self._strings = {}
+        # Identidad de un nodo para comparar ancestros, elegida una vez por documento
+        self.node_key = _lxml_node_key if self.elements and isinstance(self.elements[0], LxmlNode) else id
+
+        for pos, elem in enumerate(self.elements):
+            self.position[id(elem)] = pos
+            self.by_tag[elem.name].append(elem)
+            for attr, value in elem.attrs.items():
+                self.by_attr[attr].append(elem)
+                if attr == 'class':
+                    for token in value:
+                        self.by_class[token].append(elem)
+                elif attr == 'id':
+                    self.by_id[value].append(elem)
+                elif attr == 'itemprop':
+                    self.by_itemprop[' '.join(value) if isinstance(value, list) else value].append(elem)
+
+    def _sorted(self, elements):
+        """Ordena elementos en orden de documento sin duplicados"""
+        unique = {id(elem): elem for elem in elements}
+        return sorted(unique.values(), key=lambda elem: self.position[id(elem)])
+
+    def string(self, elem):
+        """Devuelve elem.string guardándolo en caché"""
+        key = id(elem)
+        if key not in self._strings:
+            self._strings[key] = elem.string
+        return self._strings[key]
+
+    def find_all(self, name=None, attrs=None, class_=None, string=None):
+        """Equivalente a soup.find_all para los casos usados por el extractor"""
+        names = [name] if isinstance(name, str) else name
+
+        if class_ is not None:
+            # El filtro de clase se evalúa una vez por clase distinta, no por nodo
+            if callable(class_):
+                tokens = [token for token in self.by_class if class_(token)]
+            else:
+                tokens = [class_]
+            candidates = self._sorted(elem for token in tokens for elem in self.by_class.get(token, []))
+        elif names:
+            if len(names) == 1:
+                candidates = self.by_tag.get(names[0], [])
+            else:
+                candidates = self._sorted(elem for tag in names for elem in self.by_tag.get(tag, []))
+        else:
+            candidates = self.elements
+
+        result = []
+        for elem in candidates:
+            if names and elem.name not in names:
+                continue
+            if attrs and any(elem.get(key) != value for key, value in attrs.items()):
+                continue
+            if string is not None:
+                text = self.string(elem)
+                if not (string(text) if callable(string) else text == string):
+                    continue
+            result.append(elem)
+        return result
+
+    def find(self, name=None, attrs=None, class_=None, string=None):
+        """Equivalente a soup.find"""
+        result = self.find_all(name, attrs, class_, string)
+        return result[0] if result else None
+
+    def _matches(self, elem, tag, classes, ids, attrs):
+        """Comprueba si un elemento cumple un selector simple compuesto"""
+        if tag and elem.name != tag:
+            return False
+        if classes and not all(cls in elem.get('class', []) for cls in classes):
+            return False
+        if ids and not all(elem.get('id') == id_ for id_ in ids):
+            return False
+        for attr, value in attrs:
+            if attr not in elem.attrs:
+                return False
+            if value is not None:
+                current = elem.attrs[attr]
+                if isinstance(current, list):
+                    current = ' '.join(current)
+                if current != value:
+                    return False
+        return True
+
+    def _candidates(self, tag, classes, ids, attrs):
+        """Elige la lista más pequeña del índice para un selector simple"""
+        if ids:
+            return self.by_id.get(ids[0], [])
+        for attr, value in attrs:
+            if attr == 'itemprop' and value is not None:
+                return self.by_itemprop.get(value, [])
+        if classes:
+            return self.by_class.get(classes[0], [])
+        if attrs:
+            return self.by_attr.get(attrs[0][0], [])
+        if tag:
+            return self.by_tag.get(tag, [])
+        return self.elements
+
+    def _select(self, selector, limit=None):
+        """Resuelve selectores simples y de descendiente con el índice"""
+        parsed = compile_selector(selector)
+        if parsed is None:
+            return self.soup.select(selector, limit=limit)
+
+        # Elementos que cumplen cada compuesto de ancestro, resueltos una vez con el
+        # índice: en el recorrido de ancestros basta comprobar la pertenencia
+        node_key = self.node_key
+        ancestors = [{node_key(elem) for elem in self._candidates(*compound) if self._matches(elem, *compound)}
+                     for compound in parsed[:-1]]
+        if not all(ancestors):
+            return []
+
+        result = []
+        # Las listas del índice ya están en orden de documento
+        for elem in self._candidates(*parsed[-1]):
+            if not self._matches(elem, *parsed[-1]):
+                continue
+            # Verificar los ancestros para el resto del selector (de derecha a izquierda)
+            remaining = len(parsed) - 2
+            for ancestor in elem.parents:
+                if remaining < 0:
+                    break
+                if node_key(ancestor) in ancestors[remaining]:
+                    remaining -= 1
+            if remaining < 0:
+                result.append(elem)
+                if limit and len(result) >= limit:
+                    break
+        return result
+
+    def select(self, selector):
+        """Equivalente a soup.select"""
+        return self._select(selector)
+
+    def select_one(self, selector):
+        """Equivalente a soup.select_one"""
+        result = self._select(selector, limit=1)
+        return result[0] if result else None
@@ -0,0 +1,98 @@
+"""
+Manifiesto de la Vista HTML
+Guarda, por archivo de producto, su mtime, tamaño, hash de contenido y la
+tarjeta HTML ya renderizada, para regenerar solo los productos modificados
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+
+class CardManifest:
+    """Caché persistente de tarjetas renderizadas indexada por ruta de archivo"""
+
+    def __init__(self, path='.manifiesto_vista.db', template_version=''):
+        self.path = path
+        self.stats = {'unchanged': 0, 'rendered': 0}
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS cards (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER,
+                size INTEGER,
+                hash TEXT,
+                title TEXT,
+                html TEXT
+            )
+        ''')
+
+        # Si cambiaron las plantillas, ninguna tarjeta guardada sirve
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'template_version'").fetchone()
+        if not row or row[0] != template_version:
+            self._db.execute('DELETE FROM cards')
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('template_version', ?)",
+                             (template_version,))
+        self._db.commit()
+
+    def card_for_file(self, json_file, load, render):
+        """Devuelve (título, tarjeta HTML) reutilizando la guardada si el archivo no cambió
+
+        load(bytes) decodifica el producto y render(product) genera su tarjeta;
+        solo se llaman para archivos nuevos o modificados.
+        """
+        stat = os.stat(json_file)
+        with self._lock:
+            self._seen.add(json_file)
+            row = self._db.execute(
+                'SELECT mtime_ns, size, hash, title, html FROM cards WHERE path = ?', (json_file,)
+            ).fetchone()
+
+        # Mismo mtime y tamaño: ni siquiera se lee el archivo
+        if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            with self._lock:
+                self.stats['unchanged'] += 1
+            return row[3], row[4]
+
+        with open(json_file, 'rb') as f:
+            data = f.read()
+        content_hash = hashlib.sha1(data).hexdigest()
+        if row and row[2] == content_hash:
+            title, html = row[3], row[4]
+            unchanged = True
+        else:
+            product = load(data)
+            title, html = product.get('Título', 'Sin título'), render(product)
+            unchanged = False
+
+        with self._lock:
+            self.stats['unchanged' if unchanged else 'rendered'] += 1
+            self._db.execute(
+                'INSERT OR REPLACE INTO cards (path, mtime_ns, size, hash, title, html) VALUES (?, ?, ?, ?, ?, ?)',
+                (json_file, stat.st_mtime_ns, stat.st_size, content_hash, title, html)
+            )
+        return title, html
+
+    def prune(self):
+        """Elimina del manifiesto los archivos que ya no forman parte de la vista"""
+        with self._lock:
+            stored = [path for (path,) in self._db.execute('SELECT path FROM cards')]
+            removed = [(path,) for path in stored if path not in self._seen]
+            self._db.executemany('DELETE FROM cards WHERE path = ?', removed)
+        return len(removed)
+
+    def summary(self):
+        """Resumen legible de las tarjetas reutilizadas y regeneradas"""
+        return (f"Manifiesto: {self.stats['unchanged']} tarjeta(s) reutilizada(s), "
+                f"{self.stats['rendered']} renderizada(s)")
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
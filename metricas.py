@@ -0,0 +1,206 @@
+"""
+Métricas de Extracción
+Tiempos por etapa (descarga, parseo y cada extract_*), ramas de selectores y
+alternativas que dieron cada campo y bytes descargados, con hooks para
+recibir cada evento y exportación en formato de texto de Prometheus o JSON
+"""
+
+import json
+import threading
+from collections import Counter
+
+from datos_estructurados import HEURISTIC, MISSING
+
+
+# Etapas además de los extract_*: la espera de turno del planificador solo existe con HostScheduler
+FETCH, SCHEDULER_WAIT, PRUNE, PARSE, STRUCTURED = ('descarga', 'espera de turno', 'poda', 'parseo',
+                                                   'datos estructurados')
+# Límites (segundos) de los cubos del histograma de Prometheus
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def branch_for(field, source, winners):
+    """Rama que dio un campo: el origen estructurado, el selector o alternativa ganadora, o 'sin dato'"""
+    if source == HEURISTIC:
+        winner = winners.get(field)
+        if isinstance(winner, list):
+            return ' + '.join(winner)
+        return winner or HEURISTIC
+    return source or MISSING
+
+
+def response_bytes(response):
+    """Bytes recibidos de la red (comprimidos si hubo Content-Encoding)"""
+    raw = getattr(response, 'raw', None)
+    try:
+        return int(raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        return len(response.content or b'')
+
+
+def _label(value):
+    """Escapa un valor de etiqueta de Prometheus"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class StageTimer:
+    """Duraciones de una etapa: recuento, suma, máximo y cubos del histograma"""
+
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, limit in enumerate(BUCKETS):
+            if seconds <= limit:
+                self.buckets[i] += 1
+
+
+class ExtractionMetrics:
+    """Métricas acumuladas de una ejecución, seguras entre hilos
+
+    Cada observación se pasa también a los hooks registrados como un dict
+    con la clave 'evento' ('etapa', 'rama' o 'descarga') y la URL; un hook
+    que falla no interrumpe la extracción.
+    """
+
+    def __init__(self, hooks=None):
+        self.hooks = list(hooks or [])
+        self.stages = {}
+        self.branches = Counter()
+        self.downloads = Counter()
+        self.bytes_downloaded = 0
+        self.truncated = 0
+        self.pages = 0
+        self._lock = threading.Lock()
+
+    def add_hook(self, callback):
+        """Registra callback(evento) para cada etapa, rama y descarga observada"""
+        self.hooks.append(callback)
+
+    def _emit(self, event):
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"[ERROR] Hook de métricas: {e}")
+
+    def observe(self, url, stage, seconds):
+        """Anota la duración de una etapa"""
+        with self._lock:
+            timer = self.stages.get(stage)
+            if timer is None:
+                timer = self.stages[stage] = StageTimer()
+            timer.add(seconds)
+        if self.hooks:
+            self._emit({'evento': 'etapa', 'url': url, 'etapa': stage, 'segundos': seconds})
+
+    def record_download(self, url, nbytes, status, truncated=False):
+        """Anota una respuesta HTTP, los bytes recibidos y si se cortó por el límite de bytes"""
+        with self._lock:
+            self.bytes_downloaded += nbytes
+            self.downloads[status] += 1
+            self.truncated += truncated
+        if self.hooks:
+            self._emit({'evento': 'descarga', 'url': url, 'bytes': nbytes, 'estado': status,
+                        'truncada': truncated})
+
+    def record_extraction(self, url, stage_times, field_sources, winners):
+        """Anota una extracción: los tiempos de ProductExtractor.stage_times y la rama de cada campo"""
+        for stage, seconds in stage_times.items():
+            self.observe(url, stage, seconds)
+        branches = {field: branch_for(field, source, winners) for field, source in field_sources.items()}
+        with self._lock:
+            self.pages += 1
+            for field, branch in branches.items():
+                self.branches[(field, branch)] += 1
+        if self.hooks:
+            for field, branch in branches.items():
+                self._emit({'evento': 'rama', 'url': url, 'campo': field, 'rama': branch})
+
+    def as_dict(self):
+        """Resumen de la ejecución en un dict serializable a JSON"""
+        with self._lock:
+            branches = {}
+            for (field, branch), count in sorted(self.branches.items()):
+                branches.setdefault(field, {})[branch] = count
+            return {
+                'paginas': self.pages,
+                'bytes_descargados': self.bytes_downloaded,
+                'truncadas': self.truncated,
+                'descargas_por_estado': {str(status): n for status, n in sorted(self.downloads.items())},
+                'etapas': {
+                    stage: {
+                        'n': timer.count,
+                        'total_s': round(timer.total, 4),
+                        'media_ms': round(timer.total / timer.count * 1000, 3) if timer.count else None,
+                        'max_ms': round(timer.max * 1000, 3),
+                    }
+                    for stage, timer in self.stages.items()
+                },
+                'ramas': branches,
+            }
+
+    def prometheus(self):
+        """Métricas en el formato de texto de Prometheus"""
+        lines = []
+        with self._lock:
+            lines.append('# HELP extractor_stage_seconds Duración de cada etapa de la extracción')
+            lines.append('# TYPE extractor_stage_seconds histogram')
+            for stage, timer in self.stages.items():
+                label = f'stage="{_label(stage)}"'
+                for limit, count in zip(BUCKETS, timer.buckets):
+                    lines.append(f'extractor_stage_seconds_bucket{{{label},le="{limit}"}} {count}')
+                lines.append(f'extractor_stage_seconds_bucket{{{label},le="+Inf"}} {timer.count}')
+                lines.append(f'extractor_stage_seconds_sum{{{label}}} {timer.total}')
+                lines.append(f'extractor_stage_seconds_count{{{label}}} {timer.count}')
+
+            lines.append('# HELP extractor_branch_total Campos obtenidos por cada selector, alternativa u origen')
+            lines.append('# TYPE extractor_branch_total counter')
+            for (field, branch), count in sorted(self.branches.items()):
+                lines.append(f'extractor_branch_total{{field="{_label(field)}",branch="{_label(branch)}"}} {count}')
+
+            lines.append('# HELP extractor_downloaded_bytes_total Bytes recibidos en las respuestas HTTP')
+            lines.append('# TYPE extractor_downloaded_bytes_total counter')
+            lines.append(f'extractor_downloaded_bytes_total {self.bytes_downloaded}')
+            lines.append('# HELP extractor_truncated_pages_total Respuestas cortadas por el límite de bytes')
+            lines.append('# TYPE extractor_truncated_pages_total counter')
+            lines.append(f'extractor_truncated_pages_total {self.truncated}')
+            lines.append('# HELP extractor_responses_total Respuestas HTTP por código de estado')
+            lines.append('# TYPE extractor_responses_total counter')
+            for status, count in sorted(self.downloads.items()):
+                lines.append(f'extractor_responses_total{{status="{status}"}} {count}')
+
+            lines.append('# HELP extractor_pages_total Páginas extraídas')
+            lines.append('# TYPE extractor_pages_total counter')
+            lines.append(f'extractor_pages_total {self.pages}')
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path):
+        """Guarda las métricas: texto de Prometheus si la extensión es .prom, si no JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.prom'):
+                f.write(self.prometheus())
+            else:
+                json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary(self, branches_per_field=3):
+        """Resumen legible: tiempo medio por etapa y ramas más frecuentes por campo"""
+        report = self.as_dict()
+        lines = [f"Métricas: {report['paginas']} página(s), {report['bytes_descargados'] / 1024:.0f} KB descargados, "
+                 f"{report['truncadas']} truncada(s)"]
+        stages = sorted(report['etapas'].items(), key=lambda item: item[1]['total_s'], reverse=True)
+        for stage, s in stages:
+            lines.append(f"   {stage}: media {s['media_ms']:.2f} ms, máx {s['max_ms']:.2f} ms ({s['n']} veces)")
+        lines.append('Ramas por campo:')
+        for field, counts in report['ramas'].items():
+            top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:branches_per_field]
+            lines.append(f"   {field}: " + ', '.join(f"{branch} {n}" for branch, n in top))
+        return '\n'.join(lines)
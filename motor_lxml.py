@@ -0,0 +1,153 @@
+"""
+Motor de Parseo Nativo con lxml
+Construye el árbol directamente con lxml, sin BeautifulSoup, y expone los
+métodos de Tag que usan los extract_* para mantener la misma salida
+"""
+
+import lxml.etree
+import lxml.html
+
+try:
+    import cssselect
+except ImportError:
+    cssselect = None
+
+
+# Etiquetas cuyo texto BeautifulSoup excluye del get_text() de sus ancestros
+TEXT_CONTAINER_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+
+
+def _is_tag(element):
+    """Los comentarios e instrucciones de procesamiento no tienen tag de texto"""
+    return isinstance(element.tag, str)
+
+
+def _iter_strings(element, include_containers):
+    """Recorre los textos de un subárbol en orden de documento
+
+    Con una pila explícita en vez de recursión: las páginas con miles de
+    niveles de anidamiento superarían el límite de recursión de Python.
+    """
+    if element.text:
+        yield element.text
+    # Cada entrada: (elemento, iterador de sus hijos pendientes)
+    stack = [(element, iter(element))]
+    while stack:
+        parent, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            # La cola de un elemento va después de todo su contenido
+            if stack and parent.tail:
+                yield parent.tail
+            continue
+        if _is_tag(child) and (include_containers or child.tag not in TEXT_CONTAINER_TAGS):
+            if child.text:
+                yield child.text
+            stack.append((child, iter(child)))
+        elif child.tail:
+            yield child.tail
+
+
+def _wrap(element):
+    return LxmlNode(element) if element is not None else None
+
+
+class LxmlNode:
+    """Envoltorio de un elemento lxml con la API de Tag usada por el extractor"""
+
+    __slots__ = ('element', '_attrs')
+
+    def __init__(self, element):
+        self.element = element
+        self._attrs = None
+
+    @property
+    def name(self):
+        return self.element.tag
+
+    @property
+    def attrs(self):
+        if self._attrs is None:
+            self._attrs = dict(self.element.attrib)
+            # BeautifulSoup entrega la clase como lista de tokens
+            if 'class' in self._attrs:
+                self._attrs['class'] = self._attrs['class'].split()
+        return self._attrs
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    @property
+    def parents(self):
+        parent = self.element.getparent()
+        while parent is not None:
+            yield LxmlNode(parent)
+            parent = parent.getparent()
+
+    def find_parent(self):
+        return _wrap(self.element.getparent())
+
+    def find_all(self, name=None):
+        names = [name] if isinstance(name, str) else (name or [])
+        return [LxmlNode(child) for child in self.element.iterdescendants(*names) if _is_tag(child)]
+
+    def find_next_siblings(self, name=None):
+        names = [name] if isinstance(name, str) else (name or [])
+        return [LxmlNode(sibling) for sibling in self.element.itersiblings(*names) if _is_tag(sibling)]
+
+    def get_text(self, separator='', strip=False):
+        texts = _iter_strings(self.element, self.name in TEXT_CONTAINER_TAGS)
+        if strip:
+            texts = (text.strip() for text in texts)
+            texts = (text for text in texts if text)
+        return separator.join(texts)
+
+    @property
+    def string(self):
+        """Igual que Tag.string: el texto del único hijo, o None"""
+        children = []
+        if self.element.text:
+            children.append(self.element.text)
+        for child in self.element:
+            children.append(child)
+            if child.tail:
+                children.append(child.tail)
+        if len(children) != 1:
+            return None
+        child = children[0]
+        if isinstance(child, str):
+            return child
+        if not _is_tag(child):
+            return child.text
+        return LxmlNode(child).string
+
+
+class LxmlDocument:
+    """Documento parseado con lxml, equivalente al objeto BeautifulSoup"""
+
+    name = '[document]'
+
+    def __init__(self, html_content):
+        if isinstance(html_content, str):
+            # lxml no acepta str con declaración de codificación
+            html_content = html_content.encode('utf-8')
+        # huge_tree: sin él libxml2 corta las páginas con anidamiento muy profundo
+        parser = lxml.html.HTMLParser(encoding='utf-8', huge_tree=True)
+        try:
+            self.root = lxml.html.document_fromstring(html_content, parser=parser)
+        except lxml.etree.ParserError:
+            # 'Document is empty': solo espacios, comentarios o la declaración XML.
+            # BeautifulSoup devuelve un documento vacío; aquí, un <html> sin hijos
+            self.root = lxml.html.document_fromstring(b'<html></html>', parser=parser)
+
+    def find_all(self, name=None):
+        return [LxmlNode(element) for element in self.root.iter() if _is_tag(element)]
+
+    def select(self, selector, limit=None):
+        # Solo para selectores que el índice no resuelve (los de los extract_* los
+        # resuelve todos, ver tests/test_conformidad_parsers.py)
+        if cssselect is None:
+            raise ImportError(f"El selector {selector!r} requiere el paquete 'cssselect' (pip install cssselect)")
+        result = [LxmlNode(element) for element in self.root.cssselect(selector)]
+        return result[:limit] if limit else result
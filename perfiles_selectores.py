@@ -0,0 +1,72 @@
+"""
+Perfiles de Selectores por Dominio
+Recuerda qué selector (o estrategia) dio cada campo en las páginas de una
+tienda para probarlo primero en las siguientes páginas del mismo host
+"""
+
+import json
+import os
+from urllib.parse import urlparse
+
+
+class SelectorProfiles:
+    """Estrategia ganadora por host y campo, guardada en un archivo JSON
+
+    Formato: {host: {campo: {"estrategia": selector o lista, "aciertos": n}}}.
+    Una estrategia distinta reemplaza a la anterior, así el perfil se adapta
+    si la tienda cambia su plantilla.
+    """
+
+    def __init__(self, path='perfiles_selectores.json'):
+        self.path = path
+        self.profiles = {}
+        self.stats = {'hits': 0, 'misses': 0}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.profiles = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] No se pudo leer el perfil de selectores {path}: {e}")
+
+    @staticmethod
+    def host(url):
+        return urlparse(url).netloc.lower()
+
+    def profile(self, url):
+        """Estrategias a probar primero para la página: {campo: estrategia}"""
+        fields = self.profiles.get(self.host(url), {})
+        return {field: entry['estrategia'] for field, entry in fields.items()}
+
+    def record(self, url, winners, profile=None):
+        """Anota las estrategias que dieron cada campo en una página
+
+        profile: el perfil con el que se extrajo la página, para contar aciertos.
+        """
+        fields = self.profiles.setdefault(self.host(url), {})
+        for field, strategy in winners.items():
+            if profile is not None and field in profile:
+                self.stats['hits' if profile[field] == strategy else 'misses'] += 1
+            entry = fields.get(field)
+            if entry and entry['estrategia'] == strategy:
+                entry['aciertos'] += 1
+            else:
+                fields[field] = {'estrategia': strategy, 'aciertos': 1}
+
+    def save(self):
+        """Guarda los perfiles de forma atómica"""
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.profiles, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def summary(self):
+        """Resumen legible de los aciertos del perfil"""
+        total = self.stats['hits'] + self.stats['misses']
+        ratio = self.stats['hits'] / total * 100 if total else 0
+        return (f"Perfiles de selectores: {len(self.profiles)} host(s), "
+                f"{self.stats['hits']} de {total} campos con el selector del perfil ({ratio:.0f}%)")
+
+    def close(self):
+        self.save()
@@ -0,0 +1,200 @@
+"""
+Planificador de Peticiones por Host
+Cubo de tokens por host que respeta el Crawl-delay de robots.txt y el
+Retry-After de las respuestas, y ajusta ritmo y concurrencia al estilo AIMD
+según la latencia y los errores observados
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from sesion_http import DEFAULT_HEADERS, create_session, load_robots
+
+
+# Respuestas que indican que el servidor pide bajar el ritmo
+THROTTLE_STATUS = {429, 503}
+
+
+def parse_retry_after(value):
+    """Segundos de espera de una cabecera Retry-After (segundos o fecha HTTP), o None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    """Ritmo, tokens y concurrencia de un host"""
+
+    def __init__(self, rate, concurrency, max_rate, max_concurrency):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.crawl_delay = None
+        self.latency = None
+        self.successes = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def refill(self, now):
+        # Capacidad del cubo: permite ráfagas de hasta un segundo de peticiones
+        capacity = max(1.0, self.rate)
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class HostScheduler:
+    """Reparte el permiso para hacer peticiones a cada host
+
+    acquire(url) bloquea el hilo hasta que hay un token y un hueco de
+    concurrencia para el host; release(...) informa del resultado:
+    - éxito con latencia bajo el objetivo: aumento aditivo del ritmo y, por
+      cada ventana completa de éxitos, un hueco más de concurrencia
+    - 429/503, error de red o latencia sobre el objetivo: reducción a la mitad
+    - Retry-After: el host queda en pausa el tiempo indicado
+    """
+
+    def __init__(self, initial_rate=2.0, max_rate=20.0, min_rate=0.1, max_concurrency=4,
+                 latency_target=2.0, rate_step=0.25, session=None, respect_robots=True):
+        self.initial_rate = initial_rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.rate_step = rate_step
+        self.session = session or create_session()
+        self.respect_robots = respect_robots
+        self._hosts = {}
+        self._robots_locks = {}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(min(self.initial_rate, self.max_rate), min(2, self.max_concurrency),
+                              self.max_rate, self.max_concurrency)
+            self._hosts[host] = state
+        return state
+
+    def _load_crawl_delay(self, url, host):
+        """Lee el Crawl-delay de robots.txt una sola vez por host"""
+        with self._lock:
+            lock = self._robots_locks.setdefault(host, threading.Lock())
+        with lock:
+            with self._lock:
+                if host in self._hosts:
+                    return
+            parts = urlparse(url)
+            robots, _ = load_robots(self.session, f"{parts.scheme}://{parts.netloc}")
+            delay = None
+            if robots is not None:
+                delay = robots.crawl_delay(DEFAULT_HEADERS['User-Agent'])
+                request_rate = robots.request_rate(DEFAULT_HEADERS['User-Agent'])
+                if request_rate and request_rate.requests:
+                    delay = max(delay or 0, request_rate.seconds / request_rate.requests)
+            with self._lock:
+                state = self._state(host)
+                if delay:
+                    state.crawl_delay = float(delay)
+                    # Crawl-delay es la separación mínima entre peticiones: una a la vez
+                    state.max_rate = min(state.max_rate, 1.0 / state.crawl_delay)
+                    state.rate = min(state.rate, state.max_rate)
+                    state.max_concurrency = 1
+                    state.concurrency = 1
+
+    def acquire(self, url):
+        """Espera turno para pedir url; cada acquire() debe ir seguido de un release()"""
+        host = urlparse(url).netloc.lower()
+        if self.respect_robots and host not in self._hosts:
+            self._load_crawl_delay(url, host)
+        with self._cond:
+            state = self._state(host)
+            while True:
+                now = time.monotonic()
+                state.refill(now)
+                if now < state.blocked_until:
+                    timeout = state.blocked_until - now
+                elif state.in_flight >= state.concurrency:
+                    timeout = None
+                elif state.tokens < 1:
+                    timeout = (1 - state.tokens) / state.rate
+                else:
+                    state.tokens -= 1
+                    state.in_flight += 1
+                    state.requests += 1
+                    return
+                self._cond.wait(timeout)
+
+    def release(self, url, status=None, latency=None, retry_after=None, error=False):
+        """Registra el resultado de la petición y ajusta el ritmo del host"""
+        host = urlparse(url).netloc.lower()
+        with self._cond:
+            state = self._state(host)
+            state.in_flight = max(state.in_flight - 1, 0)
+            if latency is not None:
+                state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+
+            pause = parse_retry_after(retry_after)
+            if pause:
+                state.blocked_until = max(state.blocked_until, time.monotonic() + pause)
+
+            throttled = status in THROTTLE_STATUS
+            slow = latency is not None and latency > self.latency_target
+            if throttled or error or slow:
+                # Disminución multiplicativa
+                state.throttled += throttled
+                state.errors += error
+                state.rate = max(self.min_rate, state.rate / 2)
+                state.concurrency = max(1, state.concurrency // 2)
+                state.tokens = min(state.tokens, 0.0)
+                state.successes = 0
+            elif status is not None and status < 400:
+                # Aumento aditivo
+                state.rate = min(state.max_rate, state.rate + self.rate_step)
+                state.successes += 1
+                if state.successes >= state.concurrency and state.concurrency < state.max_concurrency:
+                    state.concurrency += 1
+                    state.successes = 0
+            self._cond.notify_all()
+
+    def rates(self):
+        """Estado actual por host: ritmo (peticiones/s), concurrencia, latencia media..."""
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(state.rate, 2),
+                    'concurrency': state.concurrency,
+                    'in_flight': state.in_flight,
+                    'crawl_delay': state.crawl_delay,
+                    'latency_ms': round(state.latency * 1000) if state.latency is not None else None,
+                    'requests': state.requests,
+                    'throttled': state.throttled,
+                    'errors': state.errors,
+                }
+                for host, state in self._hosts.items()
+            }
+
+    def summary(self):
+        """Resumen legible del ritmo por host"""
+        lines = ['Ritmo por host:']
+        for host, s in self.rates().items():
+            delay = f", crawl-delay {s['crawl_delay']}s" if s['crawl_delay'] else ''
+            latency = f"{s['latency_ms']} ms" if s['latency_ms'] is not None else 'n/d'
+            lines.append(f"   {host}: {s['rate']} pet/s, concurrencia {s['concurrency']}, latencia {latency}, "
+                         f"{s['requests']} peticiones, {s['throttled']} limitadas (429/503), "
+                         f"{s['errors']} errores{delay}")
+        return '\n'.join(lines)
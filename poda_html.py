@@ -0,0 +1,87 @@
+"""
+Poda del HTML para Páginas Enormes
+Quita del HTML lo que ningún extract_* lee (scripts, estilos, comentarios) y
+del árbol los bloques de navegación, cabecera y pie sin datos del producto,
+para que las páginas con megabytes de scripts o megamenús no disparen la memoria
+"""
+
+import re
+
+from bs4 import Tag
+
+from motor_lxml import LxmlDocument
+
+
+# Un único patrón para que gane lo que aparece antes: un comentario que
+# contiene <script> o un script que contiene "<!--" se tratan como en el navegador
+RAW_BLOCK_RE = re.compile(r'<!--.*?-->|<(script|style)\b([^>]*)>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+# Los datos estructurados (JSON-LD) van en <script type="application/ld+json">
+JSON_LD_TYPE_RE = re.compile(r'type\s*=\s*["\']?application/ld\+json', re.IGNORECASE)
+
+# Bloques que se descartan si no contienen nada que lean los extract_*
+BOILERPLATE_TAGS = ('nav', 'header', 'footer')
+KEEP_XPATH = (".//h1 | .//*[@itemprop or @itemscope or contains(@class, 'breadcrumb') "
+              "or contains(@class, 'product') or contains(@class, 'price')]")
+
+
+def _keep_block(match):
+    if match.group(1) and JSON_LD_TYPE_RE.search(match.group(2)):
+        return match.group(0)
+    return ''
+
+
+def prune_html(html_content):
+    """Quita scripts (salvo JSON-LD), estilos y comentarios del HTML"""
+    return RAW_BLOCK_RE.sub(_keep_block, html_content)
+
+
+def _is_relevant_class(value):
+    value = ' '.join(value) if isinstance(value, list) else value
+    return any(marker in value for marker in ('breadcrumb', 'product', 'price'))
+
+
+def _soup_relevant(elem):
+    """¿El elemento es el título, tiene microdatos o es de migas de pan o del producto?"""
+    if elem.name == 'h1' or 'itemprop' in elem.attrs or 'itemscope' in elem.attrs:
+        return True
+    return _is_relevant_class(elem.get('class') or '')
+
+
+def drop_boilerplate(document):
+    """Elimina del árbol nav/header/footer sin datos del producto; devuelve los bloques quitados
+
+    Acepta un BeautifulSoup o un LxmlDocument y se aplica antes de construir
+    el índice del documento.
+    """
+    dropped = 0
+    # Un bloque dentro de otro ya quitado (un nav en un header) no se vuelve a revisar
+    removed = set()
+    if isinstance(document, LxmlDocument):
+        for element in list(document.root.iter(*BOILERPLATE_TAGS)):
+            if any(ancestor in removed for ancestor in element.iterancestors()) or _lxml_keeps(element):
+                continue
+            element.drop_tree()
+            removed.add(element)
+            dropped += 1
+        return dropped
+
+    # Recorridos directos: find_all/find con filtros son varias veces más lentos en árboles grandes
+    blocks = [elem for elem in document.descendants if isinstance(elem, Tag) and elem.name in BOILERPLATE_TAGS]
+    for tag in blocks:
+        if any(id(parent) in removed for parent in tag.parents):
+            continue
+        if _soup_relevant(tag) or any(_soup_relevant(elem) for elem in tag.descendants if isinstance(elem, Tag)):
+            continue
+        # extract() solo desengancha el bloque; decompose() recorrería todo el subárbol
+        tag.extract()
+        removed.add(id(tag))
+        dropped += 1
+    return dropped
+
+
+def _lxml_keeps(element):
+    if element.tag == 'h1' or 'itemprop' in element.attrib or 'itemscope' in element.attrib:
+        return True
+    if _is_relevant_class(element.get('class') or ''):
+        return True
+    return bool(element.xpath(KEEP_XPATH))
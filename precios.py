@@ -0,0 +1,169 @@
+"""
+Normalización de Precios
+Convierte los precios en texto ('$ 1.250.000,00', '€39,90', '13000.0') en un
+importe Decimal y una moneda ISO 4217, con caché para los textos repetidos y
+conversión por lotes para comparar, ordenar y filtrar precios
+"""
+
+import re
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+
+Price = namedtuple('Price', ['amount', 'currency'])
+
+# Configuraciones regionales: (separador decimal, separador de miles, moneda de '$' y de los precios sin símbolo)
+LOCALES = {
+    'es_CO': (',', '.', 'COP'),
+    'es_AR': (',', '.', 'ARS'),
+    'es_CL': (',', '.', 'CLP'),
+    'es_ES': (',', '.', 'EUR'),
+    'es_MX': ('.', ',', 'MXN'),
+    'pt_BR': (',', '.', 'BRL'),
+    'en_US': ('.', ',', 'USD'),
+}
+# Símbolos y códigos reconocidos; '$' depende de la configuración regional
+CURRENCY_SYMBOLS = {
+    'US$': 'USD', 'USD': 'USD', 'COP': 'COP', 'MXN': 'MXN', 'ARS': 'ARS', 'CLP': 'CLP',
+    '€': 'EUR', 'EUR': 'EUR', 'R$': 'BRL', 'BRL': 'BRL', 'S/': 'PEN', 'PEN': 'PEN',
+    '£': 'GBP', 'GBP': 'GBP',
+}
+# Símbolo con el que se muestra cada moneda (el resto, '$')
+DISPLAY_SYMBOLS = {'EUR': '€', 'BRL': 'R$', 'PEN': 'S/', 'GBP': '£'}
+
+
+
+def _symbol_pattern(symbol):
+    # Los códigos, solo como palabra completa; 'S/' en mayúscula y al inicio de
+    # palabra, para no confundirlo con la barra de 'precios/unidad'
+    if symbol.isalpha():
+        return rf'\b{re.escape(symbol)}\b'
+    if symbol == 'S/':
+        return r'(?-i:(?<!\w)S/)'
+    return re.escape(symbol)
+
+
+# Los más largos primero ('US$' y 'R$' antes que '$')
+CURRENCY_RE = re.compile('|'.join(_symbol_pattern(symbol)
+                                  for symbol in sorted([*CURRENCY_SYMBOLS, '$'], key=len, reverse=True)),
+                         re.IGNORECASE)
+# Grupos de dígitos separados por punto o coma, o por un espacio seguido de tres dígitos (miles)
+NUMBER_RE = re.compile(r'\d+(?:[.,]\d+|[ \u00a0\u202f]\d{3}(?!\d))*')
+SPACES_RE = re.compile(r'[ \u00a0\u202f]')
+
+
+def _to_decimal(number, decimal_separator):
+    """Importe de '1.250.000,00', '13000.0' o '1,5'
+
+    El último separador es el decimal si hay puntos y comas, o si no va seguido
+    de exactamente tres dígitos. Un único separador seguido de tres dígitos
+    ('45.900') es ambiguo: se toma como decimal solo si lo es en la
+    configuración regional; sin ella, como separador de miles.
+    """
+    number = SPACES_RE.sub('', number)
+    last = max(number.rfind('.'), number.rfind(','))
+    if last < 0:
+        return Decimal(number)
+    separator = number[last]
+    decimals = number[last + 1:]
+    if ('.' in number and ',' in number) or len(decimals) != 3:
+        is_decimal = True
+    elif number.count(separator) > 1:
+        is_decimal = False
+    else:
+        is_decimal = separator == decimal_separator
+    if not is_decimal:
+        return Decimal(number.replace('.', '').replace(',', ''))
+    integer = number[:last].replace('.', '').replace(',', '')
+    return Decimal(f"{integer or '0'}.{decimals}")
+
+
+class PriceParser:
+    """Convierte precios en texto en Price(importe Decimal, moneda ISO o None)
+
+    locale: configuración regional (LOCALES) que resuelve los separadores
+    ambiguos y la moneda de '$'; default_currency: moneda de los precios sin
+    símbolo, si no es la de la configuración regional. Un símbolo o código
+    distinto de '$' manda esté donde esté ('$ 50.000 COP' es COP); después, la
+    moneda declarada por la página (priceCurrency) y, por último, la regional.
+    Los resultados se guardan en una caché LRU: en un catálogo los mismos
+    precios se repiten.
+    """
+
+    def __init__(self, locale=None, default_currency=None, cache_size=4096):
+        if locale is not None and locale not in LOCALES:
+            raise ValueError(f"Configuración regional desconocida: {locale}. Opciones: {', '.join(LOCALES)}")
+        self.locale = locale
+        self.decimal_separator, _, locale_currency = LOCALES.get(locale, (None, None, None))
+        self.default_currency = default_currency or locale_currency
+        self._cached = lru_cache(maxsize=cache_size)(self._parse)
+
+    def _parse(self, text, currency):
+        match = NUMBER_RE.search(text)
+        if not match:
+            return None
+        try:
+            amount = _to_decimal(match.group(0), self.decimal_separator)
+        except InvalidOperation:
+            return None
+        for symbol in CURRENCY_RE.finditer(text):
+            if symbol.group(0) != '$':
+                return Price(amount, CURRENCY_SYMBOLS[symbol.group(0).upper()])
+        return Price(amount, currency or self.default_currency)
+
+    def parse(self, price, currency=None):
+        """Price de un texto como '$ 1.250.000,00', o None si no tiene importe
+
+        currency: moneda ISO declarada por la página para ese precio, si la hay
+        """
+        if price is None or isinstance(price, bool):
+            return None
+        text = str(price).strip()
+        if not text:
+            return None
+        return self._cached(text, currency.strip().upper() if isinstance(currency, str) and currency.strip() else None)
+
+    def parse_many(self, prices, currencies=None):
+        """Price de cada texto de una lista, convirtiendo una sola vez cada texto distinto
+
+        currencies: monedas declaradas, en paralelo a prices (opcional)
+        """
+        if currencies is None:
+            currencies = [None] * len(prices)
+        parsed = {}
+        keys = list(zip(prices, currencies))
+        for key in keys:
+            if key not in parsed:
+                parsed[key] = self.parse(*key)
+        return [parsed[key] for key in keys]
+
+    def columns(self, products, field='Precio', currency_field='Moneda'):
+        """Columnas (importes, monedas) de un lote de product_data, para análisis por lotes"""
+        parsed = self.parse_many([product.get(field) for product in products],
+                                 [product.get(currency_field) for product in products])
+        return ([price.amount if price else None for price in parsed],
+                [price.currency if price else None for price in parsed])
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+
+# Sin configuración regional: '45.900' son miles y '$' no indica moneda
+DEFAULT_PARSER = PriceParser()
+
+
+def parse_price(price, currency=None):
+    """Price de un texto con el convertidor por defecto, o None"""
+    return DEFAULT_PARSER.parse(price, currency)
+
+
+def price_number(price):
+    """Importe como float (columnas REAL de SQLite y float64 de Parquet), o None"""
+    parsed = DEFAULT_PARSER.parse(price)
+    return float(parsed.amount) if parsed else None
+
+
+def display_symbol(currency):
+    """Símbolo para mostrar un importe de la moneda dada"""
+    return DISPLAY_SYMBOLS.get(currency, '$')
@@ -0,0 +1,180 @@
+"""
+Reintentos, Cortacircuitos e Informe de Fallos
+Política de reintentos con espera exponencial y jitter, cortacircuitos por
+host para no esperar timeouts de un host caído, e informe de fallos por clase
+"""
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import requests
+
+from planificador_hosts import parse_retry_after
+
+
+# Códigos que suelen ser transitorios: se reintentan
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# Lo que devuelve CircuitBreaker.allow() a la única petición de prueba de un circuito semiabierto
+PROBE = 'prueba'
+
+
+
+def error_class(error):
+    """Clase legible de un error de requests para el informe de fallos"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return f"http {error.response.status_code}"
+    if isinstance(error, requests.Timeout):
+        return 'timeout'
+    if isinstance(error, requests.ConnectionError):
+        return 'conexión'
+    if isinstance(error, requests.TooManyRedirects):
+        return 'redirecciones'
+    return type(error).__name__
+
+
+class RetryPolicy:
+    """Cuántas veces y cuánto esperar antes de repetir una petición fallida"""
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=30.0, retry_status=RETRY_STATUS):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_status = set(retry_status)
+
+    def is_retriable(self, error):
+        if isinstance(error, requests.HTTPError):
+            return error.response is not None and error.response.status_code in self.retry_status
+        return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
+    def delay(self, attempt, retry_after=None):
+        """Espera antes del reintento número attempt (desde 0): exponencial con jitter completo
+
+        Si el servidor envió Retry-After, se espera al menos ese tiempo.
+        """
+        wait = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        pause = parse_retry_after(retry_after)
+        return max(wait, min(pause, self.max_backoff)) if pause else wait
+
+
+class CircuitBreaker:
+    """Cortacircuitos por host
+
+    Tras failure_threshold fallos seguidos de un host (timeouts, errores de
+    conexión, 429 o 5xx) el circuito se abre y las peticiones a ese host fallan al
+    instante durante reset_timeout segundos; después se deja pasar una
+    petición de prueba que lo cierra si tiene éxito o lo vuelve a abrir.
+
+    allow() devuelve PROBE a la petición de prueba; esa petición informa con
+    probe=True y, si termina sin veredicto, llama a release_probe(). Las
+    peticiones normales que acaban durante la prueba no la liberan.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened_at = {}
+        self._probing = set()
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @staticmethod
+    def _host(url):
+        return urlparse(url).netloc.lower()
+
+    def allow(self, url):
+        """¿Se puede hacer la petición? False mientras el circuito del host está abierto
+
+        Devuelve True, False o PROBE (verdadero) si es la petición de prueba.
+        """
+        host = self._host(url)
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at < self.reset_timeout or host in self._probing:
+                return False
+            # Semiabierto: una sola petición de prueba
+            self._probing.add(host)
+            return PROBE
+
+    def record_success(self, url, probe=False):
+        """El host respondió: cierra el circuito (probe: la respuesta es la de la prueba)"""
+        host = self._host(url)
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            if probe:
+                self._probing.discard(host)
+
+    def record_failure(self, url, probe=False):
+        """Fallo del host: abre el circuito al llegar al umbral o, si falla la prueba, lo reabre"""
+        host = self._host(url)
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if probe:
+                self._opened_at[host] = time.monotonic()
+                self._probing.discard(host)
+            elif host not in self._opened_at and self._failures[host] >= self.failure_threshold:
+                self.opened += 1
+                self._opened_at[host] = time.monotonic()
+
+    def release_probe(self, url):
+        """Termina la petición de prueba sin veredicto: el circuito sigue abierto y admite otra prueba
+
+        Solo debe llamarla la petición a la que allow() devolvió PROBE.
+        """
+        host = self._host(url)
+        with self._lock:
+            self._probing.discard(host)
+
+    def open_hosts(self):
+        with self._lock:
+            return sorted(self._opened_at)
+
+
+class FailureReport:
+    """Fallos agrupados por clase de error, con las URLs de cada clase"""
+
+    def __init__(self, examples=3):
+        self.examples = examples
+        self.counts = Counter()
+        self.urls = {}
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def add(self, url, error, detail=''):
+        with self._lock:
+            self.counts[error] += 1
+            self.urls.setdefault(error, []).append({'url': url, 'detalle': str(detail)})
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'total': sum(self.counts.values()),
+                'reintentos': self.retries,
+                'por_clase': dict(self.counts.most_common()),
+                'urls': self.urls,
+            }
+
+    def summary(self):
+        """Resumen legible: recuento por clase y algunas URLs de ejemplo"""
+        report = self.as_dict()
+        lines = [f"Fallos: {report['total']} ({report['reintentos']} reintento(s) realizados)"]
+        for error, count in report['por_clase'].items():
+            lines.append(f"   {error}: {count}")
+            for item in report['urls'][error][:self.examples]:
+                lines.append(f"      [ERROR] {item['url']}")
+        return '\n'.join(lines)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,138 @@
+"""
+Salida JSONL en Streaming
+Añade los product_data a un único archivo JSON Lines (opcionalmente
+comprimido con gzip o zstd) en lugar de un archivo JSON por producto
+"""
+
+import gzip
+import io
+import json
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Decodificador JSON más rápido disponible: orjson, msgspec o la biblioteca estándar.
+# JSON_DECODE_ERRORS: excepciones de un JSON inválido (msgspec.DecodeError no es un ValueError)
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSON_DECODER = 'orjson'
+    JSON_DECODE_ERRORS = (ValueError,)
+except ImportError:
+    try:
+        import msgspec
+        json_loads = msgspec.json.Decoder().decode
+        JSON_DECODER = 'msgspec'
+        JSON_DECODE_ERRORS = (ValueError, msgspec.DecodeError)
+    except ImportError:
+        json_loads = json.loads
+        JSON_DECODER = 'json'
+        JSON_DECODE_ERRORS = (ValueError,)
+
+
+def detect_compression(path):
+    """Deduce la compresión a partir de la extensión del archivo"""
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise ImportError("La compresión zstd requiere el paquete 'zstandard' (pip install zstandard)")
+
+
+class JsonlWriter:
+    """Escribe product_data como líneas JSON con escritura en búfer y fsync periódico"""
+
+    def __init__(self, path, compression=None, buffer_size=1024 * 1024, fsync_every=1000):
+        self.path = path
+        self.compression = compression or detect_compression(path)
+        self.buffer_size = buffer_size
+        # Cada cuántos registros se fuerza la escritura a disco (0 = solo al cerrar)
+        self.fsync_every = fsync_every
+        self.count = 0
+        self._buffer = []
+        self._buffered_bytes = 0
+
+        # En modo 'ab' cada ejecución añade un nuevo miembro gzip / frame zstd
+        self._raw = open(path, 'ab')
+        if self.compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='ab')
+        elif self.compression == 'zstd':
+            _require_zstandard()
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        elif self.compression is None:
+            self._stream = self._raw
+        else:
+            raise ValueError(f"Compresión desconocida: {self.compression}")
+
+    def write(self, product_data):
+        """Añade un producto al archivo"""
+        line = (json.dumps(product_data, ensure_ascii=False) + '\n').encode('utf-8')
+        self._buffer.append(line)
+        self._buffered_bytes += len(line)
+        self.count += 1
+
+        if self._buffered_bytes >= self.buffer_size:
+            self._write_buffer()
+        if self.fsync_every and self.count % self.fsync_every == 0:
+            self.flush()
+
+    def _write_buffer(self):
+        if self._buffer:
+            self._stream.write(b''.join(self._buffer))
+            self._buffer = []
+            self._buffered_bytes = 0
+
+    def flush(self):
+        """Vacía el búfer y sincroniza el archivo con el disco"""
+        self._write_buffer()
+        if self.compression == 'zstd':
+            self._stream.flush(zstandard.FLUSH_BLOCK)
+        elif self._stream is not self._raw:
+            self._stream.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def close(self):
+        self.flush()
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_jsonl(path):
+    """Abre un archivo JSONL (comprimido o no) como texto"""
+    compression = detect_compression(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        _require_zstandard()
+        raw = open(path, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def read_jsonl(path):
+    """Generador que produce cada product_data del archivo; las líneas inválidas se reportan y se omiten"""
+    with open_jsonl(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json_loads(line)
+            except JSON_DECODE_ERRORS as e:
+                print(f"   [ERROR] {path}:{line_number}: línea inválida ({e})")
@@ -0,0 +1,187 @@
+"""
+Sesiones HTTP Compartidas
+Pool de conexiones reutilizable entre instancias de ProductExtractor para
+mantener conexiones keep-alive y sesiones TLS entre productos
+"""
+
+import codecs
+import re
+import threading
+from urllib.parse import urljoin
+from urllib.robotparser import RobotFileParser
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    # gzip/deflate, y br si el paquete brotli está instalado
+    'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
+    'Connection': 'keep-alive',
+}
+
+
+def create_session(pool_connections=10, pool_maxsize=10):
+    """Crea una sesión de requests con las cabeceras por defecto del extractor"""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w-]+)', re.IGNORECASE)
+# Tamaño de los bloques leídos al descargar con límite de bytes
+CHUNK_SIZE = 64 * 1024
+
+
+def _charset(name):
+    """Nombre de codificación válido para Python, o None"""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.decode('ascii', 'ignore') if isinstance(name, bytes) else name).name
+    except LookupError:
+        return None
+
+
+def decode_body(content, content_type=None):
+    """Decodifica el cuerpo HTML: charset de Content-Type, si no el <meta charset>, si no UTF-8
+
+    requests supone ISO-8859-1 para text/html sin charset, lo que estropea las
+    tildes de las páginas UTF-8 de servidores que no lo declaran.
+    """
+    match = re.search(r'charset\s*=\s*["\']?([\w-]+)', content_type or '', re.IGNORECASE)
+    encoding = _charset(match.group(1)) if match else None
+    if encoding is None:
+        meta = CHARSET_RE.search(content[:4096])
+        encoding = _charset(meta.group(1)) if meta else None
+    if encoding is None:
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            encoding = 'cp1252'
+    return content.decode(encoding, errors='replace')
+
+
+def _trim_partial_utf8(content):
+    """Quita un carácter UTF-8 cortado a medias al final de un cuerpo truncado"""
+    for back in range(1, min(4, len(content)) + 1):
+        byte = content[-back]
+        if byte < 0x80:
+            return content
+        if byte >= 0xC0:
+            length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return content if back >= length else content[:-back]
+    return content
+
+
+def read_body(response, max_bytes=None):
+    """Lee y decodifica el cuerpo de una respuesta; devuelve (texto, truncado)
+
+    Con max_bytes la respuesta debe pedirse con stream=True: se lee por
+    bloques y se deja de leer al llegar al límite, sin cargar el resto.
+    """
+    content_type = response.headers.get('Content-Type')
+    if not max_bytes:
+        return decode_body(response.content, content_type), False
+    chunks = []
+    size = 0
+    truncated = False
+    for chunk in response.iter_content(CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_bytes:
+            truncated = True
+            break
+    content = b''.join(chunks)
+    if truncated:
+        # Al cortar la lectura la conexión no puede volver al pool
+        response.close()
+        content = _trim_partial_utf8(content[:max_bytes])
+    return decode_body(content, content_type), truncated
+
+
+def load_robots(session, base_url):
+    """Descarga robots.txt del host; devuelve (RobotFileParser o None, sitemaps declarados)"""
+    try:
+        response = session.get(urljoin(base_url, '/robots.txt'), timeout=10)
+    except requests.RequestException:
+        return None, []
+    if response.status_code != 200:
+        return None, []
+    lines = response.text.splitlines()
+    robots = RobotFileParser()
+    robots.parse(lines)
+    sitemaps = [line.split(':', 1)[1].strip() for line in lines
+                if line.lower().startswith('sitemap:') and line.split(':', 1)[1].strip()]
+    return robots, sitemaps
+
+
+class SessionManager:
+    """Sesión compartida con pool de conexiones por host y métricas de reutilización"""
+
+    def __init__(self, max_hosts=100, connections_per_host=10):
+        # max_hosts: pools de host que se mantienen abiertos
+        # connections_per_host: conexiones keep-alive guardadas por host
+        self.max_hosts = max_hosts
+        self.connections_per_host = connections_per_host
+        self.session = create_session(pool_connections=max_hosts, pool_maxsize=connections_per_host)
+        # urllib3 descarta el pool del host menos usado al pasar de max_hosts: sus
+        # contadores se acumulan aquí antes de cerrarlo
+        self._lock = threading.Lock()
+        self._retired = {'requests': 0, 'connections': 0}
+        self._hosts = set()
+        for adapter in self._adapters():
+            adapter.poolmanager.pools.dispose_func = self._retire
+
+    def _adapters(self):
+        return {id(a): a for a in self.session.adapters.values()}.values()
+
+    def _pools(self):
+        for adapter in self._adapters():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    yield pool
+
+    def _retire(self, pool):
+        with self._lock:
+            self._retired['requests'] += pool.num_requests
+            self._retired['connections'] += pool.num_connections
+            self._hosts.add((pool.scheme, pool.host, pool.port))
+        pool.close()
+
+    def stats(self):
+        """Peticiones realizadas, conexiones abiertas y peticiones que reutilizaron conexión
+
+        Incluye los pools ya cerrados; hosts cuenta los hosts distintos contactados.
+        """
+        with self._lock:
+            requests_count = self._retired['requests']
+            connections = self._retired['connections']
+            hosts = set(self._hosts)
+        for pool in self._pools():
+            hosts.add((pool.scheme, pool.host, pool.port))
+            requests_count += pool.num_requests
+            connections += pool.num_connections
+        return {
+            'hosts': len(hosts),
+            'requests': requests_count,
+            'connections': connections,
+            'reused': max(requests_count - connections, 0),
+        }
+
+    def summary(self):
+        """Resumen legible de la reutilización de conexiones"""
+        s = self.stats()
+        ratio = s['reused'] / s['requests'] * 100 if s['requests'] else 0
+        return (f"Conexiones: {s['requests']} peticiones sobre {s['connections']} conexiones "
+                f"en {s['hosts']} host(s) ({ratio:.0f}% reutilizadas)")
+
+    def close(self):
+        self.session.close()
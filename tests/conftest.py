@@ -0,0 +1,89 @@
+"""
+Utilidades Compartidas de las Pruebas
+Pone los módulos del repositorio en sys.path y ofrece respuestas y sesiones
+HTTP falsas, las páginas de benchmarks/corpus y la tienda local de pruebas
+"""
+
+import os
+import sys
+
+import pytest
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.servidor_tienda import ShopServer, load_corpus
+
+CORPUS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'corpus')
+HOST = 'https://tienda.example.com'
+PRODUCT_HTML = b'<html><body><h1>Producto</h1></body></html>'
+
+
+def build_response(status=200, body=PRODUCT_HTML, url=HOST, headers=None):
+    """requests.Response con el código, el cuerpo y las cabeceras dados"""
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers['Content-Type'] = 'text/html; charset=utf-8'
+    response.headers.update(headers or {})
+    response.url = url
+    response.reason = 'prueba'
+    return response
+
+
+class FakeSession:
+    """Sesión con el get() de requests.Session que usan los módulos
+
+    responses: lista que se consume en orden (código de estado, Response o
+    excepción que se lanza) o diccionario {url: cuerpo}, que responde 200 con
+    ese cuerpo y 404 al resto. headers: cabeceras de las respuestas generadas.
+    """
+
+    def __init__(self, responses, headers=None):
+        self.responses = responses if isinstance(responses, dict) else list(responses)
+        self.headers = headers
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        if isinstance(self.responses, dict):
+            body = self.responses.get(url)
+            return build_response(404 if body is None else 200, body or b'', url, self.headers)
+        item = self.responses.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        if isinstance(item, requests.Response):
+            return item
+        return build_response(item, url=url, headers=self.headers)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def response_factory():
+    """Fábrica de requests.Response (build_response)"""
+    return build_response
+
+
+@pytest.fixture
+def fake_session():
+    """Fábrica de sesiones falsas: fake_session(respuestas, headers=None)"""
+    return FakeSession
+
+
+@pytest.fixture
+def corpus_page():
+    """Lee una página de benchmarks/corpus por nombre de archivo"""
+    def read(name):
+        with open(os.path.join(CORPUS_DIR, name), encoding='utf-8') as f:
+            return f.read()
+    return read
+
+
+@pytest.fixture
+def shop_server():
+    """Tienda local (benchmarks/servidor_tienda.py) con tres copias de cada página del corpus"""
+    with ShopServer(load_corpus(CORPUS_DIR), copies=3) as shop:
+        yield shop
@@ -0,0 +1,72 @@
+"""
+Pruebas del almacén SQLite: upserts por URL o SKU e historial de precios
+"""
+
+import sqlite3
+
+from almacen_sqlite import ProductStore
+
+
+def _product(url, price, sku=None, date='2024-01-14 10:00:00'):
+    attributes = {'SKU': sku} if sku else {}
+    return {'URL': url, 'Título': 'Cafetera', 'Precio': price, 'Atributos': attributes,
+            'Fecha de extracción': date}
+
+
+def _rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute('SELECT url, sku, price_text FROM products ORDER BY url').fetchall()
+
+
+def test_price_history_by_url(tmp_path):
+    path = str(tmp_path / 'productos.db')
+    with ProductStore(path) as store:
+        store.write_many([_product('https://t.example/a', '$ 100.000'), _product('https://t.example/b', '$ 50')])
+    with ProductStore(path) as store:
+        # El mismo importe escrito de otra forma no es un cambio
+        store.write_many([_product('https://t.example/a', '$ 120.000', date='2024-01-15 10:00:00'),
+                          _product('https://t.example/b', '50.00', date='2024-01-15 10:00:00')])
+        changes = store.price_changes_since('2024-01-15')
+
+    assert [(c['url'], c['old_price'], c['new_price']) for c in changes] == [('https://t.example/a', 100000, 120000)]
+    assert len(_rows(path)) == 2
+
+
+def test_same_sku_from_another_url_updates_the_product(tmp_path):
+    path = str(tmp_path / 'productos.db')
+    with ProductStore(path) as store:
+        store.write_many([_product('https://t.example/cafetera', '$ 100', 'CAF-1'),
+                          _product('https://t.example/otra', '$ 7', 'OTR-1')])
+        store.write_many([_product('https://t.example/cafetera?utm=x', '$ 90', 'CAF-1',
+                                   date='2024-01-15 10:00:00')])
+        changes = store.price_changes_since('2024-01-15')
+
+    assert _rows(path) == [('https://t.example/cafetera?utm=x', 'CAF-1', '$ 90'),
+                           ('https://t.example/otra', 'OTR-1', '$ 7')]
+    assert [(c['sku'], c['old_price'], c['new_price']) for c in changes] == [('CAF-1', 100, 90)]
+
+
+def test_sku_moves_within_one_batch(tmp_path):
+    path = str(tmp_path / 'productos.db')
+    with ProductStore(path) as store:
+        store.write_many([_product('https://t.example/a', '$ 10', 'X'),
+                          _product('https://t.example/b', '$ 12', 'X'),
+                          _product('https://t.example/c', '$ 5')])
+        changes = store.price_changes_since('2024-01-01')
+
+    assert _rows(path) == [('https://t.example/b', 'X', '$ 12'), ('https://t.example/c', None, '$ 5')]
+    assert [(c['url'], c['old_price'], c['new_price']) for c in changes] == [('https://t.example/b', 10, 12)]
+
+
+def test_old_database_with_duplicate_skus(tmp_path):
+    path = str(tmp_path / 'productos.db')
+    with sqlite3.connect(path) as db:
+        db.execute('CREATE TABLE products (url TEXT PRIMARY KEY, sku TEXT, title TEXT, category TEXT, '
+                   'price_text TEXT, price REAL, availability TEXT, extracted_at TEXT, data TEXT)')
+        db.execute('CREATE INDEX idx_products_sku ON products (sku)')
+        db.executemany('INSERT INTO products (url, sku, price_text, extracted_at) VALUES (?, ?, ?, ?)',
+                       [('https://t.example/vieja', 'X', '$ 1', '2024-01-01'),
+                        ('https://t.example/nueva', 'X', '$ 2', '2024-01-02')])
+    ProductStore(path).close()
+
+    assert _rows(path) == [('https://t.example/nueva', 'X', '$ 2')]
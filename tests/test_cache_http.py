@@ -0,0 +1,33 @@
+"""
+Pruebas de los contadores de la caché HTTP: cada página pedida es un acierto,
+una revalidación o un fallo
+"""
+
+from cache_http import HttpCache
+from extractor import ProductExtractor
+
+
+URL = 'https://tienda.example.com/shop/lampara-7'
+# Las respuestas 200 traen un validador, así la caché puede revalidarlas
+ETAG = {'ETag': '"v1"'}
+
+
+def test_every_request_is_counted_once(tmp_path, fake_session):
+    cache = HttpCache(str(tmp_path), ttl=0)
+    # Nueva (fallo), 304 (revalidada), cambiada (fallo), error sin servir (fallo)
+    session = fake_session([200, 304, 200, 500], ETAG)
+    for _ in range(4):
+        ProductExtractor(URL, session=session, cache=cache).fetch_page()
+
+    assert cache.stats['hits'] == 0
+    assert cache.stats['revalidated'] == 1
+    assert cache.stats['misses'] == 3
+
+
+def test_fresh_entries_are_hits(tmp_path, fake_session):
+    cache = HttpCache(str(tmp_path), ttl=3600)
+    session = fake_session([200], ETAG)
+    for _ in range(3):
+        ProductExtractor(URL, session=session, cache=cache).fetch_page()
+
+    assert (cache.stats['hits'], cache.stats['revalidated'], cache.stats['misses']) == (2, 0, 1)
@@ -0,0 +1,57 @@
+"""
+Pruebas de las coincidencias precompiladas: mismas respuestas que las
+comprobaciones any(...) y get_text() que sustituyen
+"""
+
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from coincidencias import PRICE_CHARS_RE, KeywordSet, NodeTexts
+from extractor import DESCRIPTION_CLASSES, PARSERS, SPEC_KEYWORDS, ProductExtractor
+
+
+TEXTS = ['', 'Product-Image', 'ESPECIFICACIONES técnicas', 'Modo de Uso', 'modo  de uso', 'Detalle',
+         'oe_product_cart', 'Información', 'cookies', 'Características:', 'precio']
+
+
+@pytest.mark.parametrize('keywords', [['product', 'item', 'image'], list(SPEC_KEYWORDS),
+                                      ['description', 'detail', 'info']])
+def test_keyword_set_matches_any(keywords):
+    keyword_set = KeywordSet(keywords)
+    for text in TEXTS + [None]:
+        expected = bool(text) and any(keyword in text.lower() for keyword in keywords)
+        assert keyword_set(text) == expected, text
+        if text:
+            assert keyword_set.in_lower(text.lower()) == expected, text
+
+
+def test_keyword_set_as_find_all_filter(corpus_page):
+    soup = BeautifulSoup(corpus_page('odoo_producto.html'), 'html.parser')
+    old_class = lambda x: x and ('description' in x.lower() or 'detail' in x.lower() or 'info' in x.lower())
+    old_string = lambda text: text and any(k in text.lower() for k in SPEC_KEYWORDS)
+
+    assert soup.find_all('div', class_=DESCRIPTION_CLASSES) == soup.find_all('div', class_=old_class)
+    for tag in ('h2', 'h3', 'h4', 'strong', 'b', 'span'):
+        assert soup.find_all(tag, string=SPEC_KEYWORDS) == soup.find_all(tag, string=old_string)
+
+
+def test_price_chars():
+    for text in ['$ 13.000,00', '45,90 €', 'Consultar', '', 'US 5']:
+        assert bool(PRICE_CHARS_RE.search(text)) == bool(re.sub(r'[^\d.,€$]', '', text))
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_node_texts_match_get_text(parser, corpus_page):
+    extractor = ProductExtractor('https://tienda.example.com/shop/p', parser=parser)
+    document = extractor._parse(corpus_page('woocommerce_producto.html'))
+    texts = NodeTexts()
+
+    for elem in document.find_all('p') + document.find_all('span'):
+        text = elem.get_text(strip=True)
+        assert texts.text(elem) == text
+        assert texts.lower(elem) == text.lower()
+        assert texts.string_lower(elem) == (elem.string or '').lower()
+    texts.clear()
+    assert not texts._text and not texts._lower and not texts._string
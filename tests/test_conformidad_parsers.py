@@ -0,0 +1,45 @@
+"""
+Conformidad de Motores de Parseo
+Todos los motores de ProductExtractor deben producir el mismo product_data
+que html.parser sobre cada página de benchmarks/corpus/
+"""
+
+import glob
+import os
+
+import pytest
+
+from extractor import PARSERS, ProductExtractor
+from motor_lxml import LxmlDocument
+
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'corpus')
+BENCH_URL = 'https://tienda.example.com/shop/producto-benchmark'
+REFERENCE_PARSER = 'html.parser'
+PAGES = sorted(os.path.basename(path) for path in glob.glob(os.path.join(CORPUS_DIR, '*.html')))
+
+
+def extract_with(parser, html_content, structured):
+    """product_data sin la fecha de extracción"""
+    data = ProductExtractor(BENCH_URL, parser=parser, structured=structured).extract_from_html(html_content)
+    data.pop('Fecha de extracción', None)
+    return data
+
+
+@pytest.mark.parametrize('structured', [False, True], ids=['heurísticas', 'estructurados'])
+@pytest.mark.parametrize('parser', [name for name in PARSERS if name != REFERENCE_PARSER])
+@pytest.mark.parametrize('page', PAGES)
+def test_parser_matches_reference(corpus_page, page, parser, structured):
+    html_content = corpus_page(page)
+
+    assert extract_with(parser, html_content, structured) == extract_with(REFERENCE_PARSER, html_content, structured)
+
+
+@pytest.mark.parametrize('page', PAGES)
+def test_native_lxml_needs_no_cssselect(corpus_page, monkeypatch, page):
+    # Los selectores de los extract_* y de los datos estructurados los resuelve el índice
+    def unexpected(self, selector, limit=None):
+        raise AssertionError(f"selector fuera del índice: {selector}")
+
+    monkeypatch.setattr(LxmlDocument, 'select', unexpected)
+    extract_with('lxml-native', corpus_page(page), structured=True)
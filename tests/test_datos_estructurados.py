@@ -0,0 +1,110 @@
+"""
+Pruebas de los datos estructurados: JSON-LD, microdatos, OpenGraph y la
+vuelta a los selectores heurísticos
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from datos_estructurados import HEURISTIC, JSON_LD, MICRODATA, OPENGRAPH
+from extractor import PARSERS, ProductExtractor
+from precios import Price, PriceParser
+
+
+URL = 'https://tienda.example.com/shop/lampara-led-7'
+
+MICRODATA_HTML = '''<html><body>
+<div itemscope itemtype="https://schema.org/Product">
+  <h1 itemprop="name">Lámpara LED de escritorio</h1>
+  <span itemprop="sku">LAM-7</span>
+  <div itemprop="description">Lámpara LED regulable con brazo articulado y base estable.</div>
+  <div itemprop="brand" itemscope itemtype="https://schema.org/Brand"><span itemprop="name">Luz</span></div>
+  <div itemprop="offers" itemscope itemtype="https://schema.org/Offer">
+    <span>$ 89.900</span>
+    <meta itemprop="price" content="89900">
+    <meta itemprop="priceCurrency" content="COP">
+    <link itemprop="availability" href="https://schema.org/OutOfStock">
+  </div>
+</div>
+</body></html>'''
+
+OPENGRAPH_HTML = '''<html><head>
+<meta property="og:type" content="product">
+<meta property="og:title" content="Silla plegable">
+<meta property="product:price:amount" content="45.900">
+<meta property="product:price:currency" content="EUR">
+<meta property="product:availability" content="in stock">
+</head><body>
+<h1>Silla plegable</h1>
+<span class="price">45,90 €</span>
+<div class="product-description"><p>Silla plegable de aluminio, ligera y resistente para exteriores.</p></div>
+</body></html>'''
+
+
+def _extract(html_content, **options):
+    extractor = ProductExtractor(URL, **options)
+    data = extractor.extract_from_html(html_content)
+    data.pop('Fecha de extracción')
+    return data, extractor.field_sources
+
+
+def test_json_ld_fields(corpus_page):
+    data, sources = _extract(corpus_page('jsonld_producto.html'), structured=True)
+
+    assert data['Precio'] == '349900.00'
+    assert data['Moneda'] == 'COP'
+    assert data['Atributos']['SKU'] == 'CAF-ESP-15'
+    assert data['Atributos']['Disponibilidad'] == 'En stock'
+    assert len(data['Imágenes']) == 3
+    assert set(sources.values()) == {JSON_LD}
+
+
+def test_disabled_by_default_keeps_visible_price(corpus_page):
+    data, sources = _extract(corpus_page('jsonld_producto.html'))
+
+    assert data['Precio'] == '$ 349.900'
+    assert 'Moneda' not in data
+    assert 'SKU' not in data['Atributos'] and 'Disponibilidad' not in data['Atributos']
+    assert JSON_LD not in sources.values()
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+def test_microdata_fields(parser):
+    data, sources = _extract(MICRODATA_HTML, structured=True, parser=parser)
+
+    # El nombre de la marca (otro ítem anidado) no reemplaza al del producto
+    assert data['Título'] == 'Lámpara LED de escritorio'
+    assert data['Precio'] == '89900'
+    assert data['Moneda'] == 'COP'
+    assert data['Atributos']['SKU'] == 'LAM-7'
+    assert data['Atributos']['Disponibilidad'] == 'Agotado'
+    assert sources['Título'] == sources['Precio'] == MICRODATA
+
+
+def test_opengraph_fields_and_heuristic_fallback():
+    data, sources = _extract(OPENGRAPH_HTML, structured=True)
+
+    assert data['Título'] == 'Silla plegable'
+    assert data['Moneda'] == 'EUR'
+    assert sources['Precio'] == OPENGRAPH
+    # OpenGraph no declara descripción: sale de los selectores
+    assert data['Descripción'].startswith('Silla plegable de aluminio')
+    assert sources['Descripción'] == HEURISTIC
+
+
+def test_page_without_structured_data_matches_heuristics(corpus_page):
+    html_content = corpus_page('pagina_minima.html')
+    structured, sources = _extract(html_content, structured=True)
+    heuristic, _ = _extract(html_content)
+
+    assert structured == heuristic
+    assert sources['Título'] == sources['Descripción'] == HEURISTIC
+
+
+def test_declared_price_uses_dot_decimal():
+    data, _ = _extract(OPENGRAPH_HTML, structured=True)
+
+    # "45.900" en schema.org es 45,9 y no 45 900, también con una región de coma decimal
+    assert data['Precio'] == '45.9'
+    assert PriceParser('es_CO').parse(data['Precio'], data['Moneda']) == Price(Decimal('45.9'), 'EUR')
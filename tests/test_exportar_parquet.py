@@ -0,0 +1,62 @@
+"""
+Pruebas de la exportación Parquet / Arrow: esquema estable y lotes
+"""
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from exportar_parquet import ParquetExporter, product_schema
+
+
+PRODUCTS = [
+    {'URL': f'https://tienda.example.com/p{i}', 'Título': f'Producto {i}', 'Precio': f'$ {i}.000',
+     'Imágenes': [f'https://tienda.example.com/img/{i}.jpg'],
+     'Atributos': {'SKU': f'P-{i}', 'Categorías': ['Hogar']},
+     'Fecha de extracción': '2024-01-14 10:00:00'}
+    for i in range(1, 6)
+]
+
+
+def _write(path, products, **options):
+    with ParquetExporter(path, **options) as exporter:
+        for product_data in products:
+            exporter.write(product_data)
+    return exporter
+
+
+def test_parquet_file_in_row_groups(tmp_path):
+    path = str(tmp_path / 'catalogo.parquet')
+    _write(path, PRODUCTS, batch_size=2)
+
+    parquet = pq.ParquetFile(path)
+    table = parquet.read()
+    assert parquet.metadata.num_row_groups == 3
+    # Parquet no tiene marcas de tiempo en segundos: fecha_extraccion vuelve en ms
+    assert table.schema.names == product_schema().names
+    assert table.column('precio').to_pylist() == [1000.0, 2000.0, 3000.0, 4000.0, 5000.0]
+    assert table.column('sku').to_pylist()[0] == 'P-1'
+    assert table.column('categorias').to_pylist()[0] == ['Hogar']
+
+
+def test_arrow_file(tmp_path):
+    path = str(tmp_path / 'catalogo.arrow')
+    _write(path, PRODUCTS[:2])
+
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.schema == product_schema()
+    assert table.column('url').to_pylist() == [p['URL'] for p in PRODUCTS[:2]]
+
+
+def test_dataset_directory_accumulates_runs(tmp_path, monkeypatch):
+    directory = str(tmp_path / 'catalogo')
+    first = _write(directory, PRODUCTS[:3])
+    # Cada ejecución añade su propio part-*.parquet
+    monkeypatch.setattr('exportar_parquet.os.getpid', lambda: 0)
+    second = _write(directory, PRODUCTS[3:])
+
+    assert first.output_file != second.output_file
+    assert ds.dataset(directory).to_table(columns=['url']).num_rows == 5
@@ -0,0 +1,123 @@
+"""
+Pruebas del extractor en lote contra la tienda local de pruebas: todos los
+productos una vez, a medida que terminan, y sin bloqueos al cortar el lote
+"""
+
+import threading
+import time
+
+import pytest
+
+from extractor_lote import BatchExtractor
+from huella_contenido import FingerprintStore
+
+
+def _collect(products, timeout=60):
+    """Consume el generador en un hilo: falla en vez de colgar la prueba si el lote no termina"""
+    outcome = {'data': []}
+
+    def run():
+        try:
+            for data in products:
+                outcome['data'].append(data)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'el lote no terminó'
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['data']
+
+
+def _append_all(products, into):
+    for data in products:
+        into.append(data)
+        yield data
+
+
+@pytest.mark.parametrize('parse_workers', [0, 1])
+def test_every_url_once_and_failures_reported(shop_server, parse_workers):
+    urls = shop_server.urls()
+    missing = f"{shop_server.base_url}/shop/no-existe-0"
+    batch = BatchExtractor(max_concurrency=4, parse_workers=parse_workers, parse_queue_size=2)
+
+    products = _collect(batch.extract_many(urls + [missing]))
+
+    assert sorted(data['URL'] for data in products) == sorted(urls)
+    assert batch.failed_urls == [missing]
+
+
+def test_products_are_produced_as_they_complete(shop_server, fake_session):
+    urls = shop_server.urls()
+    slow = urls[0]
+
+    class SlowFirst:
+        """La primera URL tarda más que todas las demás juntas"""
+
+        def get(self, url, **kwargs):
+            if url == slow:
+                time.sleep(1)
+            return fake_session([200]).get(url)
+
+    class Sessions:
+        session = SlowFirst()
+
+    batch = BatchExtractor(max_concurrency=len(urls), sessions=Sessions())
+    products = _collect(batch.extract_many(urls))
+
+    assert len(products) == len(urls)
+    assert products[-1]['URL'] == slow
+
+
+def test_empty_input():
+    batch = BatchExtractor()
+
+    assert _collect(batch.extract_many([])) == []
+    assert batch.failed_urls == []
+
+
+def test_url_source_error_finishes_started_urls_and_propagates(shop_server):
+    urls = shop_server.urls()[:2]
+
+    def source():
+        yield from urls
+        raise OSError('archivo de URLs ilegible')
+
+    products = []
+    with pytest.raises(OSError, match='ilegible'):
+        _collect(_append_all(BatchExtractor().extract_many(source()), products))
+    assert sorted(data['URL'] for data in products) == sorted(urls)
+
+
+def test_consumer_break_stops_the_batch(shop_server):
+    batch = BatchExtractor(max_concurrency=2, parse_queue_size=1)
+    products = batch.extract_many(shop_server.urls() * 5)
+
+    def first_only():
+        for data in products:
+            yield data
+            break
+        products.close()
+
+    assert len(_collect(first_only(), timeout=30)) == 1
+    # El lote siguiente funciona con normalidad
+    assert len(_collect(BatchExtractor().extract_many(shop_server.urls()[:2]))) == 2
+
+
+def test_fingerprint_store_errors_do_not_stop_parsers(shop_server, tmp_path):
+    class BrokenStore(FingerprintStore):
+        def put(self, url, fingerprint, product_data):
+            raise OSError('disco lleno')
+
+    urls = shop_server.urls()
+    store = BrokenStore(str(tmp_path / 'huellas.db'))
+    batch = BatchExtractor(max_concurrency=4, parse_queue_size=1, fingerprints=store)
+
+    products = _collect(batch.extract_many(urls))
+
+    assert len(products) == len(urls)
+    assert batch.failures.counts['huella'] == len(urls)
+    store.close()
@@ -0,0 +1,64 @@
+"""
+Pruebas de la frontera: qué URLs de los sitemaps se entregan como productos
+"""
+
+import gzip
+
+from frontera import Frontier, path_matcher
+
+
+BASE = 'https://tienda.example.com'
+URLSET = ('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+          '<url><loc>https://tienda.example.com/shop/dispensador-de-agua-60</loc></url>'
+          '<url><loc>https://tienda.example.com/blog/novedades-3</loc></url>'
+          '<url><loc>https://tienda.example.com/contactus</loc></url>'
+          '<url><loc>https://tienda.example.com/shop/product/lampara-led-7</loc></url>'
+          '</urlset>').encode()
+
+
+def _crawl(session_factory, bodies, **kwargs):
+    sitemaps = list(bodies)
+    frontier = Frontier(BASE, session=session_factory(bodies), sitemaps=sitemaps, shop=False,
+                        respect_robots=False, **kwargs)
+    return list(frontier), frontier
+
+
+def test_sitemap_pages_that_are_not_products_are_skipped(fake_session):
+    urls, frontier = _crawl(fake_session, {f'{BASE}/sitemap.xml': URLSET})
+
+    assert sorted(urls) == [f'{BASE}/shop/dispensador-de-agua-60', f'{BASE}/shop/product/lampara-led-7']
+    assert frontier.stats['skipped'] == 2
+
+
+def test_custom_product_predicate(fake_session):
+    urls, _ = _crawl(fake_session, {f'{BASE}/sitemap.xml': URLSET}, is_product=lambda url: '/blog/' in url)
+
+    assert urls == [f'{BASE}/blog/novedades-3']
+
+
+def test_corrupt_gzip_sitemap_is_counted_and_skipped(fake_session, capsys):
+    compressed = gzip.compress(URLSET)
+    urls, frontier = _crawl(fake_session, {
+        f'{BASE}/truncado.xml.gz': compressed[:len(compressed) // 2],
+        f'{BASE}/crc.xml.gz': compressed[:-8] + b'\0' * 8,
+        f'{BASE}/sitemap.xml.gz': compressed,
+    })
+
+    assert len(urls) == 2
+    assert frontier.stats['errors'] == 2
+    assert capsys.readouterr().out.count('Sitemap no válido') == 2
+
+
+def test_non_odoo_shop_with_product_pattern(fake_session):
+    urlset = ('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+              '<url><loc>https://tienda.example.com/producto/lampara-led</loc></url>'
+              '<url><loc>https://tienda.example.com/producto/silla-plegable</loc></url>'
+              '<url><loc>https://tienda.example.com/categoria/hogar</loc></url>'
+              '</urlset>').encode()
+    bodies = {f'{BASE}/sitemap.xml': urlset}
+
+    # Sin patrón, la regla de Odoo no reconoce ningún producto
+    assert _crawl(fake_session, bodies)[0] == []
+    urls, frontier = _crawl(fake_session, bodies, is_product=path_matcher(r'^/producto/'))
+    assert sorted(urls) == [f'{BASE}/producto/lampara-led', f'{BASE}/producto/silla-plegable']
+    assert frontier.stats['skipped'] == 1
@@ -0,0 +1,52 @@
+"""
+Pruebas de la vista HTML generada en streaming
+"""
+
+import sys
+
+import generar_vista
+from generar_vista import COUNT_WIDTH, generate_html, write_html
+from salida_jsonl import JsonlWriter
+
+
+PRODUCTS = [
+    {'URL': f'https://tienda.example.com/p{i}', 'Título': f'Producto {i}', 'Precio': f'$ {i}.000',
+     'Descripción': f'Descripción del producto {i}\ncon dos líneas',
+     'Imágenes': [f'https://tienda.example.com/img/{i}-{n}.jpg' for n in range(2)],
+     'Atributos': {'Categorías': ['Hogar']}, 'Fecha de extracción': '2024-01-14 10:00:00'}
+    for i in range(3)
+]
+
+
+def test_streamed_view_matches_the_full_page(tmp_path):
+    consumed = []
+
+    def products():
+        for product in PRODUCTS:
+            consumed.append(product['URL'])
+            yield product
+
+    path = tmp_path / 'vista.html'
+    with open(path, 'w', encoding='utf-8') as f:
+        assert write_html(products(), f) == 3
+
+    page = path.read_text(encoding='utf-8')
+    # El total se escribe al final en el hueco reservado del encabezado
+    assert page.replace('3'.ljust(COUNT_WIDTH), '3', 1) == generate_html(PRODUCTS)
+    assert len(consumed) == 3
+
+
+def test_main_renders_from_jsonl(tmp_path, monkeypatch, capsys):
+    jsonl = str(tmp_path / 'productos.jsonl')
+    with JsonlWriter(jsonl) as writer:
+        for product in PRODUCTS:
+            writer.write(product)
+    output = tmp_path / 'vista.html'
+    monkeypatch.setattr(sys, 'argv', ['generar_vista.py', '--jsonl', jsonl, '--salida', str(output)])
+
+    generar_vista.main()
+
+    page = output.read_text(encoding='utf-8')
+    assert all(p['Título'] in page for p in PRODUCTS)
+    assert page.count('class="product-card"') == 3
+    assert 'Total de productos: 3' in capsys.readouterr().out
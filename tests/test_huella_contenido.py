@@ -0,0 +1,56 @@
+"""
+Pruebas de la extracción incremental: huella del HTML y páginas sin cambios
+"""
+
+from extractor import ProductExtractor
+from huella_contenido import FingerprintStore, content_fingerprint
+
+
+URL = 'https://tienda.example.com/shop/cafetera-1'
+PAGE = '''<html><head><meta name="csrf-token" content="x">
+<script>var csrf_token = "{token}"; var generado = "{date}";</script></head>
+<body><h1>Cafetera</h1><span class="price">{price}</span>
+<input type="hidden" name="csrf_token" value="{token}"></body></html>'''
+
+
+def _page(price='$ 100', token='a1b2', date='2024-01-14T10:00:00Z'):
+    return PAGE.format(price=price, token=token, date=date)
+
+
+def test_fingerprint_ignores_volatile_parts():
+    assert content_fingerprint(_page()) == content_fingerprint(_page(token='ffff', date='2024-01-15 08:30:12'))
+    assert content_fingerprint(_page()) == content_fingerprint(_page().replace('\n', '\n   '))
+    assert content_fingerprint(_page()) != content_fingerprint(_page(price='$ 120'))
+
+
+def test_unchanged_page_is_not_parsed_again(tmp_path, monkeypatch):
+    store = FingerprintStore(str(tmp_path / 'huellas.db'))
+    parsed = []
+    parse = ProductExtractor._parse
+    monkeypatch.setattr(ProductExtractor, '_parse', lambda self, html: parsed.append(1) or parse(self, html))
+    try:
+        first = ProductExtractor(URL, fingerprints=store).extract_from_html(_page())
+        again = ProductExtractor(URL, fingerprints=store).extract_from_html(_page(token='zzzz'))
+        changed = ProductExtractor(URL, fingerprints=store).extract_from_html(_page(price='$ 120'))
+    finally:
+        store.close()
+
+    assert len(parsed) == 2
+    assert store.stats == {'reused': 1, 'parsed': 2}
+    assert {k: v for k, v in again.items() if k != 'Fecha de extracción'} == \
+        {k: v for k, v in first.items() if k != 'Fecha de extracción'}
+    assert changed['Precio'] == '$ 120'
+
+
+def test_fingerprints_persist_between_runs(tmp_path):
+    path = str(tmp_path / 'huellas.db')
+    store = FingerprintStore(path)
+    store.put(URL, content_fingerprint(_page()), {'URL': URL, 'Título': 'Cafetera'})
+    store.close()
+
+    store = FingerprintStore(path)
+    try:
+        assert store.get(URL, content_fingerprint(_page()))['Título'] == 'Cafetera'
+        assert store.get(URL, content_fingerprint(_page(price='$ 1'))) is None
+    finally:
+        store.close()
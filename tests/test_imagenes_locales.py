@@ -0,0 +1,38 @@
+"""
+Pruebas de la copia local de imágenes: errores de disco e índice persistente
+"""
+
+import os
+import sqlite3
+
+import imagenes_locales
+from imagenes_locales import ImageMirror
+
+
+IMAGE_URL = 'https://tienda.example.com/img/lampara.png'
+PRODUCT = {'Título': 'Lámpara', 'Imágenes': [IMAGE_URL]}
+
+
+def test_disk_error_counts_as_failed(tmp_path, fake_session, monkeypatch):
+    def replace(src, dst):
+        raise OSError(28, 'No queda espacio en el dispositivo')
+    monkeypatch.setattr(imagenes_locales.os, 'replace', replace)
+
+    with ImageMirror(str(tmp_path), workers=1, session=fake_session({IMAGE_URL: b'png'})) as mirror:
+        product_data = mirror.mirror_product(PRODUCT)
+
+        assert product_data['Imágenes'] == [IMAGE_URL]
+        assert mirror.stats['failed'] == 1 and mirror.stats['downloaded'] == 0
+
+
+def test_index_is_committed_after_each_product(tmp_path, fake_session):
+    mirror = ImageMirror(str(tmp_path), workers=1, session=fake_session({IMAGE_URL: b'png'}))
+    try:
+        product_data = mirror.mirror_product(PRODUCT)
+
+        # Otra conexión ya ve la fila antes de close(), como tras una interrupción
+        with sqlite3.connect(os.path.join(str(tmp_path), 'indice.db')) as db:
+            rows = db.execute('SELECT url, path FROM images').fetchall()
+        assert rows == [(IMAGE_URL, product_data['Imágenes'][0])]
+    finally:
+        mirror.close()
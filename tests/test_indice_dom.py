@@ -0,0 +1,79 @@
+"""
+Pruebas del índice del documento: mismas respuestas que BeautifulSoup
+"""
+
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from indice_dom import DocumentIndex, compile_selector
+
+
+PAGES = ['odoo_producto.html', 'woocommerce_producto.html', 'jsonld_producto.html', 'pagina_minima.html']
+
+SELECTORS = [
+    'h1',
+    'h1.product-title',
+    '[itemprop="price"]',
+    '[itemprop="image"]',
+    '[data-oe-type]',
+    'img',
+    'div.product-description p',
+    '.woocommerce-Tabs-panel p',
+    '#tab-description h2',
+    'li.breadcrumb-item a',
+    'meta[name="description"]',
+    '.product_price .oe_currency_value',
+    'div.o_wsale_product_information span.oe_currency_value',
+    '.summary .sku',
+    'ul li a',
+    # Combinador de hijo: el índice delega en soup.select
+    'div > p',
+]
+
+FIND_ALL = [
+    {'name': 'p'},
+    {'name': ['h2', 'h3']},
+    {'name': 'meta', 'attrs': {'property': 'og:image'}},
+    {'class_': lambda token: bool(token and 'price' in token.lower())},
+    {'name': 'div', 'class_': 'summary'},
+    {'name': 'span', 'string': lambda text: bool(text and '$' in text)},
+    {'name': ['span', 'bdi'], 'string': lambda text: bool(text and re.search(r'\d', text))},
+]
+
+
+def _positions(soup, elements):
+    order = {id(elem): pos for pos, elem in enumerate(soup.find_all(True))}
+    return [order[id(elem)] for elem in elements]
+
+
+@pytest.mark.parametrize('page', PAGES)
+def test_select_matches_beautifulsoup(page, corpus_page):
+    soup = BeautifulSoup(corpus_page(page), 'html.parser')
+    index = DocumentIndex(soup)
+
+    for selector in SELECTORS:
+        expected = soup.select(selector)
+        assert _positions(soup, index.select(selector)) == _positions(soup, expected), selector
+        assert index.select_one(selector) is (expected[0] if expected else None), selector
+
+
+@pytest.mark.parametrize('page', PAGES)
+def test_find_all_matches_beautifulsoup(page, corpus_page):
+    soup = BeautifulSoup(corpus_page(page), 'html.parser')
+    index = DocumentIndex(soup)
+
+    for query in FIND_ALL:
+        expected = soup.find_all(**query)
+        assert _positions(soup, index.find_all(**query)) == _positions(soup, expected), query
+        assert index.find(**query) is (expected[0] if expected else None), query
+
+
+def test_compile_selector_rejects_combinators():
+    assert compile_selector('div > p') is None
+    assert compile_selector('a:not(.b)') is None
+    assert compile_selector('div.a#b[itemprop="x"] span') == (
+        ('div', ('a',), ('b',), (('itemprop', 'x'),)),
+        ('span', (), (), ()),
+    )
@@ -0,0 +1,67 @@
+"""
+Pruebas del manifiesto de tarjetas: solo se renderizan los archivos modificados
+"""
+
+import json
+import os
+
+from manifiesto_vista import CardManifest
+
+
+def _write(path, title, mtime=None):
+    path.write_text(json.dumps({'Título': title}), encoding='utf-8')
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+    return str(path)
+
+
+def _cards(db, files, version='v1'):
+    rendered = []
+
+    def render(product):
+        rendered.append(product['Título'])
+        return f"<div>{product['Título']}</div>"
+
+    manifest = CardManifest(db, version)
+    try:
+        cards = [manifest.card_for_file(path, json.loads, render) for path in files]
+        removed = manifest.prune()
+    finally:
+        manifest.close()
+    return cards, rendered, manifest.stats, removed
+
+
+def test_unchanged_files_reuse_their_cards(tmp_path):
+    db = str(tmp_path / 'manifiesto.db')
+    a = _write(tmp_path / 'producto_a.json', 'A')
+    b = _write(tmp_path / 'producto_b.json', 'B')
+    c = _write(tmp_path / 'producto_c.json', 'C')
+    _cards(db, [a, b, c])
+
+    # b cambia de contenido y c deja de formar parte de la vista
+    _write(tmp_path / 'producto_b.json', 'B2')
+    cards, rendered, stats, removed = _cards(db, [a, b])
+
+    assert cards == [('A', '<div>A</div>'), ('B2', '<div>B2</div>')]
+    assert rendered == ['B2']
+    assert stats == {'unchanged': 1, 'rendered': 1}
+    assert removed == 1
+
+
+def test_same_content_with_new_mtime_is_not_rendered(tmp_path):
+    db = str(tmp_path / 'manifiesto.db')
+    a = _write(tmp_path / 'producto_a.json', 'A')
+    _cards(db, [a])
+    _write(tmp_path / 'producto_a.json', 'A', mtime=10 ** 18)
+
+    _, rendered, stats, _ = _cards(db, [a])
+    assert rendered == [] and stats == {'unchanged': 1, 'rendered': 0}
+
+
+def test_template_change_discards_cards(tmp_path):
+    db = str(tmp_path / 'manifiesto.db')
+    a = _write(tmp_path / 'producto_a.json', 'A')
+    _cards(db, [a], version='v1')
+
+    _, rendered, _, _ = _cards(db, [a], version='v2')
+    assert rendered == ['A']
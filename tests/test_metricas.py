@@ -0,0 +1,55 @@
+"""
+Pruebas de las métricas de extracción: etapas, ramas, descargas y exportación
+"""
+
+import json
+
+from datos_estructurados import JSON_LD
+from extractor import ProductExtractor
+from metricas import FETCH, PARSE, ExtractionMetrics
+
+
+URL = 'https://tienda.example.com/shop/cafetera'
+
+
+def test_prometheus_histogram_is_cumulative():
+    metrics = ExtractionMetrics()
+    for seconds in (0.002, 0.02, 3.0):
+        metrics.observe(URL, PARSE, seconds)
+    metrics.record_download(URL, 1500, 200)
+    metrics.record_download(URL, 500, 404, truncated=True)
+
+    lines = metrics.prometheus().splitlines()
+    assert 'extractor_stage_seconds_bucket{stage="parseo",le="0.001"} 0' in lines
+    assert 'extractor_stage_seconds_bucket{stage="parseo",le="0.005"} 1' in lines
+    assert 'extractor_stage_seconds_bucket{stage="parseo",le="0.025"} 2' in lines
+    assert 'extractor_stage_seconds_bucket{stage="parseo",le="2.5"} 2' in lines
+    assert 'extractor_stage_seconds_bucket{stage="parseo",le="+Inf"} 3' in lines
+    assert 'extractor_stage_seconds_count{stage="parseo"} 3' in lines
+    assert 'extractor_downloaded_bytes_total 2000' in lines
+    assert 'extractor_truncated_pages_total 1' in lines
+    assert 'extractor_responses_total{status="404"} 1' in lines
+
+
+def test_extraction_records_stages_and_branches(fake_session, corpus_page, tmp_path):
+    events = []
+    metrics = ExtractionMetrics(hooks=[events.append])
+    # Un hook que falla no interrumpe la extracción
+    metrics.add_hook(lambda event: 1 / 0)
+    session = fake_session({URL: corpus_page('jsonld_producto.html').encode('utf-8')})
+
+    extractor = ProductExtractor(URL, session=session, metrics=metrics, structured=True)
+    assert extractor.extract_all_data()['Moneda'] == 'COP'
+
+    report = metrics.as_dict()
+    assert report['paginas'] == 1
+    assert report['descargas_por_estado'] == {'200': 1}
+    assert report['bytes_descargados'] == len(corpus_page('jsonld_producto.html').encode('utf-8'))
+    assert {FETCH, PARSE} <= set(report['etapas'])
+    assert report['ramas']['Precio'] == {JSON_LD: 1}
+    assert {event['evento'] for event in events} == {'etapa', 'descarga', 'rama'}
+
+    path = str(tmp_path / 'metricas.json')
+    metrics.save(path)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == report
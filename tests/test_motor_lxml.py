@@ -0,0 +1,38 @@
+"""
+Pruebas del motor lxml nativo con documentos sin elementos
+"""
+
+import pytest
+
+from extractor import ProductExtractor
+from motor_lxml import LxmlDocument
+
+
+EMPTY_PAGES = ['', '  \n\t ', '<!-- sin contenido -->', '<?xml version="1.0" encoding="utf-8"?>\n']
+
+
+@pytest.mark.parametrize('html_content', EMPTY_PAGES)
+def test_empty_document_has_an_empty_root(html_content):
+    document = LxmlDocument(html_content)
+
+    assert [node.name for node in document.find_all()] == ['html']
+
+
+# html.parser avisa de que la declaración XML parece un documento XML
+@pytest.mark.filterwarnings('ignore::bs4.XMLParsedAsHTMLWarning')
+@pytest.mark.parametrize('html_content', EMPTY_PAGES)
+def test_empty_document_extracts_like_html_parser(html_content):
+    def extract(parser):
+        data = ProductExtractor('https://tienda.example.com/producto', parser=parser).extract_from_html(html_content)
+        data.pop('Fecha de extracción')
+        return data
+
+    assert extract('lxml-native') == extract('html.parser')
+
+
+def test_complex_selector_without_cssselect_explains_the_dependency(monkeypatch):
+    import motor_lxml
+    monkeypatch.setattr(motor_lxml, 'cssselect', None)
+
+    with pytest.raises(ImportError, match='cssselect'):
+        LxmlDocument('<div><p><a href="/">inicio</a></p></div>').select('p > a')
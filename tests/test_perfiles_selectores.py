@@ -0,0 +1,62 @@
+"""
+Pruebas de los perfiles de selectores: el ganador se prueba primero sin
+cambiar el resultado
+"""
+
+import pytest
+
+from extractor import PARSERS, ProductExtractor
+from perfiles_selectores import SelectorProfiles
+
+
+PAGES = ['odoo_producto.html', 'woocommerce_producto.html', 'jsonld_producto.html', 'pagina_minima.html']
+
+
+def _extract(url, html_content, profile=None, parser='html.parser'):
+    extractor = ProductExtractor(url, profile=profile, parser=parser)
+    data = extractor.extract_from_html(html_content)
+    data.pop('Fecha de extracción')
+    return data, extractor.selector_winners
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+@pytest.mark.parametrize('page', PAGES)
+def test_profile_does_not_change_the_result(page, parser, corpus_page, tmp_path):
+    html_content = corpus_page(page)
+    url = f'https://tienda.example.com/shop/{page}'
+    profiles = SelectorProfiles(str(tmp_path / 'perfiles.json'))
+
+    expected, winners = _extract(url, html_content, parser=parser)
+    profiles.record(url, winners)
+    # Con el perfil aprendido en la misma tienda, la misma salida y los mismos ganadores
+    profile = profiles.profile(url)
+    assert profile == winners
+    assert _extract(url, html_content, profile, parser) == (expected, winners)
+
+
+def test_wrong_profile_falls_back_to_the_chain(corpus_page):
+    html_content = corpus_page('odoo_producto.html')
+    url = 'https://tienda.example.com/shop/cafetera'
+    expected, winners = _extract(url, html_content)
+    stale = {field: '.no-existe' if isinstance(strategy, str) else ['.no-existe'] for field, strategy in winners.items()}
+
+    assert _extract(url, html_content, stale)[0] == expected
+
+
+def test_profiles_persist_and_count_hits(tmp_path):
+    path = str(tmp_path / 'perfiles.json')
+    url = 'https://Tienda.example.com/shop/a'
+    profiles = SelectorProfiles(path)
+    profiles.record(url, {'Título': 'h1', 'Precio': '.price'})
+    profiles.close()
+
+    profiles = SelectorProfiles(path)
+    profile = profiles.profile('https://tienda.example.com/shop/b')
+    assert profile == {'Título': 'h1', 'Precio': '.price'}
+    profiles.record(url, {'Título': 'h1', 'Precio': '.oe_price'}, profile)
+
+    assert profiles.stats == {'hits': 1, 'misses': 1}
+    assert profiles.profiles['tienda.example.com'] == {
+        'Título': {'estrategia': 'h1', 'aciertos': 2},
+        'Precio': {'estrategia': '.oe_price', 'aciertos': 1},
+    }
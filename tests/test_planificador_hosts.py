@@ -0,0 +1,59 @@
+"""
+Pruebas del planificador por host: ritmo, Retry-After y errores de lectura
+"""
+
+import time
+
+import requests
+
+import extractor
+from extractor import ProductExtractor
+from planificador_hosts import HostScheduler, parse_retry_after
+
+
+URL = 'https://tienda.example.com/shop/producto-1'
+
+
+def _scheduler(**options):
+    return HostScheduler(respect_robots=False, **options)
+
+
+def test_requests_are_paced_by_rate():
+    scheduler = _scheduler(initial_rate=10.0, latency_target=60)
+    start = time.monotonic()
+    for _ in range(3):
+        scheduler.acquire(URL)
+        scheduler.release(URL, status=200, latency=0.01)
+
+    # Un token inicial y luego uno cada ~0,1 s (el ritmo sube 0,25 pet/s por éxito)
+    assert time.monotonic() - start >= 0.18
+    assert scheduler.rates()['tienda.example.com']['requests'] == 3
+
+
+def test_retry_after_pauses_the_host_and_halves_the_rate():
+    scheduler = _scheduler(initial_rate=20.0)
+    scheduler.acquire(URL)
+    scheduler.release(URL, status=429, latency=0.01, retry_after='1')
+    rates = scheduler.rates()['tienda.example.com']
+    start = time.monotonic()
+    scheduler.acquire(URL)
+
+    assert time.monotonic() - start >= 0.9
+    assert rates['rate'] == 10.0 and rates['throttled'] == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('pronto') is None and parse_retry_after(None) is None
+
+
+def test_body_read_error_backs_off(fake_session, monkeypatch):
+    def read_body(response, max_bytes=None):
+        raise requests.ConnectionError('conexión cortada')
+    monkeypatch.setattr(extractor, 'read_body', read_body)
+    scheduler = _scheduler(initial_rate=4.0)
+
+    assert ProductExtractor(URL, session=fake_session([200]), scheduler=scheduler)._download() is None
+    rates = scheduler.rates()['tienda.example.com']
+    assert rates['errors'] == 1 and rates['rate'] == 2.0 and rates['in_flight'] == 0
@@ -0,0 +1,58 @@
+"""
+Pruebas de la poda del HTML: misma salida sin scripts, estilos ni comentarios
+"""
+
+import lxml.html
+import pytest
+from bs4 import BeautifulSoup
+
+from extractor import PARSERS, ProductExtractor
+from motor_lxml import LxmlDocument
+from poda_html import drop_boilerplate, prune_html
+
+
+PAGES = ['odoo_producto.html', 'woocommerce_producto.html', 'jsonld_producto.html', 'pagina_minima.html']
+
+PAGE = '''<html><head><style>h1 { color: red }</style>
+<script>var menu = "<h1>Falso</h1>";</script>
+<script type="application/ld+json">{"@type": "Product", "name": "Cafetera"}</script>
+</head><body>
+<!-- <script>comentario</script> -->
+<header><nav><a href="/">Inicio</a></nav></header>
+<nav class="breadcrumb"><a href="/hogar">Hogar</a></nav>
+<h1>Cafetera</h1>
+<footer><p>Pie</p></footer>
+</body></html>'''
+
+
+def test_prune_keeps_json_ld():
+    pruned = prune_html(PAGE)
+
+    assert '<script type="application/ld+json">{"@type": "Product", "name": "Cafetera"}</script>' in pruned
+    assert 'Falso' not in pruned and 'color: red' not in pruned and 'comentario' not in pruned
+    assert '<h1>Cafetera</h1>' in pruned
+
+
+@pytest.mark.parametrize('document', [lambda html: BeautifulSoup(html, 'html.parser'), LxmlDocument],
+                         ids=['bs4', 'lxml-native'])
+def test_drop_boilerplate_keeps_product_blocks(document):
+    tree = document(prune_html(PAGE))
+
+    # Se quitan el header (con su nav) y el footer; el nav de migas de pan se queda
+    assert drop_boilerplate(tree) == 2
+    html = str(tree) if isinstance(tree, BeautifulSoup) else lxml.html.tostring(tree.root, encoding='unicode')
+    assert 'Inicio' not in html and 'Pie' not in html and 'Hogar' in html
+
+
+@pytest.mark.parametrize('parser', PARSERS)
+@pytest.mark.parametrize('page', PAGES)
+def test_pruned_extraction_matches(page, parser, corpus_page):
+    html_content = corpus_page(page)
+    results = []
+    for prune in (False, True):
+        data = ProductExtractor('https://tienda.example.com/shop/p', parser=parser, prune=prune,
+                                structured=True).extract_from_html(html_content)
+        data.pop('Fecha de extracción')
+        results.append(data)
+
+    assert results[0] == results[1]
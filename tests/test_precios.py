@@ -0,0 +1,52 @@
+"""
+Pruebas de la normalización de precios: moneda del texto, de la página y regional
+"""
+
+from decimal import Decimal
+
+from almacen_sqlite import product_record
+from exportar_parquet import product_row
+from extractor import ProductExtractor
+from precios import Price, PriceParser, parse_price
+
+
+def test_code_after_dollar_wins_over_locale():
+    assert PriceParser('es_AR').parse('$ 50.000 COP') == Price(Decimal('50000'), 'COP')
+    assert parse_price('$ 1.250.000,00 COP') == Price(Decimal('1250000.00'), 'COP')
+
+
+def test_bare_dollar_uses_locale():
+    assert PriceParser('es_AR').parse('$ 50.000') == Price(Decimal('50000'), 'ARS')
+    assert parse_price('$ 50.000') == Price(Decimal('50000'), None)
+
+
+def test_sol_symbol_needs_uppercase_at_word_start():
+    assert PriceParser('es_CO').parse('precios/unidad $ 10.000') == Price(Decimal('10000'), 'COP')
+    assert parse_price('S/ 120,50') == Price(Decimal('120.50'), 'PEN')
+
+
+def test_declared_currency_before_locale():
+    parser = PriceParser('es_AR')
+    assert parser.parse('349900.00', 'COP') == Price(Decimal('349900.00'), 'COP')
+    assert parser.parse('$ 349.900', 'cop') == Price(Decimal('349900'), 'COP')
+    # Un símbolo explícito en el texto manda sobre lo declarado
+    assert parser.parse('€ 39,90', 'COP') == Price(Decimal('39.90'), 'EUR')
+    assert parser.parse_many(['100', '100'], ['COP', None]) == [Price(Decimal('100'), 'COP'),
+                                                                Price(Decimal('100'), 'ARS')]
+
+
+def test_declared_currency_reaches_exports(corpus_page):
+    html_content = corpus_page('jsonld_producto.html')
+    product_data = ProductExtractor('https://tienda.example.com/producto', structured=True).extract_from_html(html_content)
+
+    assert product_data['Moneda'] == 'COP'
+    assert product_row(product_data)['moneda'] == 'COP'
+    assert product_record(product_data)[6] == 'COP'
+
+
+def test_undeclared_currency_leaves_no_key(corpus_page):
+    product_data = ProductExtractor('https://tienda.example.com/producto').extract_from_html(
+        corpus_page('pagina_minima.html'))
+
+    assert 'Moneda' not in product_data
+    assert product_row(product_data)['moneda'] is None
@@ -0,0 +1,114 @@
+"""
+Pruebas del cortacircuitos: abierto → prueba → cerrado o reabierto
+"""
+
+import time
+
+from extractor import ProductExtractor
+from reintentos import PROBE, CircuitBreaker
+
+
+HOST = 'https://tienda.example.com'
+
+
+def _fetch(breaker, session, path):
+    return ProductExtractor(f"{HOST}{path}", session=session, breaker=breaker).fetch_page()
+
+
+def _wait_reset(breaker):
+    time.sleep(breaker.reset_timeout * 2)
+
+
+def test_probe_success_closes_circuit(fake_session):
+    breaker = CircuitBreaker(1, 0.01)
+    session = fake_session([500, 200, 200])
+    assert _fetch(breaker, session, '/a') is None
+    assert breaker.open_hosts() == ['tienda.example.com']
+    _wait_reset(breaker)
+    assert _fetch(breaker, session, '/b') is not None
+    assert breaker.open_hosts() == []
+    assert _fetch(breaker, session, '/c') is not None
+
+
+def test_probe_failure_reopens_circuit(fake_session):
+    breaker = CircuitBreaker(1, 0.01)
+    session = fake_session([500, 503, 200])
+    _fetch(breaker, session, '/a')
+    _wait_reset(breaker)
+    assert _fetch(breaker, session, '/b') is None
+    # Reabierto: sin esperar, la siguiente petición ni siquiera sale
+    assert not breaker.allow(f"{HOST}/c")
+    _wait_reset(breaker)
+    assert _fetch(breaker, session, '/c') is not None
+    assert breaker.open_hosts() == []
+
+
+def test_probe_404_proves_host_alive(fake_session):
+    breaker = CircuitBreaker(1, 0.01)
+    session = fake_session([500, 404, 200])
+    _fetch(breaker, session, '/a')
+    _wait_reset(breaker)
+    assert _fetch(breaker, session, '/no-existe') is None
+    assert _fetch(breaker, session, '/b') is not None
+
+
+def test_probe_429_counts_against_host(fake_session):
+    breaker = CircuitBreaker(1, 0.01)
+    session = fake_session([500, 429])
+    _fetch(breaker, session, '/a')
+    _wait_reset(breaker)
+    _fetch(breaker, session, '/b')
+    assert breaker.open_hosts() == ['tienda.example.com']
+
+
+def test_probe_unexpected_error_releases_probe(fake_session):
+    breaker = CircuitBreaker(1, 0.01)
+    session = fake_session([500, RuntimeError('fallo inesperado'), 200])
+    _fetch(breaker, session, '/a')
+    _wait_reset(breaker)
+    try:
+        _fetch(breaker, session, '/b')
+    except RuntimeError:
+        pass
+    # El circuito sigue abierto pero admite una nueva prueba
+    assert _fetch(breaker, session, '/c') is not None
+    assert breaker.open_hosts() == []
+
+
+def test_probe_revalidated_304_closes_circuit(tmp_path, fake_session, response_factory):
+    from cache_http import HttpCache
+
+    cache = HttpCache(str(tmp_path))
+    breaker = CircuitBreaker(1, 0.01)
+    url = f"{HOST}/a"
+    first = response_factory(200, headers={'ETag': '"v1"'})
+    cache.store(url, first.text, first.headers)
+    session = fake_session([500, 304, 200])
+    assert _fetch(breaker, session, '/b') is None
+    _wait_reset(breaker)
+    extractor = ProductExtractor(url, session=session, breaker=breaker, cache=cache)
+    assert extractor.fetch_page() is not None
+    assert breaker.open_hosts() == []
+
+
+
+def test_late_request_does_not_release_the_probe():
+    breaker = CircuitBreaker(1, 0.01)
+
+    class SlowSession:
+        """Mientras la petición está en curso el circuito se abre y empieza la prueba"""
+
+        def get(self, url, **kwargs):
+            breaker.record_failure(f"{HOST}/b")
+            _wait_reset(breaker)
+            assert breaker.allow(f"{HOST}/c") is PROBE
+            raise RuntimeError('fallo inesperado')
+
+    try:
+        _fetch(breaker, SlowSession(), '/a')
+    except RuntimeError:
+        pass
+    # La prueba sigue en curso: no se admite una segunda
+    assert not breaker.allow(f"{HOST}/d")
+    breaker.record_success(f"{HOST}/c", probe=True)
+    assert breaker.allow(f"{HOST}/d") is True
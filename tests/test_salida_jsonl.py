@@ -0,0 +1,62 @@
+"""
+Pruebas de la salida JSON Lines: ida y vuelta con compresión y líneas inválidas
+"""
+
+import gzip
+
+import pytest
+
+import salida_jsonl
+from generar_vista import iter_jsonl_products
+from salida_jsonl import JsonlWriter, read_jsonl
+
+
+PRODUCTS = [
+    {'URL': 'https://tienda.example.com/a', 'Título': 'Cafetera exprés', 'Precio': '$ 349.900',
+     'Atributos': {'Categorías': ['Hogar', 'Cocina']}},
+    {'URL': 'https://tienda.example.com/b', 'Título': 'Lámpara «LED»', 'Imágenes': []},
+]
+
+
+@pytest.mark.parametrize('name', ['productos.jsonl', 'productos.jsonl.gz', 'productos.jsonl.zst'])
+def test_round_trip_across_runs(tmp_path, name):
+    if name.endswith('.zst') and salida_jsonl.zstandard is None:
+        pytest.skip('zstandard no está instalado')
+    path = str(tmp_path / name)
+    # Dos ejecuciones añaden al mismo archivo (otro miembro gzip / frame zstd)
+    with JsonlWriter(path, buffer_size=64, fsync_every=1) as writer:
+        writer.write(PRODUCTS[0])
+    with JsonlWriter(path) as writer:
+        writer.write(PRODUCTS[1])
+
+    assert list(read_jsonl(path)) == PRODUCTS
+    assert list(iter_jsonl_products(path)) == PRODUCTS
+
+
+def test_gzip_output_is_standard_gzip(tmp_path):
+    path = str(tmp_path / 'productos.jsonl.gz')
+    with JsonlWriter(path) as writer:
+        for product_data in PRODUCTS:
+            writer.write(product_data)
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 2 and '«LED»' in lines[1]
+
+
+def test_invalid_lines_are_skipped(tmp_path, capsys):
+    path = str(tmp_path / 'productos.jsonl')
+    writer = JsonlWriter(path)
+    writer.write({'URL': 'https://tienda.example.com/a'})
+    writer.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"URL": "https://tienda.example.com/b"\n')
+        f.write('no es json\n')
+    writer = JsonlWriter(path)
+    writer.write({'URL': 'https://tienda.example.com/c'})
+    writer.close()
+
+    urls = [product['URL'] for product in read_jsonl(path)]
+
+    assert urls == ['https://tienda.example.com/a', 'https://tienda.example.com/c']
+    assert capsys.readouterr().out.count('línea inválida') == 2
@@ -0,0 +1,61 @@
+"""
+Pruebas de la sesión compartida: reutilización de conexiones, decodificación
+del cuerpo y límite de bytes
+"""
+
+import io
+
+import requests
+
+from sesion_http import CHUNK_SIZE, SessionManager, decode_body, read_body
+
+
+def _streamed(body, content_type='text/html; charset=utf-8'):
+    """Respuesta pedida con stream=True: el cuerpo se lee de raw"""
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = content_type
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def test_decode_body_charset_sources():
+    text = 'Cafetera exprés · 349.900 €'
+    # El charset de Content-Type manda sobre el <meta>
+    assert decode_body(text.encode('cp1252'), 'text/html; charset=windows-1252') == text
+    meta = '<meta charset="iso-8859-15">' + text
+    assert decode_body(meta.encode('iso-8859-15'), 'text/html') == meta
+    # Sin charset declarado: UTF-8 (no el ISO-8859-1 que supone requests) y si no, cp1252
+    assert decode_body(text.encode('utf-8'), 'text/html') == text
+    assert decode_body(text.encode('cp1252'), None) == text
+    # Un charset desconocido se ignora
+    assert decode_body(text.encode('utf-8'), 'text/html; charset=no-existe') == text
+
+
+def test_read_body_caps_the_download():
+    body = ('<p>' + 'ñ' * CHUNK_SIZE + '</p>').encode('utf-8')
+    max_bytes = 1002
+    text, truncated = read_body(_streamed(body), max_bytes)
+
+    # Se corta sin dejar medio carácter UTF-8 al final
+    assert truncated
+    assert text == '<p>' + 'ñ' * 499
+    assert read_body(_streamed(body), len(body)) == (body.decode('utf-8'), False)
+    assert read_body(_streamed(b''), max_bytes) == ('', False)
+
+
+def test_stats_survive_evicted_pools(shop_server):
+    # Mismo servidor con dos nombres: dos hosts para un solo pool
+    hosts = [shop_server.base_url, shop_server.base_url.replace('127.0.0.1', 'localhost')]
+    manager = SessionManager(max_hosts=1)
+    try:
+        for base_url in hosts * 2:
+            for _ in range(2):
+                assert manager.session.get(f"{base_url}/robots.txt", timeout=5).status_code in (200, 404)
+        stats = manager.stats()
+    finally:
+        manager.close()
+
+    # Cada cambio de host expulsa el pool anterior: 4 conexiones, una reutilizada por conexión
+    assert stats == {'hosts': 2, 'requests': 8, 'connections': 4, 'reused': 4}
+    assert manager.stats() == stats
@@ -0,0 +1,67 @@
+"""
+Pruebas de la vista paginada: páginas por categoría, índices e imágenes
+copiadas por imagenes_locales.py
+"""
+
+import json
+
+import vista_paginada
+from imagenes_locales import ImageMirror
+from vista_paginada import SEARCH_INDEX_FILE, write_paginated
+
+
+def _product(title, *categories):
+    return {'URL': f'https://tienda.example.com/shop/{title}', 'Título': title, 'Precio': '$ 1.000',
+            'Atributos': {'Categorías': list(categories)} if categories else {}}
+
+
+def test_pages_by_category(tmp_path, monkeypatch):
+    # Más categorías que archivos abiertos a la vez
+    monkeypatch.setattr(vista_paginada, 'MAX_OPEN_FILES', 1)
+    products = [_product(f'silla-{i}', 'Hogar', 'Muebles') for i in (3, 1, 2)]
+    products += [_product('lampara', 'Iluminación'), _product('sin-ruta'), _product('cafetera', 'Hogar', 'Muebles!')]
+    output = tmp_path / 'catalogo'
+
+    assert write_paginated(iter(products), str(output), page_size=2) == 6
+
+    pages = sorted(path.name for path in output.glob('*.html'))
+    # "Muebles" y "Muebles!" comparten slug: la segunda categoría recibe otro nombre
+    assert pages == ['iluminacion-1.html', 'index.html', 'muebles-1.html', 'muebles-2.html',
+                     'muebles-x-1.html', 'sin-categoria-1.html']
+    first = (output / 'muebles-1.html').read_text(encoding='utf-8')
+    assert first.index('silla-1') < first.index('silla-2') and 'silla-3' not in first
+    assert 'href="muebles-2.html"' in first
+    index = (output / 'index.html').read_text(encoding='utf-8')
+    assert 'Muebles (3)' in index and 'Sin categoría (1)' in index
+
+    with open(output / SEARCH_INDEX_FILE, encoding='utf-8') as f:
+        search = json.load(f)
+    assert len(search['productos']) == 6
+    assert ['silla-3', '$ 1.000', 'Muebles', 'muebles-2.html'] in search['productos']
+
+
+def test_mirror_stores_absolute_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with ImageMirror('imagenes', workers=1) as mirror:
+        assert mirror.directory == str(tmp_path / 'imagenes')
+
+
+def test_local_images_are_relative_to_the_page(tmp_path, monkeypatch):
+    images = [tmp_path / 'imagenes' / 'ab' / 'abcd.jpg', tmp_path / 'imagenes' / 'cd' / 'cdef.png']
+    thumbnails = [tmp_path / 'imagenes' / 'miniaturas' / 'abcd.jpg', tmp_path / 'imagenes' / 'miniaturas' / 'cdef.jpg']
+    product = {
+        'URL': 'https://tienda.example.com/shop/lampara-7',
+        'Título': 'Lámpara',
+        'Imágenes': [str(path) for path in images],
+        'Miniaturas': [str(path) for path in thumbnails],
+        'Atributos': {'Categorías': ['Hogar']},
+    }
+    # La vista se genera desde otro directorio de trabajo
+    monkeypatch.chdir(tmp_path / '..')
+    write_paginated([product], str(tmp_path / 'catalogo'))
+
+    with open(tmp_path / 'catalogo' / 'hogar-1.html', encoding='utf-8') as f:
+        page = f.read()
+    assert 'src="../imagenes/ab/abcd.jpg"' in page
+    assert 'src="../imagenes/miniaturas/cdef.jpg"' in page
+    assert str(tmp_path) not in page
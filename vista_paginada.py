@@ -0,0 +1,233 @@
+"""
+Vista Paginada del Catálogo
+Reparte los productos en páginas HTML agrupadas por categoría, con una
+página índice y un índice de búsqueda JSON compacto
+"""
+
+import json
+import os
+import re
+import tempfile
+import unicodedata
+from html import escape
+from urllib.parse import urlparse
+
+from generar_vista import (
+    PAGE_HEAD_START, PAGE_HEAD_END, PAGE_TAIL, format_price, generate_product_card
+)
+
+
+NO_CATEGORY = 'Sin categoría'
+# Máximo de archivos temporales de categoría abiertos a la vez
+MAX_OPEN_FILES = 256
+SEARCH_INDEX_FILE = 'indice_busqueda.json'
+
+NAV_TEMPLATE = '''<nav style="display: flex; gap: 10px; justify-content: center; margin-bottom: 30px;">
+            {links}
+        </nav>
+
+        '''
+NAV_LINK_TEMPLATE = ('<a href="{href}" style="color: white; background: rgba(255,255,255,0.2); '
+                     'padding: 8px 16px; border-radius: 20px; text-decoration: none;">{label}</a>')
+NAV_CURRENT_TEMPLATE = '<span style="color: white; padding: 8px 16px; font-weight: bold;">{label}</span>'
+
+INDEX_TEMPLATE = '''<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Catálogo de Productos - Índice</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; padding: 20px; margin: 0; }}
+        .container {{ max-width: 1000px; margin: 0 auto; background: white; border-radius: 15px; padding: 30px; box-shadow: 0 10px 30px rgba(0,0,0,0.2); }}
+        h1 {{ color: #333; }}
+        input {{ width: 100%; padding: 12px; font-size: 1.1em; border: 2px solid #667eea; border-radius: 25px; box-sizing: border-box; }}
+        #resultados a, .categoria a {{ color: #667eea; text-decoration: none; }}
+        .categoria {{ padding: 10px 0; border-bottom: 1px solid #eee; }}
+        .categoria h3 {{ margin: 0 0 5px 0; color: #333; }}
+        .paginas a {{ margin-right: 8px; }}
+        #resultados {{ margin: 15px 0 25px 0; }}
+        #resultados div {{ padding: 4px 0; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🛍️ Catálogo de Productos</h1>
+        <p>{total} producto(s) en {category_count} categoría(s) y {page_count} página(s)</p>
+        <input id="buscar" type="search" placeholder="Buscar producto por nombre...">
+        <div id="resultados"></div>
+        {categories}
+    </div>
+    <script>
+        let indice = null;
+        const resultados = document.getElementById('resultados');
+        document.getElementById('buscar').addEventListener('input', async (event) => {{
+            const texto = event.target.value.trim().toLowerCase();
+            if (!texto) {{ resultados.innerHTML = ''; return; }}
+            if (!indice) {{
+                try {{
+                    indice = await (await fetch('{search_index}')).json();
+                }} catch (e) {{
+                    resultados.textContent = 'No se pudo cargar el índice de búsqueda. Sirve este directorio con: python -m http.server';
+                    return;
+                }}
+            }}
+            const encontrados = indice.productos.filter(p => p[0].toLowerCase().includes(texto)).slice(0, 50);
+            resultados.replaceChildren(...encontrados.map(([titulo, precio, categoria, pagina]) => {{
+                const fila = document.createElement('div');
+                const enlace = document.createElement('a');
+                enlace.href = pagina;
+                enlace.textContent = titulo;
+                fila.append(enlace, ` - ${{precio}} (${{categoria}})`);
+                return fila;
+            }}));
+            if (!encontrados.length) resultados.textContent = 'Sin resultados';
+        }});
+    </script>
+</body>
+</html>'''
+INDEX_CATEGORY_TEMPLATE = '''
+        <div class="categoria">
+            <h3>{name} ({count})</h3>
+            <div class="paginas">{links}</div>
+        </div>'''
+
+
+def product_category(product):
+    """Categoría más específica del producto (última de Atributos['Categorías'])"""
+    categories = (product.get('Atributos') or {}).get('Categorías') or []
+    return categories[-1] if categories else NO_CATEGORY
+
+
+def category_slug(category):
+    """Nombre de archivo seguro para una categoría"""
+    ascii_name = unicodedata.normalize('NFKD', category.lower()).encode('ascii', 'ignore').decode('ascii')
+    slug = re.sub(r'[^\w\s-]', '', ascii_name)[:40]
+    slug = re.sub(r'[-\s]+', '-', slug).strip('-')
+    return slug or 'categoria'
+
+
+def group_by_category(products, directory):
+    """Reparte los productos en archivos JSONL temporales por categoría sin cargarlos en memoria"""
+    paths = {}
+    handles = {}
+    for product in products:
+        category = product_category(product)
+        if category not in paths:
+            paths[category] = os.path.join(directory, f"{len(paths)}.jsonl")
+        if category not in handles:
+            if len(handles) >= MAX_OPEN_FILES:
+                for handle in handles.values():
+                    handle.close()
+                handles = {}
+            handles[category] = open(paths[category], 'a', encoding='utf-8')
+        handles[category].write(json.dumps(product, ensure_ascii=False) + '\n')
+    for handle in handles.values():
+        handle.close()
+    return paths
+
+
+def _nav_html(category, page_number, page_count, page_name):
+    links = [NAV_LINK_TEMPLATE.format(href='index.html', label='Índice')]
+    if page_number > 1:
+        links.append(NAV_LINK_TEMPLATE.format(href=page_name(page_number - 1), label='← Anterior'))
+    links.append(NAV_CURRENT_TEMPLATE.format(label=f"{escape(category)} - página {page_number} de {page_count}"))
+    if page_number < page_count:
+        links.append(NAV_LINK_TEMPLATE.format(href=page_name(page_number + 1), label='Siguiente →'))
+    return NAV_TEMPLATE.format(links='\n            '.join(links))
+
+
+def _relative_path(path, base_dir):
+    """Ruta de una imagen local relativa a la página; las URLs remotas no cambian"""
+    if not path or urlparse(path).scheme in ('http', 'https', 'data'):
+        return path
+    try:
+        return os.path.relpath(path, base_dir).replace(os.sep, '/')
+    except ValueError:
+        # En Windows, una imagen en otra unidad
+        return path
+
+
+def _with_relative_images(product, base_dir):
+    """Copia del producto con 'Imágenes' y 'Miniaturas' relativas a base_dir"""
+    if not (product.get('Imágenes') or product.get('Miniaturas')):
+        return product
+    product = dict(product)
+    for field in ('Imágenes', 'Miniaturas'):
+        if product.get(field):
+            product[field] = [_relative_path(path, base_dir) for path in product[field]]
+    return product
+
+
+def write_page(path, products, nav_html):
+    """Escribe una página del catálogo con la navegación antes de la cuadrícula
+
+    Las imágenes locales (imagenes_locales.py) se enlazan relativas a la página.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    head_end = PAGE_HEAD_END.replace('<div class="products-grid">', nav_html + '<div class="products-grid">', 1)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(PAGE_HEAD_START)
+        f.write(str(len(products)))
+        f.write(head_end)
+        for product in products:
+            f.write(generate_product_card(_with_relative_images(product, base_dir)))
+        f.write(PAGE_TAIL)
+
+
+def write_paginated(products, output_dir, page_size=100):
+    """Genera las páginas por categoría, index.html e indice_busqueda.json; devuelve el total"""
+    os.makedirs(output_dir, exist_ok=True)
+    index_sections = []
+    total = 0
+    page_count = 0
+    used_slugs = set()
+
+    # El índice de búsqueda se escribe a medida que se generan las páginas
+    search_index = open(os.path.join(output_dir, SEARCH_INDEX_FILE), 'w', encoding='utf-8')
+    search_index.write('{"campos":["titulo","precio","categoria","pagina"],"productos":[')
+    separator = ''
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = group_by_category(products, tmp)
+
+        for category in sorted(paths, key=str.lower):
+            # Cada categoría se carga sola en memoria para ordenarla por título
+            with open(paths[category], 'r', encoding='utf-8') as f:
+                category_products = [json.loads(line) for line in f]
+            category_products.sort(key=lambda p: (p.get('Título') or '').lower())
+
+            slug = category_slug(category)
+            while slug in used_slugs:
+                slug += '-x'
+            used_slugs.add(slug)
+            pages = max(1, -(-len(category_products) // page_size))
+            page_name = lambda number, slug=slug: f"{slug}-{number}.html"
+
+            for number in range(1, pages + 1):
+                page_products = category_products[(number - 1) * page_size:number * page_size]
+                write_page(os.path.join(output_dir, page_name(number)), page_products,
+                           _nav_html(category, number, pages, page_name))
+                for product in page_products:
+                    entry = [product.get('Título', 'Sin título'), format_price(product.get('Precio'), product.get('Moneda')),
+                             category, page_name(number)]
+                    search_index.write(separator + json.dumps(entry, ensure_ascii=False, separators=(',', ':')))
+                    separator = ','
+
+            total += len(category_products)
+            page_count += pages
+            links = ' '.join(f'<a href="{page_name(n)}">{n}</a>' for n in range(1, pages + 1))
+            index_sections.append(INDEX_CATEGORY_TEMPLATE.format(
+                name=escape(category), count=len(category_products), links=links
+            ))
+
+    search_index.write(']}')
+    search_index.close()
+
+    with open(os.path.join(output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(INDEX_TEMPLATE.format(
+            total=total, category_count=len(index_sections), page_count=page_count,
+            categories=''.join(index_sections), search_index=SEARCH_INDEX_FILE
+        ))
+
+    return total